@@ -0,0 +1,65 @@
+import os
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .ingest import create_dataset, file_sha256, reuse_duplicate_dataset
+from .jobs import spool_upload
+from .models import EquipmentDataset
+from .retention import schedule_history_sweep
+from .validators import validate_file_extension, validate_file_size
+from .worker_pool import map_tasks
+
+
+def _parse_in_pool(uploaded_files):
+    spool_paths, spooled_paths = [], []
+    for uploaded_file in uploaded_files:
+        if hasattr(uploaded_file, 'temporary_file_path'):
+            spool_paths.append(uploaded_file.temporary_file_path())
+        else:
+            spooled_paths.append(str(spool_upload(uploaded_file)))
+            spool_paths.append(spooled_paths[-1])
+    try:
+        return map_tasks('api.ingest.parse_spooled_upload', spool_paths)
+    finally:
+        for spool_path in spooled_paths:
+            os.remove(spool_path)
+
+
+def ingest_batch(user, uploaded_files):
+    results = [{'filename': uploaded_file.name} for uploaded_file in uploaded_files]
+
+    accepted = []
+    for index, uploaded_file in enumerate(uploaded_files):
+        try:
+            validate_file_extension(uploaded_file)
+            validate_file_size(uploaded_file)
+        except ValidationError as validation_error:
+            results[index]['error'] = validation_error.messages[0]
+            continue
+        accepted.append((index, uploaded_file, file_sha256(uploaded_file)))
+
+    # Content already stored for any user is copied instead of parsed, and a
+    # file repeated within the batch is parsed once.
+    known_digests = set(EquipmentDataset.objects.filter(content_digest__in=[digest for _, _, digest in accepted]).values_list('content_digest', flat=True))
+    files_to_parse = {}
+    for _, uploaded_file, digest in accepted:
+        if digest not in known_digests:
+            files_to_parse.setdefault(digest, uploaded_file)
+    parsed = dict(zip(files_to_parse, _parse_in_pool(list(files_to_parse.values()))))
+
+    with transaction.atomic():
+        for index, uploaded_file, digest in accepted:
+            dataset_fields, error = parsed.get(digest, (None, None))
+            if error:
+                results[index]['error'] = error
+                continue
+            new_dataset = reuse_duplicate_dataset(user, uploaded_file.name, digest)
+            if new_dataset is None and dataset_fields is None:
+                results[index]['error'] = 'Failed to store dataset'
+                continue
+            if new_dataset is None:
+                new_dataset = create_dataset(user, filename=uploaded_file.name, content_digest=digest, **dataset_fields)
+            results[index]['dataset'] = new_dataset
+        schedule_history_sweep(user)
+    return results
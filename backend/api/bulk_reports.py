@@ -0,0 +1,50 @@
+import zipfile
+
+from .models import EquipmentDataset
+from .report_cache import cached_report_path, open_cached_report, report_cache_path
+from .streaming import ChunkBuffer
+from .worker_pool import map_tasks
+
+ZIP_CHUNK_SIZE = 256 * 1024
+
+
+def render_report(dataset_id):
+    dataset = EquipmentDataset.objects.filter(pk=dataset_id).first()
+    if dataset is not None:
+        cached_report_path(dataset)
+
+
+def open_reports(datasets):
+    # Missing reports are rendered in the worker pool first. Each file is then
+    # opened straight away, so a later cache eviction cannot pull it out from
+    # under the archive; a report evicted in between is rendered again inline.
+    uncached_ids = [dataset.id for dataset in datasets if not report_cache_path(dataset).exists()]
+    if uncached_ids:
+        map_tasks('api.bulk_reports.render_report', uncached_ids)
+    report_files = []
+    try:
+        for dataset in datasets:
+            report_files.append((f'report_{dataset.id}.pdf', open_cached_report(dataset)))
+    except BaseException:
+        for _, report_file in report_files:
+            report_file.close()
+        raise
+    return report_files
+
+
+def stream_zip(report_files):
+    buffer = ChunkBuffer()
+    try:
+        # The sink cannot seek, so zipfile streams entries with data descriptors.
+        # PDFs are already compressed, so entries are stored as they are.
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for arcname, report_file in report_files:
+                with archive.open(arcname, 'w') as entry:
+                    for block in iter(lambda: report_file.read(ZIP_CHUNK_SIZE), b''):
+                        entry.write(block)
+                        yield from buffer.drain()
+                yield from buffer.drain()
+        yield from buffer.drain()
+    finally:
+        for _, report_file in report_files:
+            report_file.close()
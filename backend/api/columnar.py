@@ -0,0 +1,162 @@
+import io
+import zipfile
+from array import array
+
+import numpy as np
+import pandas as pd
+
+from .constants import NUMERIC_COLUMNS
+
+# Parsed datasets are kept as a compressed .npz archive: text columns are
+# dictionary encoded (int32 codes + categories) and numeric columns are
+# float64, so reads load typed arrays instead of parsing CSV again. Each
+# chunk is encoded as it arrives, so ingest holds codes and float arrays
+# rather than the text of every row.
+
+# Level 1 keeps most of the saving of higher levels at a fraction of the
+# write time; np.load reads the archive either way.
+COLUMNAR_COMPRESSION_LEVEL = 1
+
+CATEGORICAL_COLUMNS = {
+    'Equipment Name': 'name',
+    'Type': 'type',
+}
+
+
+def _decode_categories(encoded, category_count):
+    if category_count == 0:
+        return []
+    return encoded.tobytes().decode('utf-8').split('\0')
+
+
+def _factorize_text(values):
+    # Only the distinct values are turned into text, so a categorical or
+    # numeric column is never converted row by row.
+    codes, categories = pd.factorize(values)
+    if isinstance(categories.dtype, pd.CategoricalDtype):
+        categories = categories.astype(object)
+    if not pd.api.types.is_string_dtype(categories):
+        text_codes, categories = pd.factorize(categories.map(str))
+        codes = np.append(text_codes, -1)[codes]
+    return codes, np.asarray(categories, dtype=object)
+
+
+class _CategoryEncoder:
+    # Each chunk is coded as it arrives against a running index of the
+    # categories seen so far: their 64-bit hashes, kept sorted, and their
+    # text. A hash match is confirmed against the stored text, so a collision
+    # only costs a second lookup. The text is the stored form already: one
+    # NUL-separated UTF-8 buffer, since fixed-width numpy unicode arrays
+    # would cost four bytes per character of the longest name.
+
+    def __init__(self):
+        self.hashes = np.empty(0, dtype=np.uint64)
+        self.hash_codes = np.empty(0, dtype=np.int32)
+        self.text = bytearray()
+        self.starts = array('q')
+        self.codes = []
+
+    def category(self, code):
+        end = self.starts[code + 1] - 1 if code + 1 < len(self.starts) else len(self.text)
+        return self.text[self.starts[code]:end].decode('utf-8')
+
+    def _known_code(self, value, value_hash, position):
+        while position < len(self.hashes) and self.hashes[position] == value_hash:
+            code = int(self.hash_codes[position])
+            if self.category(code) == value:
+                return code
+            position += 1
+        return -1
+
+    def add(self, values):
+        chunk_codes, chunk_categories = _factorize_text(values)
+        hashes = pd.util.hash_array(chunk_categories, categorize=False)
+        # Sorted lookups walk the index in order, which is far faster than
+        # probing it at random.
+        order = np.argsort(hashes, kind='stable')
+        first = np.empty(len(hashes), dtype=np.int64)
+        first[order] = np.searchsorted(self.hashes, hashes[order], side='left')
+        found = first < len(self.hashes)
+        found[found] = self.hashes[first[found]] == hashes[found]
+        # The trailing -1 keeps missing values (code -1) missing.
+        positions = np.full(len(chunk_categories) + 1, -1, dtype=np.int32)
+        for i in np.flatnonzero(found).tolist():
+            positions[i] = self._known_code(chunk_categories[i], hashes[i], first[i])
+        new = np.flatnonzero(positions[:-1] < 0)
+        if len(new):
+            positions[new] = len(self.starts) + np.arange(len(new))
+            if self.starts:
+                self.text.append(0)
+            new_text = '\0'.join(chunk_categories[new].tolist()).encode('utf-8')
+            separators = np.flatnonzero(np.frombuffer(new_text, dtype=np.uint8) == 0)
+            self.starts.frombytes((len(self.text) + np.concatenate([[0], separators + 1])).astype(np.int64).tobytes())
+            self.text += new_text
+            new_sorted = order[np.isin(order, new, assume_unique=True)]
+            self.hashes = np.insert(self.hashes, first[new_sorted], hashes[new_sorted])
+            self.hash_codes = np.insert(self.hash_codes, first[new_sorted], positions[new_sorted])
+        self.codes.append(positions[chunk_codes])
+
+    def arrays(self):
+        if len(self.codes) != 1:
+            self.codes = [np.concatenate(self.codes) if self.codes else np.empty(0, dtype=np.int32)]
+        return self.codes[0], np.frombuffer(self.text, dtype=np.uint8), len(self.starts)
+
+
+def _write_npz(arrays):
+    # np.savez_compressed, with a compression level.
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=COLUMNAR_COMPRESSION_LEVEL) as archive:
+        for name, values in arrays.items():
+            with archive.open(f'{name}.npy', 'w', force_zip64=True) as entry:
+                np.lib.format.write_array(entry, np.asanyarray(values), allow_pickle=False)
+    return buffer.getvalue()
+
+
+class ColumnarBuilder:
+
+    def __init__(self):
+        self.encoders = {col: _CategoryEncoder() for col in CATEGORICAL_COLUMNS}
+        self.numeric_parts = {col: [] for col in NUMERIC_COLUMNS}
+
+    def add(self, chunk_df):
+        for col, encoder in self.encoders.items():
+            encoder.add(chunk_df[col])
+        for col in NUMERIC_COLUMNS:
+            self.numeric_parts[col].append(chunk_df[col].to_numpy(dtype=np.float64))
+
+    def numeric_array(self, col):
+        parts = self.numeric_parts[col]
+        if len(parts) != 1:
+            self.numeric_parts[col] = parts = [np.concatenate(parts) if parts else np.empty(0, dtype=np.float64)]
+        return parts[0]
+
+    def to_bytes(self):
+        arrays = {}
+        for col, key in CATEGORICAL_COLUMNS.items():
+            codes, encoded_categories, category_count = self.encoders[col].arrays()
+            arrays[f'{key}_codes'] = codes
+            arrays[f'{key}_categories'] = encoded_categories
+            arrays[f'{key}_count'] = np.array(category_count)
+        for col in NUMERIC_COLUMNS:
+            arrays[col] = self.numeric_array(col)
+        return _write_npz(arrays)
+
+
+def frame_to_columnar(equipment_df):
+    builder = ColumnarBuilder()
+    builder.add(equipment_df)
+    return builder.to_bytes()
+
+
+def columnar_to_frame(columnar_payload, columns=None):
+    columns = columns or list(CATEGORICAL_COLUMNS) + NUMERIC_COLUMNS
+    with np.load(io.BytesIO(columnar_payload), allow_pickle=False) as arrays:
+        frame_columns = {}
+        for col in columns:
+            if col in CATEGORICAL_COLUMNS:
+                key = CATEGORICAL_COLUMNS[col]
+                categories = _decode_categories(arrays[f'{key}_categories'], int(arrays[f'{key}_count']))
+                frame_columns[col] = pd.Categorical.from_codes(arrays[f'{key}_codes'], categories)
+            else:
+                frame_columns[col] = arrays[col]
+    return pd.DataFrame(frame_columns)
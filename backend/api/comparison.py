@@ -0,0 +1,114 @@
+import numpy as np
+from django.core.cache import cache
+
+from .constants import NUMERIC_COLUMNS
+
+DISTRIBUTION_BINS = 20
+DISTRIBUTION_CACHE_VERSION = 1
+DISTRIBUTION_CACHE_TIMEOUT = 24 * 60 * 60
+
+COMPARE_PARAMETERS = {
+    'Flowrate': 'avg_flowrate',
+    'Pressure': 'avg_pressure',
+    'Temperature': 'avg_temperature',
+}
+
+
+def parameter_means(datasets):
+    return np.array(
+        [[getattr(dataset, field) for field in COMPARE_PARAMETERS.values()] for dataset in datasets],
+        dtype=np.float64,
+    ).reshape(len(datasets), len(COMPARE_PARAMETERS))
+
+
+def compare_matrix(datasets):
+    # One (datasets x datasets x parameters) broadcast gives every pairwise
+    # difference; differences[i][j] is dataset i minus dataset j.
+    means = parameter_means(datasets)
+    differences = np.round(means[:, None, :] - means[None, :, :], 2)
+    # Highest mean first; ties keep the requested order.
+    ranking = np.argsort(-means, axis=0, kind='stable')
+    dataset_ids = np.array([dataset.id for dataset in datasets])
+    return {
+        'parameters': list(COMPARE_PARAMETERS),
+        'differences': {param: differences[:, :, i].tolist() for i, param in enumerate(COMPARE_PARAMETERS)},
+        'ranking': {param: dataset_ids[ranking[:, i]].tolist() for i, param in enumerate(COMPARE_PARAMETERS)},
+    }
+
+
+def type_mean_deltas(frame1, frame2):
+    # Types present in only one dataset keep their means with a null delta.
+    type_means = []
+    for frame in (frame1, frame2):
+        grouped = frame.groupby(frame['Type'].astype(str), observed=True)[NUMERIC_COLUMNS]
+        means = grouped.mean()
+        means['count'] = grouped.size()
+        type_means.append(means)
+    joined = type_means[0].join(type_means[1], how='outer', lsuffix='_1', rsuffix='_2')
+    for param in NUMERIC_COLUMNS:
+        joined[f'{param}_delta'] = joined[f'{param}_1'] - joined[f'{param}_2']
+    joined[['count_1', 'count_2']] = joined[['count_1', 'count_2']].fillna(0)
+    joined = joined.round(2).astype(object).where(joined.notna(), None)
+    return [
+        {
+            'type': type_name,
+            'counts': [int(row['count_1']), int(row['count_2'])],
+            'means': {param: [row[f'{param}_1'], row[f'{param}_2']] for param in NUMERIC_COLUMNS},
+            'deltas': {param: row[f'{param}_delta'] for param in NUMERIC_COLUMNS},
+        }
+        for type_name, row in joined.iterrows()
+    ]
+
+
+def shared_histograms(values1, values2, bins=DISTRIBUTION_BINS):
+    edges = np.histogram_bin_edges(np.concatenate([values1, values2]), bins=bins)
+    return {
+        'edges': edges.tolist(),
+        'counts': [np.histogram(values, bins=edges)[0].tolist() for values in (values1, values2)],
+    }
+
+
+def ks_statistic(values1, values2):
+    # Largest gap between the two empirical CDFs, evaluated at every observed value.
+    if len(values1) == 0 or len(values2) == 0:
+        return None
+    sorted1 = np.sort(values1)
+    sorted2 = np.sort(values2)
+    points = np.concatenate([sorted1, sorted2])
+    cdf1 = np.searchsorted(sorted1, points, side='right') / len(sorted1)
+    cdf2 = np.searchsorted(sorted2, points, side='right') / len(sorted2)
+    return float(np.abs(cdf1 - cdf2).max())
+
+
+def compare_distributions(dataset1, dataset2):
+    columns = ['Type'] + NUMERIC_COLUMNS
+    frame1 = dataset1.equipment_frame(columns)
+    frame2 = dataset2.equipment_frame(columns)
+    histograms = {}
+    ks_statistics = {}
+    for param in NUMERIC_COLUMNS:
+        values1 = frame1[param].to_numpy(dtype=np.float64)
+        values2 = frame2[param].to_numpy(dtype=np.float64)
+        histograms[param] = shared_histograms(values1, values2)
+        ks_statistics[param] = ks_statistic(values1, values2)
+    return {
+        'parameters': list(NUMERIC_COLUMNS),
+        'types': type_mean_deltas(frame1, frame2),
+        'histograms': histograms,
+        'ks_statistic': ks_statistics,
+    }
+
+
+def distribution_cache_key(dataset1, dataset2):
+    return f'compare-distribution-v{DISTRIBUTION_CACHE_VERSION}:{dataset1.id}:{dataset2.id}'
+
+
+def cached_distribution_comparison(dataset1, dataset2):
+    # Datasets never change after upload, so a pair's comparison is computed
+    # once and reused until the cache drops it.
+    cache_key = distribution_cache_key(dataset1, dataset2)
+    comparison = cache.get(cache_key)
+    if comparison is None:
+        comparison = compare_distributions(dataset1, dataset2)
+        cache.set(cache_key, comparison, DISTRIBUTION_CACHE_TIMEOUT)
+    return comparison
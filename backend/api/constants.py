@@ -1,5 +1,14 @@
-MAX_UPLOAD_SIZE = 10 * 1024 * 1024
-HISTORY_LIMIT = 5
+from django.conf import settings
+
+MAX_UPLOAD_SIZE = settings.MAX_UPLOAD_SIZE
+HISTORY_LIMIT = settings.HISTORY_LIMIT
+MAX_REPORTED_RANGES = 50
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+MAX_BATCH_FILES = 50
+MAX_BULK_REPORTS = 50
+MAX_COMPARE_DATASETS = 10
+PAYLOAD_COMPRESSION_LEVEL = 6
+ALLOWED_EXTENSIONS = ('.csv', '.csv.gz', '.parquet', '.arrow', '.feather')
 
 REQUIRED_COLUMNS = [
     'Equipment Name',
@@ -17,11 +26,34 @@ NUMERIC_COLUMNS = [
 
 ERROR_MESSAGES = {
     'file_too_large': 'File exceeds {max_mb}MB limit.',
-    'invalid_extension': 'Only .csv files allowed.',
+    'invalid_extension': f"Only {', '.join(ALLOWED_EXTENSIONS[:-1])} and {ALLOWED_EXTENSIONS[-1]} files allowed.",
     'empty_file': 'CSV file is empty.',
     'missing_columns': 'Missing columns: {cols}',
     'extra_columns': 'Unexpected columns: {cols}',
     'invalid_numeric': 'Invalid numeric value in column "{col}" at row(s): {rows}',
     'empty_values': 'Missing values in column "{col}" at row(s): {rows}',
     'not_numeric_type': 'Column "{col}" must be numeric.',
+    'chunk_offset': 'Expected chunk at offset {expected}.',
+    'chunk_checksum': 'Chunk checksum mismatch.',
+    'chunk_too_large': 'Chunk exceeds {max_bytes} bytes or the declared file size.',
+    'upload_incomplete': 'Upload incomplete: received {received} of {total} bytes.',
+    'upload_checksum': 'File checksum mismatch. Restart the upload.',
+    'too_many_files': 'At most {max_files} files per batch.',
+    'pyarrow_required': 'Parquet and Arrow uploads are not supported on this server.',
+    'invalid_gzip': 'Request body is not valid gzip data.',
+    'invalid_ids': 'ids must be a comma-separated list of dataset IDs.',
+    'too_many_reports': 'At most {max_reports} reports per export.',
+    'invalid_page': 'page and page_size must be positive integers; page_size is at most {max_page_size}.',
+    'invalid_threshold': 'threshold must be a non-negative number.',
+    'invalid_sort': 'sort must be one of: {sorts}.',
+    'invalid_status': 'status must be one or more of: {statuses}.',
+    'invalid_compare_ids': 'datasets must be a list of 2 to {max_datasets} dataset IDs.',
+    'invalid_export_format': 'format must be one of: {formats}.',
+    'parquet_export_unavailable': 'Parquet export is not supported on this server.',
+    'unknown_columns': 'Unknown columns: {cols}',
+    'report_timeout': 'Report rendering exceeded the {seconds} s time limit.',
+    'report_memory': 'Report rendering exceeded the {max_mb} MB memory limit.',
+    'report_crashed': 'Report renderer exited unexpectedly ({reason}).',
+    'report_busy': 'All report renderers are busy. Try again later.',
+    'job_lost': 'Job stopped reporting progress and was abandoned. Try again.',
 }
@@ -0,0 +1,65 @@
+import io
+
+import pandas as pd
+try:
+    import pyarrow
+    import pyarrow.csv
+except ImportError:
+    pyarrow = None
+from django.conf import settings
+
+from .constants import NUMERIC_COLUMNS
+
+CSV_PARSER_ENGINES = ('pyarrow', 'c')
+ARROW_BLOCK_SIZE = 4 * 1024 * 1024
+PANDAS_DTYPES = {'Type': 'category'}
+
+
+def resolve_engine(engine=None):
+    engine = engine or settings.CSV_PARSER_ENGINE
+    if engine not in CSV_PARSER_ENGINES:
+        raise ValueError(f'Unknown CSV parser engine: {engine}')
+    if engine == 'pyarrow' and pyarrow is None:
+        return 'c'
+    return engine
+
+
+def _arrow_convert_options(include_columns=None):
+    column_types = {col: pyarrow.float64() for col in NUMERIC_COLUMNS}
+    column_types['Type'] = pyarrow.dictionary(pyarrow.int32(), pyarrow.string())
+    # pyarrow reads an empty string cell as '' by default; pandas reads it as
+    # missing. Both engines must agree for the aggregates to match.
+    return pyarrow.csv.ConvertOptions(
+        column_types=column_types,
+        strings_can_be_null=True,
+        include_columns=include_columns or [],
+    )
+
+
+def open_arrow_csv(byte_stream, block_size=ARROW_BLOCK_SIZE):
+    # Numeric columns are parsed straight to float64, so a bad value fails the
+    # whole read; callers fall back to pandas for row-level error messages.
+    return pyarrow.csv.open_csv(
+        byte_stream,
+        read_options=pyarrow.csv.ReadOptions(block_size=block_size, use_threads=True),
+        convert_options=_arrow_convert_options(),
+    )
+
+
+def read_pandas_csv(text_stream, chunk_rows):
+    return pd.read_csv(text_stream, chunksize=chunk_rows, dtype=PANDAS_DTYPES)
+
+
+def read_csv_frame(csv_bytes, columns=None, engine=None):
+    if resolve_engine(engine) == 'pyarrow':
+        try:
+            table = pyarrow.csv.read_csv(
+                io.BytesIO(csv_bytes),
+                read_options=pyarrow.csv.ReadOptions(use_threads=True),
+                convert_options=_arrow_convert_options(columns),
+            )
+            return table.to_pandas()
+        except (pyarrow.ArrowException, ValueError):
+            pass
+    equipment_df = pd.read_csv(io.BytesIO(csv_bytes), usecols=columns, dtype=PANDAS_DTYPES)
+    return equipment_df[columns] if columns else equipment_df
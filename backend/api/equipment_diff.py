@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from django.core.exceptions import ValidationError
+
+from .constants import NUMERIC_COLUMNS, ERROR_MESSAGES
+
+EQUIPMENT_DIFF_PAGE_SIZE = 50
+MAX_EQUIPMENT_DIFF_PAGE_SIZE = 500
+EQUIPMENT_DIFF_STATUSES = ('added', 'removed', 'changed')
+EQUIPMENT_DIFF_SORTS = ('delta', 'name')
+
+# Rows are matched on Equipment Name. A name that appears more than once is
+# matched by order of appearance, so the merge never multiplies rows.
+# dataset1 is the baseline: "added" rows exist only in dataset2, and deltas
+# are dataset2 minus dataset1.
+
+
+def _positive_int(value, default):
+    if value in (None, ''):
+        return default
+    number = int(value)
+    if number < 1:
+        raise ValueError
+    return number
+
+
+def parse_equipment_diff_params(data):
+    try:
+        page = _positive_int(data.get('page'), 1)
+        page_size = _positive_int(data.get('page_size'), EQUIPMENT_DIFF_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise ValidationError(ERROR_MESSAGES['invalid_page'].format(max_page_size=MAX_EQUIPMENT_DIFF_PAGE_SIZE))
+    if page_size > MAX_EQUIPMENT_DIFF_PAGE_SIZE:
+        raise ValidationError(ERROR_MESSAGES['invalid_page'].format(max_page_size=MAX_EQUIPMENT_DIFF_PAGE_SIZE))
+
+    try:
+        threshold = float(data.get('threshold') or 0)
+    except (TypeError, ValueError):
+        threshold = -1
+    if not threshold >= 0:
+        raise ValidationError(ERROR_MESSAGES['invalid_threshold'])
+
+    sort = data.get('sort') or 'delta'
+    if sort not in EQUIPMENT_DIFF_SORTS:
+        raise ValidationError(ERROR_MESSAGES['invalid_sort'].format(sorts=', '.join(EQUIPMENT_DIFF_SORTS)))
+
+    parameter = data.get('parameter') or None
+    if parameter is not None and parameter not in NUMERIC_COLUMNS:
+        raise ValidationError(ERROR_MESSAGES['unknown_columns'].format(cols=parameter))
+
+    statuses = data.get('status') or EQUIPMENT_DIFF_STATUSES
+    if isinstance(statuses, str):
+        statuses = [statuses]
+    unknown_statuses = [value for value in statuses if value not in EQUIPMENT_DIFF_STATUSES]
+    if unknown_statuses:
+        raise ValidationError(ERROR_MESSAGES['invalid_status'].format(statuses=', '.join(EQUIPMENT_DIFF_STATUSES)))
+
+    return {
+        'page': page,
+        'page_size': page_size,
+        'threshold': threshold,
+        'sort': sort,
+        'parameter': parameter,
+        'statuses': list(dict.fromkeys(statuses)),
+    }
+
+
+def _shared_codes(column1, column2):
+    # Recodes both columns onto one list of values so they compare as integers.
+    # Missing values get their own last entry, None, so they never borrow
+    # another value's code.
+    column1, column2 = pd.Categorical(column1), pd.Categorical(column2)
+    categories1 = column1.categories.to_numpy(dtype=object)
+    categories2 = column2.categories.to_numpy(dtype=object)
+    remap = pd.Index(categories1, dtype=object).get_indexer(categories2)
+    new_values = remap < 0
+    remap[new_values] = len(categories1) + np.arange(new_values.sum())
+    values = np.concatenate([categories1, categories2[new_values], [None]])
+    missing = len(values) - 1
+    # Code -1 indexes the appended last entry.
+    codes1 = np.append(np.arange(len(categories1)), missing)[column1.codes]
+    codes2 = np.append(remap, missing)[column2.codes]
+    return codes1, codes2, values
+
+
+def _row_keys(name_codes):
+    # A key packs the name's code with how many times the name has already
+    # appeared in that dataset.
+    occurrences = [pd.Series(codes).groupby(codes, sort=False).cumcount().to_numpy() for codes in name_codes]
+    stride = max((int(part.max()) + 1 for part in occurrences if len(part)), default=1)
+    return [codes * stride + part for codes, part in zip(name_codes, occurrences)], stride
+
+
+def _aligned(values, rows, missing):
+    # rows holds -1 where the other dataset has no matching row.
+    aligned = values[np.maximum(rows, 0)]
+    aligned[rows < 0] = missing
+    return aligned
+
+
+def _nullable(value):
+    return None if pd.isna(value) else value
+
+
+def equipment_diff(dataset1, dataset2, page=1, page_size=EQUIPMENT_DIFF_PAGE_SIZE, threshold=0.0,
+                   sort='delta', parameter=None, statuses=EQUIPMENT_DIFF_STATUSES):
+    frame1 = dataset1.equipment_frame()
+    frame2 = dataset2.equipment_frame()
+    *name_codes, names = _shared_codes(frame1['Equipment Name'], frame2['Equipment Name'])
+    (keys1, keys2), stride = _row_keys(name_codes)
+    merged = pd.DataFrame({'key': keys1, 'row': np.arange(len(keys1))}).merge(
+        pd.DataFrame({'key': keys2, 'row': np.arange(len(keys2))}),
+        on='key', how='outer', suffixes=('_1', '_2'), sort=False,
+    )
+    rows1 = merged['row_1'].fillna(-1).to_numpy(dtype=np.int64)
+    rows2 = merged['row_2'].fillna(-1).to_numpy(dtype=np.int64)
+    values1 = _aligned(frame1[NUMERIC_COLUMNS].to_numpy(dtype=np.float64), rows1, np.nan)
+    values2 = _aligned(frame2[NUMERIC_COLUMNS].to_numpy(dtype=np.float64), rows2, np.nan)
+    type_codes1, type_codes2, types = _shared_codes(frame1['Type'], frame2['Type'])
+    types1 = _aligned(type_codes1, rows1, -1)
+    types2 = _aligned(type_codes2, rows2, -1)
+    deltas = values2 - values1
+
+    # Magnitude is the largest absolute delta, or the chosen parameter's; it
+    # is NaN for added and removed rows. A changed Type also counts as a change.
+    compared = deltas if parameter is None else deltas[:, [NUMERIC_COLUMNS.index(parameter)]]
+    magnitude = np.abs(compared).max(axis=1)
+    status_codes = np.select(
+        [rows1 < 0, rows2 < 0, (magnitude > threshold) | (types1 != types2)],
+        [0, 1, 2],
+        default=3,
+    )
+    status_names = (*EQUIPMENT_DIFF_STATUSES, 'unchanged')
+    summary = dict(zip(status_names, np.bincount(status_codes, minlength=len(status_names)).tolist()))
+
+    selected = np.flatnonzero(np.isin(status_codes, [EQUIPMENT_DIFF_STATUSES.index(value) for value in statuses]))
+    keys = merged['key'].to_numpy()
+    if sort == 'delta':
+        # argsort puts NaN last, so added and removed rows follow the changes.
+        order = np.argsort(-magnitude[selected], kind='stable')
+    else:
+        order = np.argsort(np.where(pd.isna(names), '', names)[keys[selected] // stride], kind='stable')
+    total = len(selected)
+    page_rows = selected[order][(page - 1) * page_size:page * page_size]
+
+    results = []
+    for row in page_rows.tolist():
+        results.append({
+            'name': names[keys[row] // stride],
+            'status': status_names[status_codes[row]],
+            'type': [types[code] if code >= 0 else None for code in (types1[row], types2[row])],
+            'values': {param: [_nullable(values1[row, i]), _nullable(values2[row, i])] for i, param in enumerate(NUMERIC_COLUMNS)},
+            'deltas': {param: _nullable(round(deltas[row, i], 4)) for i, param in enumerate(NUMERIC_COLUMNS)},
+            'magnitude': _nullable(round(magnitude[row], 4)),
+        })
+
+    return {
+        'summary': summary,
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'pages': -(-total // page_size),
+        'results': results,
+    }
@@ -0,0 +1,92 @@
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+from django.core.exceptions import ValidationError
+from rest_framework.negotiation import DefaultContentNegotiation
+
+from .constants import REQUIRED_COLUMNS, ERROR_MESSAGES
+from .streaming import ChunkBuffer
+
+EXPORT_BATCH_ROWS = 10_000
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+# to_json defaults to 10 significant digits, which would round stored values.
+JSON_DOUBLE_PRECISION = 15
+
+
+class ExportContentNegotiation(DefaultContentNegotiation):
+    # ?format= names the export file type, so it must not select a DRF
+    # renderer; error responses are always rendered as JSON.
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+def parse_export_params(query_params):
+    export_format = query_params.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationError(ERROR_MESSAGES['invalid_export_format'].format(formats=', '.join(EXPORT_FORMATS)))
+    if export_format == 'parquet' and pyarrow is None:
+        raise ValidationError(ERROR_MESSAGES['parquet_export_unavailable'])
+
+    columns = REQUIRED_COLUMNS
+    if query_params.get('columns'):
+        columns = list(dict.fromkeys(col.strip() for col in query_params['columns'].split(',')))
+        unknown_columns = [col for col in columns if col not in REQUIRED_COLUMNS]
+        if unknown_columns:
+            raise ValidationError(ERROR_MESSAGES['unknown_columns'].format(cols=', '.join(unknown_columns)))
+    return export_format, columns, query_params.getlist('type')
+
+
+def export_frame(dataset, columns, types):
+    # Exports read the columnar copy, where numeric columns are always float64,
+    # so an integer in the upload is written back as a float.
+    load_columns = columns if not types or 'Type' in columns else [*columns, 'Type']
+    equipment_df = dataset.equipment_frame(load_columns)
+    if types:
+        equipment_df = equipment_df[equipment_df['Type'].isin(types)]
+    return equipment_df[columns]
+
+
+def _batches(equipment_df):
+    for start in range(0, len(equipment_df), EXPORT_BATCH_ROWS):
+        yield equipment_df.iloc[start:start + EXPORT_BATCH_ROWS]
+
+
+def csv_chunks(equipment_df):
+    yield equipment_df.iloc[:0].to_csv(index=False)
+    for batch in _batches(equipment_df):
+        yield batch.to_csv(index=False, header=False)
+
+
+def jsonl_chunks(equipment_df):
+    for batch in _batches(equipment_df):
+        lines = batch.to_json(orient='records', lines=True, double_precision=JSON_DOUBLE_PRECISION)
+        yield lines if lines.endswith('\n') else lines + '\n'
+
+
+def parquet_chunks(equipment_df):
+    # One row group per batch; each is flushed to the response once written.
+    buffer = ChunkBuffer()
+    schema = pyarrow.Schema.from_pandas(equipment_df, preserve_index=False)
+    with pyarrow.parquet.ParquetWriter(buffer, schema) as writer:
+        for batch in _batches(equipment_df):
+            writer.write_table(pyarrow.Table.from_pandas(batch, schema=schema, preserve_index=False))
+            yield from buffer.drain()
+    yield from buffer.drain()
+
+
+EXPORT_WRITERS = {
+    'csv': csv_chunks,
+    'jsonl': jsonl_chunks,
+    'parquet': parquet_chunks,
+}
+
+
+def stream_export(equipment_df, export_format):
+    return EXPORT_WRITERS[export_format](equipment_df)
@@ -0,0 +1,380 @@
+import codecs
+import hashlib
+import math
+import zlib
+
+import pandas as pd
+try:
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .columnar import ColumnarBuilder
+from .csv_parsers import open_arrow_csv, read_pandas_csv, resolve_engine
+from .constants import NUMERIC_COLUMNS, MAX_UPLOAD_SIZE, PAYLOAD_COMPRESSION_LEVEL, ERROR_MESSAGES
+from .models import EquipmentDataset, EquipmentDatasetBlob
+from .retention import schedule_history_sweep
+from .statistics import describe_values
+from .validators import ContentErrors, validate_csv_structure, validate_upload_size
+
+INGEST_CHUNK_SIZE = 64 * 1024
+INGEST_CHUNK_ROWS = 50_000
+GZIP_MAGIC = b'\x1f\x8b'
+GZIP_WBITS = zlib.MAX_WBITS | 16
+PARQUET_MAGIC = b'PAR1'
+ARROW_MAGIC = b'ARROW1'
+
+
+def _read_magic(uploaded_file, length):
+    uploaded_file.seek(0)
+    magic = uploaded_file.read(length)
+    uploaded_file.seek(0)
+    return magic
+
+
+def is_gzip_file(uploaded_file):
+    return _read_magic(uploaded_file, len(GZIP_MAGIC)) == GZIP_MAGIC
+
+
+def sniff_table_format(uploaded_file):
+    magic = _read_magic(uploaded_file, len(ARROW_MAGIC))
+    if magic.startswith(PARQUET_MAGIC):
+        return 'parquet'
+    if magic == ARROW_MAGIC:
+        return 'arrow'
+    return None
+
+
+def gunzip_chunks(raw_chunks, chunk_size=INGEST_CHUNK_SIZE, max_size=MAX_UPLOAD_SIZE):
+    # Output is capped per call so a small, highly compressed input cannot
+    # expand in memory before its decompressed size has been checked.
+    decompressor = zlib.decompressobj(GZIP_WBITS)
+    member_started = False
+    decompressed_size = 0
+    for pending in raw_chunks:
+        while True:
+            member_started = member_started or bool(pending)
+            data = decompressor.decompress(pending, chunk_size)
+            pending = decompressor.unconsumed_tail
+            if decompressor.eof:
+                pending = decompressor.unused_data
+                decompressor = zlib.decompressobj(GZIP_WBITS)
+                member_started = False
+            decompressed_size += len(data)
+            validate_upload_size(decompressed_size, max_size)
+            if data:
+                yield data
+            if not pending and len(data) < chunk_size:
+                break
+    if member_started:
+        raise zlib.error('Truncated gzip stream')
+
+
+class UploadByteStream:
+    # Parsers pull the upload through read(), so it is never held in memory
+    # in one go. The raw bytes are compressed on the way through for
+    # storage; gzip uploads are inflated first so the stored payload is
+    # always plain CSV.
+    _empty = b''
+
+    def __init__(self, uploaded_file, chunk_size=INGEST_CHUNK_SIZE):
+        gzipped = is_gzip_file(uploaded_file)
+        self._chunks = uploaded_file.chunks(chunk_size)
+        if gzipped:
+            self._chunks = gunzip_chunks(self._chunks, chunk_size)
+        self._compressor = zlib.compressobj(PAYLOAD_COMPRESSION_LEVEL)
+        self._utf8_decoder = codecs.getincrementaldecoder('utf-8')()
+        self._compressed_parts = []
+        self._pending = []
+        self._pending_size = 0
+        self._exhausted = False
+        self.closed = False
+
+    def _next_chunk(self):
+        raw_chunk = next(self._chunks, None)
+        if raw_chunk is None:
+            self._exhausted = True
+            return b''
+        self._compressed_parts.append(self._compressor.compress(raw_chunk))
+        return raw_chunk
+
+    def _fill(self):
+        # Arrow only checks UTF-8 inside string columns, so every byte is
+        # checked here to fail on bad encoding the way the pandas path does.
+        raw_chunk = self._next_chunk()
+        self._utf8_decoder.decode(raw_chunk, final=self._exhausted)
+        self._append(raw_chunk)
+
+    def _append(self, data):
+        if data:
+            self._pending.append(data)
+            self._pending_size += len(data)
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        while not self._exhausted and (size < 0 or self._pending_size < size):
+            self._fill()
+        data = self._empty.join(self._pending)
+        self._pending, self._pending_size = [], 0
+        if 0 <= size < len(data):
+            data, rest = data[:size], data[size:]
+            self._append(rest)
+        return data
+
+    def compressed_payload(self):
+        for raw_chunk in self._chunks:
+            self._compressed_parts.append(self._compressor.compress(raw_chunk))
+        self._exhausted = True
+        self._compressed_parts.append(self._compressor.flush())
+        return b''.join(self._compressed_parts)
+
+
+class DecodedUploadStream(UploadByteStream):
+    # Text view of the upload for the pandas parser, decoded incrementally.
+    _empty = ''
+
+    def __init__(self, uploaded_file, chunk_size=INGEST_CHUNK_SIZE, encoding='utf-8'):
+        super().__init__(uploaded_file, chunk_size)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+
+    def _fill(self):
+        raw_chunk = self._next_chunk()
+        self._append(self._decoder.decode(raw_chunk, final=self._exhausted))
+
+    def __iter__(self):
+        # Lines are cut as chunks are decoded, so iterating holds one chunk
+        # plus the line that straddles it, never the whole upload.
+        partial_line = ''
+        while self._pending or not self._exhausted:
+            if not self._pending:
+                self._fill()
+                continue
+            lines = (partial_line + self._empty.join(self._pending)).split('\n')
+            self._pending, self._pending_size = [], 0
+            partial_line = lines.pop()
+            for line in lines:
+                yield line + '\n'
+        if partial_line:
+            yield partial_line
+
+
+class DatasetAggregator:
+
+    def __init__(self):
+        self.total_count = 0
+        self.column_sums = {col: [] for col in NUMERIC_COLUMNS}
+        self.type_counts = {}
+        self.statistics = {}
+
+    def update(self, chunk_df):
+        if chunk_df.empty:
+            return
+        self.total_count += len(chunk_df)
+        for col in NUMERIC_COLUMNS:
+            self.column_sums[col].append(float(chunk_df[col].sum()))
+        # Walk types in order of first appearance, whatever the column dtype,
+        # so ties in type_distribution() keep file order. Keys are strings,
+        # since Parquet and Arrow files can carry a numeric Type column.
+        type_counts = chunk_df['Type'].value_counts(sort=False)
+        for type_name in chunk_df['Type'].dropna().unique():
+            type_key = str(type_name)
+            self.type_counts[type_key] = self.type_counts.get(type_key, 0) + int(type_counts[type_name])
+
+    def mean(self, col):
+        return math.fsum(self.column_sums[col]) / self.total_count
+
+    def describe(self, columnar_builder):
+        # Quartiles and std need every value; the typed arrays are already
+        # held for the columnar payload, so they are computed from those.
+        self.statistics = {
+            col: describe_values(columnar_builder.numeric_array(col), mean=self.mean(col))
+            for col in NUMERIC_COLUMNS
+        }
+
+    def type_distribution(self):
+        return dict(sorted(self.type_counts.items(), key=lambda item: item[1], reverse=True))
+
+    def as_model_fields(self):
+        return {
+            'total_count': self.total_count,
+            'avg_flowrate': round(self.mean('Flowrate'), 2),
+            'avg_pressure': round(self.mean('Pressure'), 2),
+            'avg_temperature': round(self.mean('Temperature'), 2),
+            'type_distribution': self.type_distribution(),
+            'statistics': self.statistics,
+        }
+
+
+def _ingest_frames(chunk_frames):
+    aggregator = DatasetAggregator()
+    columnar_builder = ColumnarBuilder()
+    content_errors = ContentErrors()
+    chunk_index = -1
+    for chunk_index, chunk_df in enumerate(chunk_frames):
+        if chunk_index == 0:
+            validate_csv_structure(chunk_df)
+        content_errors.add(chunk_df)
+        if not content_errors:
+            aggregator.update(chunk_df)
+            columnar_builder.add(chunk_df)
+    if chunk_index < 0:
+        raise ValidationError(ERROR_MESSAGES['empty_file'])
+    content_errors.raise_if_any()
+    aggregator.describe(columnar_builder)
+    return aggregator, columnar_builder
+
+
+def ingest_uploaded_csv(uploaded_file, chunk_rows=INGEST_CHUNK_ROWS, engine=None):
+    if resolve_engine(engine) == 'pyarrow':
+        byte_stream = UploadByteStream(uploaded_file)
+        try:
+            aggregator, columnar_builder = _ingest_frames(record_batch_frames(open_arrow_csv(byte_stream)))
+            return aggregator, byte_stream.compressed_payload(), columnar_builder.to_bytes()
+        except (ValidationError, UnicodeDecodeError):
+            raise
+        except pyarrow.ArrowException:
+            # Anything the typed reader rejects is parsed again by pandas, so
+            # error messages (offending rows, encoding) match either engine.
+            pass
+
+    csv_stream = DecodedUploadStream(uploaded_file)
+    aggregator, columnar_builder = _ingest_frames(read_pandas_csv(csv_stream, chunk_rows))
+    return aggregator, csv_stream.compressed_payload(), columnar_builder.to_bytes()
+
+
+def record_batch_frames(record_batches, max_size=None):
+    # Frames keep a running index so error rows match the file.
+    decoded_size = 0
+    row_offset = 0
+    for record_batch in record_batches:
+        decoded_size += record_batch.nbytes
+        if max_size is not None:
+            validate_upload_size(decoded_size, max_size)
+        chunk_df = record_batch.to_pandas()
+        chunk_df.index = pd.RangeIndex(row_offset, row_offset + len(chunk_df))
+        row_offset += len(chunk_df)
+        yield chunk_df
+
+
+def _table_record_batches(uploaded_file, table_format, chunk_rows):
+    if pyarrow is None:
+        raise ValidationError(ERROR_MESSAGES['pyarrow_required'])
+    uploaded_file.seek(0)
+    if table_format == 'parquet':
+        return pyarrow.parquet.ParquetFile(uploaded_file).iter_batches(batch_size=chunk_rows)
+    ipc_reader = pyarrow.ipc.open_file(uploaded_file)
+    return (ipc_reader.get_batch(i) for i in range(ipc_reader.num_record_batches))
+
+
+def ingest_uploaded_table(uploaded_file, table_format, chunk_rows=INGEST_CHUNK_ROWS):
+    # Typed input skips text parsing entirely; no CSV payload is kept since
+    # the columnar payload already holds every value.
+    # Columnar files are usually compressed, so their decoded size is capped like gzip input.
+    record_batches = _table_record_batches(uploaded_file, table_format, chunk_rows)
+    aggregator, columnar_builder = _ingest_frames(record_batch_frames(record_batches, max_size=MAX_UPLOAD_SIZE))
+    return aggregator, b'', columnar_builder.to_bytes()
+
+
+def ingest_uploaded_file(uploaded_file, chunk_rows=INGEST_CHUNK_ROWS):
+    table_format = sniff_table_format(uploaded_file)
+    if table_format is not None:
+        return ingest_uploaded_table(uploaded_file, table_format, chunk_rows)
+    return ingest_uploaded_csv(uploaded_file, chunk_rows)
+
+
+class IngestError(Exception):
+    pass
+
+
+def ingest_error_message(error):
+    if isinstance(error, UnicodeDecodeError):
+        return 'File encoding must be UTF-8'
+    if isinstance(error, ValidationError):
+        return str(error)
+    return 'Failed to parse uploaded file'
+
+
+def file_sha256(uploaded_file):
+    digest = hashlib.sha256()
+    for chunk in uploaded_file.chunks(INGEST_CHUNK_SIZE):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def create_dataset(user, csv_payload, columnar_payload, **dataset_fields):
+    blob = EquipmentDatasetBlob.objects.create(csv_payload=csv_payload, columnar_payload=columnar_payload)
+    return EquipmentDataset.objects.create(user=user, blob=blob, **dataset_fields)
+
+
+def store_dataset(user, **dataset_fields):
+    with transaction.atomic():
+        new_dataset = create_dataset(user, **dataset_fields)
+        schedule_history_sweep(user)
+    return new_dataset
+
+
+def reuse_duplicate_dataset(user, filename, content_digest):
+    own_dataset = EquipmentDataset.objects.filter(user=user, content_digest=content_digest).first()
+    if own_dataset is not None:
+        # Re-uploading a file the user already has just moves it to the top of their history.
+        EquipmentDataset.objects.filter(pk=own_dataset.pk).update(uploaded_at=timezone.now(), filename=filename)
+        own_dataset.refresh_from_db()
+        return own_dataset
+
+    source_dataset = EquipmentDataset.objects.filter(content_digest=content_digest, blob__isnull=False).first()
+    if source_dataset is None:
+        return None
+    # The new dataset points at the source's blob instead of copying its payloads.
+    return EquipmentDataset.objects.create(
+        user=user,
+        blob_id=source_dataset.blob_id,
+        filename=filename,
+        content_digest=content_digest,
+        total_count=source_dataset.total_count,
+        avg_flowrate=source_dataset.avg_flowrate,
+        avg_pressure=source_dataset.avg_pressure,
+        avg_temperature=source_dataset.avg_temperature,
+        type_distribution=source_dataset.type_distribution,
+        statistics=source_dataset.statistics,
+    )
+
+
+def parse_spooled_upload(spool_path):
+    # Pool task for batch uploads: parses and validates only, so the caller
+    # can store every file of the batch in one transaction.
+    try:
+        with open(spool_path, 'rb') as spool_file:
+            dataset_aggregator, csv_payload, columnar_payload = ingest_uploaded_file(File(spool_file))
+    except Exception as ingest_error:
+        return None, ingest_error_message(ingest_error)
+    return {'csv_payload': csv_payload, 'columnar_payload': columnar_payload, **dataset_aggregator.as_model_fields()}, None
+
+
+def ingest_and_store(user, uploaded_file, filename, content_digest=None):
+    content_digest = content_digest or file_sha256(uploaded_file)
+    with transaction.atomic():
+        duplicate_dataset = reuse_duplicate_dataset(user, filename, content_digest)
+        if duplicate_dataset is not None:
+            schedule_history_sweep(user)
+            return duplicate_dataset
+
+    try:
+        dataset_aggregator, csv_payload, columnar_payload = ingest_uploaded_file(uploaded_file)
+    except Exception as ingest_error:
+        raise IngestError(ingest_error_message(ingest_error)) from ingest_error
+
+    return store_dataset(
+        user,
+        filename=filename,
+        content_digest=content_digest,
+        csv_payload=csv_payload,
+        columnar_payload=columnar_payload,
+        **dataset_aggregator.as_model_fields()
+    )
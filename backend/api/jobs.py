@@ -0,0 +1,135 @@
+import os
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+
+from .constants import ERROR_MESSAGES
+from .ingest import IngestError, ingest_and_store
+from .models import Job
+from .report_cache import cached_report_path, report_cache_path
+from .report_render import ReportRenderError
+from .reports import report_row_count
+from .worker_pool import submit_task
+
+# Render progress is written at most this often, not once per page.
+REPORT_PROGRESS_INTERVAL = 1.0
+ACTIVE_JOB_STATUSES = (Job.STATUS_QUEUED, Job.STATUS_RUNNING)
+
+# Jobs live in an in-memory pool, so a crashed worker or a restart loses them
+# without a trace. A job that has not been updated for JOB_STALE_TIMEOUT
+# seconds is treated as lost and failed; finished jobs are deleted after
+# JOB_RETENTION_DAYS.
+
+
+def spool_upload(uploaded_file):
+    spool_dir = settings.UPLOAD_SPOOL_DIR
+    spool_dir.mkdir(parents=True, exist_ok=True)
+    spool_path = spool_dir / f'{uuid.uuid4()}.upload'
+    with open(spool_path, 'wb') as spool_file:
+        for chunk in uploaded_file.chunks():
+            spool_file.write(chunk)
+    return spool_path
+
+
+def enqueue_upload_job(user, filename, spool_path):
+    prune_finished_jobs(Job.objects.filter(user=user))
+    upload_job = Job.objects.create(user=user, filename=filename, spool_path=str(spool_path))
+    submit_task('api.jobs.run_upload_job', upload_job.id)
+    upload_job.refresh_from_db()
+    return upload_job
+
+
+def _finish_job(upload_job, job_status, **fields):
+    upload_job.status = job_status
+    for name, value in fields.items():
+        setattr(upload_job, name, value)
+    upload_job.save()
+
+
+def run_upload_job(job_id):
+    upload_job = Job.objects.select_related('user').get(pk=job_id)
+    upload_job.status = Job.STATUS_RUNNING
+    upload_job.save(update_fields=['status', 'updated_at'])
+
+    try:
+        with open(upload_job.spool_path, 'rb') as spool_file:
+            new_dataset = ingest_and_store(upload_job.user, File(spool_file, name=upload_job.filename), upload_job.filename)
+    except IngestError as ingest_error:
+        _finish_job(upload_job, Job.STATUS_FAILED, error=str(ingest_error))
+        return
+    except Exception:
+        _finish_job(upload_job, Job.STATUS_FAILED, error='Failed to store dataset')
+        raise
+    finally:
+        if os.path.exists(upload_job.spool_path):
+            os.remove(upload_job.spool_path)
+    _finish_job(upload_job, Job.STATUS_SUCCEEDED, dataset=new_dataset)
+
+
+def enqueue_report_job(user, dataset):
+    prune_finished_jobs(Job.objects.filter(user=user))
+    report_job = Job.objects.create(
+        user=user, kind=Job.KIND_REPORT, filename=f'report_{dataset.id}.pdf', dataset=dataset,
+        progress={'pages': 0, 'rows': 0, 'total_rows': report_row_count(dataset.total_count)},
+    )
+    if report_cache_path(dataset).exists():
+        _finish_job(report_job, Job.STATUS_SUCCEEDED)
+        return report_job
+    submit_task('api.jobs.run_report_job', report_job.id)
+    report_job.refresh_from_db()
+    return report_job
+
+
+def run_report_job(job_id):
+    report_job = Job.objects.select_related('dataset').get(pk=job_id)
+    if report_job.dataset is None:
+        _finish_job(report_job, Job.STATUS_FAILED, error='Dataset not found')
+        return
+    report_job.status = Job.STATUS_RUNNING
+    report_job.save(update_fields=['status', 'updated_at'])
+
+    last_saved = time.monotonic()
+
+    def save_progress(pages, rows):
+        nonlocal last_saved
+        report_job.progress.update(pages=pages, rows=rows)
+        if time.monotonic() - last_saved >= REPORT_PROGRESS_INTERVAL:
+            Job.objects.filter(pk=job_id).update(progress=report_job.progress, updated_at=timezone.now())
+            last_saved = time.monotonic()
+
+    try:
+        cached_report_path(report_job.dataset, progress=save_progress)
+    except ReportRenderError as render_error:
+        _finish_job(report_job, Job.STATUS_FAILED, error=str(render_error))
+        return
+    except Exception:
+        _finish_job(report_job, Job.STATUS_FAILED, error='Report generation failed')
+        raise
+    _finish_job(report_job, Job.STATUS_SUCCEEDED)
+
+
+def fail_stale_jobs(jobs=None):
+    jobs = Job.objects.all() if jobs is None else jobs
+    stale_jobs = jobs.filter(
+        status__in=ACTIVE_JOB_STATUSES,
+        updated_at__lt=timezone.now() - timedelta(seconds=settings.JOB_STALE_TIMEOUT),
+    )
+    stale_spool_paths = [path for path in stale_jobs.values_list('spool_path', flat=True) if path]
+    failed = stale_jobs.update(status=Job.STATUS_FAILED, error=ERROR_MESSAGES['job_lost'], updated_at=timezone.now())
+    for spool_path in stale_spool_paths:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+    return failed
+
+
+def prune_finished_jobs(jobs=None):
+    jobs = Job.objects.all() if jobs is None else jobs
+    expired_jobs = jobs.exclude(status__in=ACTIVE_JOB_STATUSES).filter(
+        updated_at__lt=timezone.now() - timedelta(days=settings.JOB_RETENTION_DAYS),
+    )
+    removed, _ = expired_jobs.delete()
+    return removed
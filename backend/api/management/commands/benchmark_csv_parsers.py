@@ -0,0 +1,50 @@
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+
+from api.csv_parsers import CSV_PARSER_ENGINES, read_csv_frame, resolve_engine
+from api.ingest import ingest_uploaded_csv
+
+EQUIPMENT_TYPES = np.array(['Pump', 'Valve', 'Heat Exchanger', 'Compressor', 'Reactor', 'Condenser'])
+
+
+def synthetic_csv(row_count, seed=0):
+    rng = np.random.default_rng(seed)
+    equipment_df = pd.DataFrame({
+        'Equipment Name': [f'Unit-{i}' for i in range(row_count)],
+        'Type': EQUIPMENT_TYPES[rng.integers(0, len(EQUIPMENT_TYPES), row_count)],
+        'Flowrate': rng.uniform(50, 250, row_count).round(2),
+        'Pressure': rng.uniform(1, 12, row_count).round(2),
+        'Temperature': rng.uniform(20, 180, row_count).round(1),
+    })
+    return equipment_df.to_csv(index=False).encode('utf-8')
+
+
+def best_time(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+class Command(BaseCommand):
+    help = 'Compare CSV parser engines on synthetic equipment files.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        engines = [engine for engine in CSV_PARSER_ENGINES if resolve_engine(engine) == engine]
+        self.stdout.write(f"{'rows':>10} {'MB':>7} {'engine':>8} {'ingest s':>9} {'read s':>8}")
+        for row_count in options['rows']:
+            csv_bytes = synthetic_csv(row_count)
+            for engine in engines:
+                ingest_seconds = best_time(lambda: ingest_uploaded_csv(SimpleUploadedFile('bench.csv', csv_bytes), engine=engine), options['repeat'])
+                read_seconds = best_time(lambda: read_csv_frame(csv_bytes, engine=engine), options['repeat'])
+                self.stdout.write(f'{row_count:>10} {len(csv_bytes) / 1e6:>7.1f} {engine:>8} {ingest_seconds:>9.3f} {read_seconds:>8.3f}')
@@ -0,0 +1,54 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.columnar import frame_to_columnar
+from api.constants import NUMERIC_COLUMNS
+from api.csv_parsers import read_csv_frame
+from api.report_render import ReportSource
+from api.reports import build_report
+from api.statistics import describe_frame
+
+from .benchmark_csv_parsers import synthetic_csv
+
+
+def synthetic_report_source(row_count):
+    equipment_df = read_csv_frame(synthetic_csv(row_count))
+    column_stats = describe_frame(equipment_df, NUMERIC_COLUMNS)
+    fields = {
+        'id': 1,
+        'filename': 'bench.csv',
+        'uploaded_at': timezone.now(),
+        'total_count': row_count,
+        'avg_flowrate': column_stats['Flowrate']['mean'],
+        'avg_pressure': column_stats['Pressure']['mean'],
+        'avg_temperature': column_stats['Temperature']['mean'],
+        'statistics': column_stats,
+        'type_distribution': {str(k): int(v) for k, v in equipment_df['Type'].value_counts().items()},
+    }
+    return ReportSource(fields, frame_to_columnar(equipment_df))
+
+
+class Command(BaseCommand):
+    help = 'Measure per-report PDF build time on small synthetic datasets.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[5, 15, 50, 200])
+        parser.add_argument('--reports', type=int, default=50)
+        parser.add_argument('--repeat', type=int, default=3)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"{'rows':>6} {'ms/report':>10} {'reports/s':>10}")
+        for row_count in options['rows']:
+            report_source = synthetic_report_source(row_count)
+            build_report(report_source, io.BytesIO(), row_count=row_count)
+            timings = []
+            for _ in range(options['repeat']):
+                started = time.perf_counter()
+                for _ in range(options['reports']):
+                    build_report(report_source, io.BytesIO(), row_count=row_count)
+                timings.append((time.perf_counter() - started) / options['reports'])
+            best = min(timings)
+            self.stdout.write(f'{row_count:>6} {best * 1000:>10.2f} {1 / best:>10.1f}')
@@ -0,0 +1,30 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.constants import HISTORY_LIMIT
+from api.models import HistoryQuota
+
+
+class Command(BaseCommand):
+    help = 'Set how many datasets a user keeps in their history.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('limit', help=f'Number of datasets, or "default" for HISTORY_LIMIT ({HISTORY_LIMIT}).')
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options['username']).first()
+        if user is None:
+            raise CommandError(f"User {options['username']} does not exist")
+        if options['limit'] == 'default':
+            HistoryQuota.objects.filter(user=user).delete()
+            self.stdout.write(f'{user.username} now uses the default limit of {HISTORY_LIMIT}')
+            return
+        try:
+            history_limit = int(options['limit'])
+        except ValueError:
+            raise CommandError('limit must be a non-negative integer or "default"')
+        if history_limit < 0:
+            raise CommandError('limit must be a non-negative integer or "default"')
+        HistoryQuota.objects.update_or_create(user=user, defaults={'history_limit': history_limit})
+        self.stdout.write(f'{user.username} now keeps {history_limit} dataset(s)')
@@ -0,0 +1,21 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.retention import sweep_history, sweep_user_history
+
+
+class Command(BaseCommand):
+    help = 'Delete datasets beyond each user\'s history quota.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help='Only sweep this username.')
+
+    def handle(self, *args, **options):
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f"User {options['user']} does not exist")
+            removed = sweep_user_history(user.id)
+        else:
+            removed = sweep_history()
+        self.stdout.write(f'Removed {removed} dataset(s)')
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from api.jobs import fail_stale_jobs, prune_finished_jobs
+
+
+class Command(BaseCommand):
+    help = 'Fail background jobs that stopped reporting and delete old finished jobs.'
+
+    def handle(self, *args, **options):
+        failed = fail_stale_jobs()
+        removed = prune_finished_jobs()
+        self.stdout.write(f'Failed {failed} stale job(s), removed {removed} finished job(s)')
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.upload_sessions import expire_upload_sessions
+
+
+class Command(BaseCommand):
+    help = 'Delete chunked upload sessions that stopped receiving chunks, with their partial files.'
+
+    def handle(self, *args, **options):
+        removed = expire_upload_sessions()
+        self.stdout.write(f'Removed {removed} upload session(s)')
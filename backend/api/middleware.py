@@ -0,0 +1,45 @@
+import tempfile
+import zlib
+
+from django.core.exceptions import ValidationError
+from django.core.handlers.wsgi import LimitedStream
+from django.http import JsonResponse
+
+from .constants import MAX_UPLOAD_SIZE, ERROR_MESSAGES
+from .ingest import INGEST_CHUNK_SIZE, gunzip_chunks
+
+# Room for multipart boundaries and form fields around the file itself;
+# the file part is checked against MAX_UPLOAD_SIZE again by the view.
+GZIP_BODY_OVERHEAD = 64 * 1024
+GZIP_BODY_MEMORY_SIZE = 1024 * 1024
+
+
+class GzipRequestMiddleware:
+    # Bodies sent with Content-Encoding: gzip are inflated into a spooled
+    # temporary file before any parser sees them, so request.FILES and
+    # request.data work unchanged and the decompressed size is capped.
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.META.get('HTTP_CONTENT_ENCODING', '').strip().lower() != 'gzip':
+            return self.get_response(request)
+
+        with tempfile.SpooledTemporaryFile(max_size=GZIP_BODY_MEMORY_SIZE) as body_file:
+            raw_chunks = iter(lambda: request.read(INGEST_CHUNK_SIZE), b'')
+            try:
+                for data in gunzip_chunks(raw_chunks, max_size=MAX_UPLOAD_SIZE + GZIP_BODY_OVERHEAD):
+                    body_file.write(data)
+            except ValidationError as validation_error:
+                return JsonResponse({'error': validation_error.messages[0]}, status=400)
+            except zlib.error:
+                return JsonResponse({'error': ERROR_MESSAGES['invalid_gzip']}, status=400)
+
+            body_size = body_file.tell()
+            body_file.seek(0)
+            del request.META['HTTP_CONTENT_ENCODING']
+            request.META['CONTENT_LENGTH'] = str(body_size)
+            request._stream = LimitedStream(body_file, body_size)
+            request._read_started = False
+            return self.get_response(request)
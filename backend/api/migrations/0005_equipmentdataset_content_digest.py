@@ -0,0 +1,28 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:18
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def backfill_content_digest(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    for dataset in EquipmentDataset.objects.only('id', 'csv_data').iterator(chunk_size=100):
+        content_digest = hashlib.sha256(dataset.csv_data.encode('utf-8')).hexdigest()
+        EquipmentDataset.objects.filter(pk=dataset.pk).update(content_digest=content_digest)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_uploadsession'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='content_digest',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64),
+        ),
+        migrations.RunPython(backfill_content_digest, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+import zlib
+
+from django.db import migrations, models
+
+BATCH_SIZE = 100
+COMPRESSION_LEVEL = 6
+
+
+def compress_csv_data(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    dataset_ids = list(EquipmentDataset.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = list(EquipmentDataset.objects.filter(id__in=dataset_ids[start:start + BATCH_SIZE]).only('id', 'csv_data'))
+        for dataset in batch:
+            dataset.csv_payload = zlib.compress(dataset.csv_data.encode('utf-8'), COMPRESSION_LEVEL)
+        EquipmentDataset.objects.bulk_update(batch, ['csv_payload'])
+
+
+def decompress_csv_payload(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    dataset_ids = list(EquipmentDataset.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = list(EquipmentDataset.objects.filter(id__in=dataset_ids[start:start + BATCH_SIZE]).only('id', 'csv_payload'))
+        for dataset in batch:
+            dataset.csv_data = zlib.decompress(dataset.csv_payload).decode('utf-8')
+        EquipmentDataset.objects.bulk_update(batch, ['csv_data'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_equipmentdataset_content_digest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='csv_payload',
+            field=models.BinaryField(default=b''),
+            preserve_default=False,
+        ),
+        migrations.RunPython(compress_csv_data, decompress_csv_payload),
+        migrations.AlterField(
+            model_name='equipmentdataset',
+            name='csv_data',
+            field=models.TextField(default=''),
+        ),
+        migrations.RemoveField(
+            model_name='equipmentdataset',
+            name='csv_data',
+        ),
+    ]
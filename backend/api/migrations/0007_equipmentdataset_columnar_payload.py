@@ -0,0 +1,66 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:22
+
+import io
+import zipfile
+import zlib
+
+import numpy as np
+import pandas as pd
+from django.db import migrations, models
+
+BATCH_SIZE = 100
+
+# Frozen copy of the columnar format as of this migration, so later changes
+# to api.columnar cannot change what this migration writes.
+CATEGORICAL_COLUMNS = {
+    'Equipment Name': 'name',
+    'Type': 'type',
+}
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+def frame_to_columnar(equipment_df):
+    arrays = {}
+    for col, key in CATEGORICAL_COLUMNS.items():
+        values = equipment_df[col]
+        if not pd.api.types.is_string_dtype(values):
+            values = values.map(str, na_action='ignore')
+        codes, categories = pd.factorize(values)
+        arrays[f'{key}_codes'] = codes.astype(np.int32)
+        arrays[f'{key}_categories'] = np.frombuffer('\0'.join(categories.to_numpy(dtype=object)).encode('utf-8'), dtype=np.uint8)
+        arrays[f'{key}_count'] = np.array(len(categories))
+    for col in NUMERIC_COLUMNS:
+        arrays[col] = equipment_df[col].to_numpy(dtype=np.float64)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        for name, values in arrays.items():
+            with archive.open(f'{name}.npy', 'w', force_zip64=True) as entry:
+                np.lib.format.write_array(entry, values, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def build_columnar_payloads(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    dataset_ids = list(EquipmentDataset.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = list(EquipmentDataset.objects.filter(id__in=dataset_ids[start:start + BATCH_SIZE]).only('id', 'csv_payload'))
+        for dataset in batch:
+            equipment_df = pd.read_csv(io.BytesIO(zlib.decompress(dataset.csv_payload)))
+            dataset.columnar_payload = frame_to_columnar(equipment_df)
+        EquipmentDataset.objects.bulk_update(batch, ['columnar_payload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_compress_csv_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='columnar_payload',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+        migrations.RunPython(build_columnar_payloads, migrations.RunPython.noop),
+    ]
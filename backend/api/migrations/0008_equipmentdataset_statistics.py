@@ -0,0 +1,59 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:23
+
+import io
+
+import numpy as np
+from django.db import migrations, models
+
+BATCH_SIZE = 100
+
+# Frozen copies of the columnar reader and api.statistics as of this
+# migration, so later changes to the app cannot change what it computes.
+NUMERIC_COLUMNS = ['Flowrate', 'Pressure', 'Temperature']
+
+
+def describe_values(values):
+    if len(values) == 0:
+        return {'count': 0}
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean()),
+        'std': float(values.std(ddof=1)) if len(values) > 1 else None,
+        'min': float(values.min()),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'max': float(values.max()),
+    }
+
+
+def describe_columnar(columnar_payload):
+    with np.load(io.BytesIO(columnar_payload), allow_pickle=False) as arrays:
+        return {col: describe_values(np.asarray(arrays[col], dtype=np.float64)) for col in NUMERIC_COLUMNS}
+
+
+def compute_statistics(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    dataset_ids = list(EquipmentDataset.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = list(EquipmentDataset.objects.filter(id__in=dataset_ids[start:start + BATCH_SIZE]).only('id', 'columnar_payload'))
+        for dataset in batch:
+            dataset.statistics = describe_columnar(bytes(dataset.columnar_payload))
+        EquipmentDataset.objects.bulk_update(batch, ['statistics'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_equipmentdataset_columnar_payload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='statistics',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.RunPython(compute_statistics, migrations.RunPython.noop),
+    ]
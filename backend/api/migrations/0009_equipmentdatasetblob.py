@@ -0,0 +1,63 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 100
+
+
+def move_payloads_to_blobs(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    EquipmentDatasetBlob = apps.get_model('api', 'EquipmentDatasetBlob')
+    dataset_ids = list(EquipmentDataset.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = EquipmentDataset.objects.filter(id__in=dataset_ids[start:start + BATCH_SIZE]).only('id', 'csv_payload', 'columnar_payload')
+        EquipmentDatasetBlob.objects.bulk_create([
+            EquipmentDatasetBlob(dataset_id=dataset.id, csv_payload=dataset.csv_payload, columnar_payload=dataset.columnar_payload)
+            for dataset in batch
+        ])
+
+
+def move_blobs_to_payloads(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    EquipmentDatasetBlob = apps.get_model('api', 'EquipmentDatasetBlob')
+    dataset_ids = list(EquipmentDatasetBlob.objects.order_by('dataset_id').values_list('dataset_id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        blobs = {blob.dataset_id: blob for blob in EquipmentDatasetBlob.objects.filter(dataset_id__in=dataset_ids[start:start + BATCH_SIZE])}
+        batch = list(EquipmentDataset.objects.filter(id__in=blobs).only('id'))
+        for dataset in batch:
+            dataset.csv_payload = blobs[dataset.id].csv_payload
+            dataset.columnar_payload = blobs[dataset.id].columnar_payload
+        EquipmentDataset.objects.bulk_update(batch, ['csv_payload', 'columnar_payload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_equipmentdataset_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EquipmentDatasetBlob',
+            fields=[
+                ('dataset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='blob', serialize=False, to='api.equipmentdataset')),
+                ('csv_payload', models.BinaryField()),
+                ('columnar_payload', models.BinaryField(blank=True, default=b'')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='equipmentdataset',
+            name='csv_payload',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.RunPython(move_payloads_to_blobs, move_blobs_to_payloads),
+        migrations.RemoveField(
+            model_name='equipmentdataset',
+            name='columnar_payload',
+        ),
+        migrations.RemoveField(
+            model_name='equipmentdataset',
+            name='csv_payload',
+        ),
+    ]
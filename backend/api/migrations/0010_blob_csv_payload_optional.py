@@ -0,0 +1,18 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_equipmentdatasetblob'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='equipmentdatasetblob',
+            name='csv_payload',
+            field=models.BinaryField(blank=True, default=b''),
+        ),
+    ]
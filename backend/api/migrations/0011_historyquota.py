@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:44
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('api', '0010_blob_csv_payload_optional'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HistoryQuota',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='history_quota', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('history_limit', models.PositiveIntegerField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.11 on 2026-10-18 17:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_historyquota'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='kind',
+            field=models.CharField(choices=[('upload', 'Upload'), ('report', 'Report')], default='upload', max_length=16),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='progress',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
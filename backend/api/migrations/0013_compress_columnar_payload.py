@@ -0,0 +1,50 @@
+# Generated by Django 4.2.11 on 2026-10-18 19:40
+
+import io
+import zipfile
+
+import numpy as np
+from django.db import migrations
+
+BATCH_SIZE = 100
+
+
+# Frozen copy of the compressed columnar writer as of this migration.
+def compress_npz(payload):
+    buffer = io.BytesIO()
+    with np.load(io.BytesIO(payload), allow_pickle=False) as arrays:
+        with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+            for name in arrays.files:
+                with archive.open(f'{name}.npy', 'w', force_zip64=True) as entry:
+                    np.lib.format.write_array(entry, arrays[name], allow_pickle=False)
+    return buffer.getvalue()
+
+
+def is_stored(payload):
+    with zipfile.ZipFile(io.BytesIO(payload)) as archive:
+        return any(entry.compress_type == zipfile.ZIP_STORED for entry in archive.infolist())
+
+
+def compress_columnar_payloads(apps, schema_editor):
+    EquipmentDatasetBlob = apps.get_model('api', 'EquipmentDatasetBlob')
+    dataset_ids = list(EquipmentDatasetBlob.objects.exclude(columnar_payload=b'').order_by('dataset_id').values_list('dataset_id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = list(EquipmentDatasetBlob.objects.filter(dataset_id__in=dataset_ids[start:start + BATCH_SIZE]).only('dataset_id', 'columnar_payload'))
+        compressed = []
+        for blob in batch:
+            payload = bytes(blob.columnar_payload)
+            if is_stored(payload):
+                blob.columnar_payload = compress_npz(payload)
+                compressed.append(blob)
+        EquipmentDatasetBlob.objects.bulk_update(compressed, ['columnar_payload'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_job_kind_progress'),
+    ]
+
+    operations = [
+        migrations.RunPython(compress_columnar_payloads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 4.2.11 on 2026-10-18 21:05
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+BATCH_SIZE = 100
+
+
+def share_blobs(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    EquipmentDatasetBlob = apps.get_model('api', 'EquipmentDatasetBlob')
+    SharedBlob = apps.get_model('api', 'SharedBlob')
+    shared_by_digest = {}
+    dataset_ids = list(EquipmentDatasetBlob.objects.order_by('dataset_id').values_list('dataset_id', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = EquipmentDatasetBlob.objects.filter(dataset_id__in=dataset_ids[start:start + BATCH_SIZE]).select_related('dataset')
+        for blob in batch:
+            digest = blob.dataset.content_digest
+            shared_id = shared_by_digest.get(digest) if digest else None
+            if shared_id is None:
+                shared_id = SharedBlob.objects.create(csv_payload=blob.csv_payload, columnar_payload=blob.columnar_payload).pk
+                if digest:
+                    shared_by_digest[digest] = shared_id
+            EquipmentDataset.objects.filter(pk=blob.dataset_id).update(shared_blob_id=shared_id)
+
+
+def copy_blobs(apps, schema_editor):
+    EquipmentDataset = apps.get_model('api', 'EquipmentDataset')
+    EquipmentDatasetBlob = apps.get_model('api', 'EquipmentDatasetBlob')
+    dataset_ids = list(EquipmentDataset.objects.filter(shared_blob__isnull=False).order_by('pk').values_list('pk', flat=True))
+    for start in range(0, len(dataset_ids), BATCH_SIZE):
+        batch = EquipmentDataset.objects.filter(pk__in=dataset_ids[start:start + BATCH_SIZE]).select_related('shared_blob')
+        for dataset in batch:
+            EquipmentDatasetBlob.objects.create(
+                dataset=dataset,
+                csv_payload=dataset.shared_blob.csv_payload,
+                columnar_payload=dataset.shared_blob.columnar_payload,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_compress_columnar_payload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('csv_payload', models.BinaryField(blank=True, default=b'')),
+                ('columnar_payload', models.BinaryField(blank=True, default=b'')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='equipmentdataset',
+            name='shared_blob',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='datasets', to='api.sharedblob'),
+        ),
+        migrations.RunPython(share_blobs, copy_blobs),
+        migrations.DeleteModel(
+            name='EquipmentDatasetBlob',
+        ),
+        migrations.RenameModel(
+            old_name='SharedBlob',
+            new_name='EquipmentDatasetBlob',
+        ),
+        migrations.RenameField(
+            model_name='equipmentdataset',
+            old_name='shared_blob',
+            new_name='blob',
+        ),
+    ]
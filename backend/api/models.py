@@ -1,6 +1,15 @@
+import uuid
+import zlib
+
 from django.db import models
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.contrib.auth.models import User
 
+from .columnar import columnar_to_frame
+from .csv_parsers import read_csv_frame
+from .constants import PAYLOAD_COMPRESSION_LEVEL
+
 class EquipmentDataset(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=True)
     uploaded_at = models.DateTimeField(auto_now_add=True, db_index=True)
@@ -10,7 +19,90 @@ class EquipmentDataset(models.Model):
     avg_pressure = models.FloatField()
     avg_temperature = models.FloatField()
     type_distribution = models.JSONField()
-    csv_data = models.TextField()
+    statistics = models.JSONField(default=dict, blank=True)
+    content_digest = models.CharField(max_length=64, blank=True, default='', db_index=True)
+    blob = models.ForeignKey('EquipmentDatasetBlob', on_delete=models.PROTECT, null=True, related_name='datasets')
 
     class Meta:
         ordering = ['-uploaded_at']
+
+    def equipment_frame(self, columns=None):
+        return self.blob.equipment_frame(columns)
+
+
+class EquipmentDatasetBlob(models.Model):
+    # Raw payloads live apart from the summary row so listing and comparing
+    # datasets never reads them. csv_payload is empty for Parquet and Arrow
+    # uploads, which are kept only in columnar form. Datasets with the same
+    # content_digest share one blob, which goes away with the last of them.
+    csv_payload = models.BinaryField(blank=True, default=b'')
+    columnar_payload = models.BinaryField(blank=True, default=b'')
+
+    @property
+    def csv_data(self):
+        return zlib.decompress(self.csv_payload).decode('utf-8')
+
+    @csv_data.setter
+    def csv_data(self, text):
+        self.csv_payload = zlib.compress(text.encode('utf-8'), PAYLOAD_COMPRESSION_LEVEL)
+
+    def equipment_frame(self, columns=None):
+        if self.columnar_payload:
+            return columnar_to_frame(self.columnar_payload, columns)
+        return read_csv_frame(zlib.decompress(self.csv_payload), columns)
+
+
+@receiver(post_delete, sender=EquipmentDataset)
+def delete_unreferenced_blob(sender, instance, **kwargs):
+    if instance.blob_id is not None:
+        EquipmentDatasetBlob.objects.filter(pk=instance.blob_id, datasets__isnull=True).delete()
+
+
+class HistoryQuota(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='history_quota')
+    history_limit = models.PositiveIntegerField()
+
+
+class Job(models.Model):
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    KIND_UPLOAD = 'upload'
+    KIND_REPORT = 'report'
+    KIND_CHOICES = [
+        (KIND_UPLOAD, 'Upload'),
+        (KIND_REPORT, 'Report'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=True)
+    kind = models.CharField(max_length=16, choices=KIND_CHOICES, default=KIND_UPLOAD)
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    progress = models.JSONField(default=dict, blank=True)
+    filename = models.CharField(max_length=255)
+    spool_path = models.CharField(max_length=1024, blank=True)
+    error = models.TextField(blank=True)
+    dataset = models.ForeignKey(EquipmentDataset, null=True, blank=True, on_delete=models.SET_NULL)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-created_at']
+
+
+class UploadSession(models.Model):
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=True)
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received_size = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
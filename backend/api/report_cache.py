@@ -0,0 +1,81 @@
+import os
+import tempfile
+
+from django.conf import settings
+
+from .models import EquipmentDataset
+from .report_render import render_report_file
+from .reports import REPORT_TEMPLATE_VERSION, report_layout_key
+
+# Reports are cached as PDF files named after the dataset id, its upload time,
+# the template version and the data table layout. Re-uploading a duplicate moves uploaded_at, which
+# changes the key, so a stale report is never served. Files are evicted
+# least-recently-served first once the directory grows past REPORT_CACHE_MAX_SIZE.
+
+
+def report_cache_key(dataset):
+    return f'{dataset.id}-{int(dataset.uploaded_at.timestamp() * 1_000_000)}-v{REPORT_TEMPLATE_VERSION}-{report_layout_key()}'
+
+
+def report_etag(dataset):
+    return f'"{report_cache_key(dataset)}"'
+
+
+def report_cache_path(dataset):
+    return settings.REPORT_CACHE_DIR / f'{report_cache_key(dataset)}.pdf'
+
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def evict_report_cache(max_size=None):
+    max_size = settings.REPORT_CACHE_MAX_SIZE if max_size is None else max_size
+    cached_files = []
+    for entry in os.scandir(settings.REPORT_CACHE_DIR):
+        if entry.name.endswith('.pdf'):
+            file_stat = entry.stat()
+            cached_files.append((file_stat.st_mtime, file_stat.st_size, entry.path))
+    total_size = sum(size for _, size, _ in cached_files)
+    for _, size, path in sorted(cached_files):
+        if total_size <= max_size:
+            break
+        _remove_quietly(path)
+        total_size -= size
+
+
+def cached_report_path(dataset, progress=None):
+    report_path = report_cache_path(dataset)
+    if report_path.exists():
+        os.utime(report_path)
+        return report_path
+
+    cache_dir = settings.REPORT_CACHE_DIR
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    for stale_path in cache_dir.glob(f'{dataset.id}-*.pdf'):
+        _remove_quietly(stale_path)
+    # Build into a temporary file and rename it into place, so concurrent
+    # requests never serve a half-written PDF.
+    report_dataset = EquipmentDataset.objects.select_related('blob').defer('blob__csv_payload').get(pk=dataset.pk)
+    fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+        render_report_file(report_dataset, temp_path, progress=progress)
+        os.replace(temp_path, report_path)
+    except BaseException:
+        _remove_quietly(temp_path)
+        raise
+    evict_report_cache()
+    return report_path
+
+
+def open_cached_report(dataset):
+    # Another request can evict the file between the lookup and the open;
+    # the report is then rendered again.
+    try:
+        return open(cached_report_path(dataset), 'rb')
+    except FileNotFoundError:
+        return open(cached_report_path(dataset), 'rb')
@@ -0,0 +1,220 @@
+import multiprocessing
+import os
+import signal
+import threading
+import time
+try:
+    import fcntl
+    import resource
+except ImportError:
+    fcntl = None
+    resource = None
+
+from django.conf import settings
+
+from .columnar import columnar_to_frame, frame_to_columnar
+from .constants import ERROR_MESSAGES
+from .reports import build_report, report_row_count
+
+# Every render runs in its own short-lived process, so a report that runs away
+# with memory or time is killed on its own without taking a web or job worker
+# with it. Processes are forked from a forkserver that has already imported
+# ReportLab, so starting one is cheap. The child never touches the database:
+# it gets the summary fields and the table rows as a columnar .npz payload.
+#
+# REPORT_RENDER_WORKERS is shared by every server process on the host: each
+# render slot is a lock file under REPORT_CACHE_DIR, held with flock for the
+# length of the render. The OS drops the lock if the holder dies, so a crashed
+# worker never leaks a slot.
+
+REPORT_FIELDS = (
+    'id', 'filename', 'uploaded_at', 'total_count',
+    'avg_flowrate', 'avg_pressure', 'avg_temperature',
+    'statistics', 'type_distribution',
+)
+
+# How often the parent checks on a render: its resident memory is sampled
+# at this interval while waiting for messages, and a busy slot is retried.
+RENDER_POLL_INTERVAL = 0.1
+RENDER_SLOTS_DIRNAME = '.render-slots'
+
+_context = None
+_render_slots = None
+
+
+class ReportRenderError(Exception):
+    pass
+
+
+class ReportSource:
+    # Stands in for EquipmentDataset inside the render process.
+
+    def __init__(self, fields, columnar_payload):
+        self.__dict__.update(fields)
+        self.columnar_payload = columnar_payload
+
+    def equipment_frame(self, columns=None):
+        return columnar_to_frame(self.columnar_payload, columns)
+
+
+def report_payload(dataset):
+    row_count = report_row_count(dataset.total_count)
+    columnar_payload = b''
+    if 0 < row_count < dataset.total_count:
+        columnar_payload = frame_to_columnar(dataset.equipment_frame().iloc[:row_count])
+    elif row_count:
+        columnar_payload = bytes(dataset.blob.columnar_payload) or frame_to_columnar(dataset.equipment_frame())
+    return {
+        'fields': {name: getattr(dataset, name) for name in REPORT_FIELDS},
+        'row_count': row_count,
+        'columnar_payload': columnar_payload,
+    }
+
+
+def render_payload(payload, output_path, progress=None):
+    report_source = ReportSource(payload['fields'], payload['columnar_payload'])
+    with open(output_path, 'wb') as output:
+        build_report(report_source, output, progress=progress, row_count=payload['row_count'])
+
+
+def _apply_limits(cpu_seconds):
+    if resource is None:
+        return
+    # The parent enforces the wall-clock timeout; this catches a render that
+    # keeps spinning after the parent is gone.
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+
+
+def _render_process(payload, output_path, conn, cpu_seconds):
+    _apply_limits(cpu_seconds)
+    try:
+        render_payload(payload, output_path, progress=lambda pages, rows: conn.send(('progress', pages, rows)))
+    except Exception as render_error:
+        conn.send(('error', f'Report generation failed: {render_error}'))
+    else:
+        conn.send(('done',))
+    finally:
+        conn.close()
+
+
+def resident_memory(pid):
+    # RSS from /proc; None where it is not available, which leaves the
+    # memory limit unenforced (the time limit still applies).
+    try:
+        with open(f'/proc/{pid}/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def get_context():
+    global _context
+    if _context is None:
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            _context = multiprocessing.get_context('forkserver')
+            _context.set_forkserver_preload(['api.report_render'])
+        else:
+            _context = multiprocessing.get_context('spawn')
+    return _context
+
+
+def get_render_slots():
+    # Without flock (Windows) the limit falls back to a per-process semaphore.
+    global _render_slots
+    if _render_slots is None:
+        _render_slots = threading.BoundedSemaphore(settings.REPORT_RENDER_WORKERS)
+    return _render_slots
+
+
+def _try_slot_lock(slot_path):
+    slot_file = open(slot_path, 'a')
+    try:
+        fcntl.flock(slot_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        slot_file.close()
+        return None
+    return slot_file
+
+
+def acquire_render_slot(timeout):
+    # Returns a callable that frees the slot, or None if none freed up in time.
+    if fcntl is None:
+        render_slots = get_render_slots()
+        return render_slots.release if render_slots.acquire(timeout=timeout) else None
+    slots_dir = settings.REPORT_CACHE_DIR / RENDER_SLOTS_DIRNAME
+    slots_dir.mkdir(parents=True, exist_ok=True)
+    deadline = time.monotonic() + timeout
+    while True:
+        for slot in range(settings.REPORT_RENDER_WORKERS):
+            slot_file = _try_slot_lock(slots_dir / f'slot-{slot}.lock')
+            if slot_file is not None:
+                return slot_file.close
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(RENDER_POLL_INTERVAL)
+
+
+def _exit_reason(exitcode):
+    # A render killed by a signal (CPU limit, OOM killer) never reports back.
+    if exitcode is not None and exitcode < 0:
+        return signal.Signals(-exitcode).name
+    return f'exit code {exitcode}'
+
+
+def _wait_for_render(process, conn, progress):
+    timeout = settings.REPORT_RENDER_TIMEOUT
+    memory_limit = settings.REPORT_RENDER_MEMORY_MB * 1024 * 1024
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise ReportRenderError(ERROR_MESSAGES['report_timeout'].format(seconds=timeout))
+        if memory_limit:
+            rss = resident_memory(process.pid)
+            if rss is not None and rss > memory_limit:
+                raise ReportRenderError(ERROR_MESSAGES['report_memory'].format(max_mb=settings.REPORT_RENDER_MEMORY_MB))
+        if not conn.poll(min(remaining, RENDER_POLL_INTERVAL)):
+            continue
+        try:
+            message = conn.recv()
+        except EOFError:
+            process.join()
+            raise ReportRenderError(ERROR_MESSAGES['report_crashed'].format(reason=_exit_reason(process.exitcode)))
+        if message[0] == 'progress':
+            if progress is not None:
+                progress(*message[1:])
+        elif message[0] == 'error':
+            raise ReportRenderError(message[1])
+        else:
+            return
+
+
+def render_report_file(dataset, output_path, progress=None):
+    payload = report_payload(dataset)
+    # REPORT_RENDER_WORKERS=0 renders in the calling process, without limits.
+    if settings.REPORT_RENDER_WORKERS <= 0:
+        render_payload(payload, output_path, progress=progress)
+        return
+
+    release_slot = acquire_render_slot(settings.REPORT_RENDER_TIMEOUT)
+    if release_slot is None:
+        raise ReportRenderError(ERROR_MESSAGES['report_busy'])
+    try:
+        context = get_context()
+        conn, child_conn = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_render_process,
+            args=(payload, str(output_path), child_conn, settings.REPORT_RENDER_TIMEOUT + 1),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        try:
+            _wait_for_render(process, conn, progress)
+        finally:
+            if process.is_alive():
+                process.kill()
+            process.join()
+            conn.close()
+    finally:
+        release_slot()
@@ -0,0 +1,160 @@
+import copy
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.charts.textlabels import Label
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Paragraph, TableStyle
+
+# Everything in a report that does not depend on the dataset is built once per
+# process here; reports.py only fills in the per-dataset values. Objects that
+# layout mutates (flowables, chart widgets) are never shared between reports.
+
+PDF_STYLES = getSampleStyleSheet()
+
+HEADER_COLOR = colors.HexColor('#03045e')
+GRID_COLOR = colors.HexColor('#023e8a')
+BODY_COLOR = colors.HexColor('#caf0f8')
+BAR_COLOR = colors.HexColor('#0077b6')
+CHART_COLORS = [
+    colors.HexColor('#03045e'), colors.HexColor('#0077b6'),
+    colors.HexColor('#00b4d8'), colors.HexColor('#90e0ef'),
+    colors.HexColor('#caf0f8'), colors.HexColor('#fca311'),
+    colors.HexColor('#e63946'),
+]
+
+META_COL_WIDTHS = [120, 300]
+STATS_COL_WIDTHS = [108, 72, 72, 72, 72, 72]
+TYPE_COL_WIDTHS = [200, 100]
+
+META_TABLE_STYLE = TableStyle([
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+STATS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), HEADER_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 1, GRID_COLOR),
+    ('BACKGROUND', (0, 1), (-1, -1), BODY_COLOR),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
+    ('TOPPADDING', (0, 0), (-1, -1), 10),
+])
+TYPE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), HEADER_COLOR),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('GRID', (0, 0), (-1, -1), 1, GRID_COLOR),
+    ('BACKGROUND', (0, 1), (-1, -1), BODY_COLOR),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+])
+CHART_TABLE_STYLE = TableStyle([
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+STATS_HEADER = ['Parameter', 'Mean', 'Std Dev', 'Min', 'Median', 'Max']
+TYPE_HEADER = ['Equipment Type', 'Count']
+AVERAGE_CATEGORIES = ['Flowrate', 'Pressure', 'Temp']
+
+
+def _parsed_paragraphs(texts):
+    return {(text, style_name): Paragraph(text, PDF_STYLES[style_name]) for text, style_name in texts}
+
+
+# Parsing markup is most of a Paragraph's cost; the fixed headings are parsed
+# once and each report gets its own shallow copy to lay out.
+_STATIC_PARAGRAPHS = _parsed_paragraphs([
+    ('CHEMICAL EQUIPMENT ANALYSIS REPORT', 'Title'),
+    ('Summary Statistics', 'Heading2'),
+    ('Type Distribution and Visualization', 'Heading2'),
+    ('Complete Equipment Data', 'Heading2'),
+    ('Equipment Data', 'Heading2'),
+])
+
+
+def paragraph(text, style_name):
+    template = _STATIC_PARAGRAPHS.get((text, style_name))
+    if template is None:
+        return Paragraph(text, PDF_STYLES[style_name])
+    return copy.copy(template)
+
+
+def average_bar_chart(averages):
+    drawing = Drawing(400, 200)
+    bar_chart = VerticalBarChart()
+    bar_chart.x = 50
+    bar_chart.y = 50
+    bar_chart.height = 125
+    bar_chart.width = 300
+    bar_chart.data = [averages]
+    bar_chart.strokeColor = colors.white
+    bar_chart.valueAxis.valueMin = 0
+    bar_chart.valueAxis.valueMax = max(averages) * 1.2
+    bar_chart.valueAxis.valueStep = max(averages) / 5
+    bar_chart.categoryAxis.labels.boxAnchor = 'ne'
+    bar_chart.categoryAxis.labels.dx = 8
+    bar_chart.categoryAxis.labels.dy = -2
+    bar_chart.categoryAxis.labels.angle = 30
+    bar_chart.categoryAxis.categoryNames = AVERAGE_CATEGORIES
+    bar_chart.bars[0].fillColor = BAR_COLOR
+    drawing.add(bar_chart)
+
+    title = Label()
+    title.setOrigin(200, 190)
+    title.boxAnchor = 'ne'
+    title.dx = 0
+    title.dy = 0
+    title.setText('Average Values')
+    drawing.add(title)
+    return drawing
+
+
+def type_pie_chart(counts, labels):
+    # Wide enough to hold the legend beside the pie without overlap.
+    drawing = Drawing(500, 250)
+    pie = Pie()
+    pie.x = 50
+    pie.y = 50
+    pie.width = 150
+    pie.height = 150
+    pie.data = counts
+    pie.labels = labels
+    pie.simpleLabels = 0
+    pie.slices.strokeWidth = 0
+    slice_colors = [CHART_COLORS[i % len(CHART_COLORS)] for i in range(len(counts))]
+    for i, slice_color in enumerate(slice_colors):
+        pie.slices[i].fillColor = slice_color
+    drawing.add(pie)
+
+    legend = Legend()
+    legend.alignment = 'right'
+    legend.x = 350
+    legend.y = 100
+    legend.columnMaximum = 10
+    legend.fontSize = 10
+    legend.dx = 8
+    legend.dy = 8
+    legend.yGap = 2
+    legend.deltay = 12
+    legend.strokeColor = None
+    legend.colorNamePairs = list(zip(slice_colors, labels))
+    drawing.add(legend)
+    return drawing
+
+
+def draw_page_footer(canvas, doc):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 9)
+    canvas.setFillColor(HEADER_COLOR)
+    canvas.drawCentredString(letter[0] / 2, 30, f"Page {doc.page}")
+    canvas.drawString(40, 30, "Chemical Equipment Analysis Report")
+    canvas.drawRightString(letter[0] - 40, 30, doc.footer_date)
+    canvas.restoreState()
@@ -0,0 +1,320 @@
+import logging
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Flowable, KeepTogether, CondPageBreak
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from .constants import NUMERIC_COLUMNS
+from .report_template import (
+    BODY_COLOR, CHART_TABLE_STYLE, GRID_COLOR, HEADER_COLOR, META_COL_WIDTHS, META_TABLE_STYLE, PDF_STYLES,
+    STATS_COL_WIDTHS, STATS_HEADER, STATS_TABLE_STYLE, TYPE_COL_WIDTHS, TYPE_HEADER, TYPE_TABLE_STYLE,
+    average_bar_chart, draw_page_footer, paragraph, type_pie_chart,
+)
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the report layout changes so cached PDFs are rebuilt.
+REPORT_TEMPLATE_VERSION = 2
+REPORT_TABLE_MODES = ('summary', 'first', 'full')
+DATA_COLUMNS = ['Equipment Name', 'Type'] + NUMERIC_COLUMNS
+DATA_COL_WIDTHS = [90, 90, 80, 80, 90]
+# Every data row gets the same fixed height, so the rows that fit in the
+# space left on a page can be computed instead of measured.
+DATA_ROW_HEIGHT = 22
+
+
+def _table_mode():
+    if settings.REPORT_TABLE_MODE not in REPORT_TABLE_MODES:
+        raise ImproperlyConfigured(f'REPORT_TABLE_MODE must be one of {", ".join(REPORT_TABLE_MODES)}')
+    return settings.REPORT_TABLE_MODE
+
+
+def report_row_count(total_count):
+    table_mode = _table_mode()
+    if table_mode == 'summary':
+        return 0
+    if table_mode == 'first':
+        return min(total_count, settings.REPORT_TABLE_ROWS)
+    return total_count
+
+
+def report_layout_key():
+    table_mode = _table_mode()
+    if table_mode == 'first':
+        return f'first{settings.REPORT_TABLE_ROWS}'
+    return table_mode
+
+
+DATA_HEADER_COLOR = HEADER_COLOR
+DATA_GRID_COLOR = GRID_COLOR
+DATA_ROW_COLORS = [BODY_COLOR, colors.HexColor('#e0f7fa')]
+DATA_FONT_SIZE = 9
+DATA_TEXT_OFFSET = 7.5
+
+
+DATA_COLUMN_CENTRES = np.cumsum([0] + DATA_COL_WIDTHS[:-1]) + np.array(DATA_COL_WIDTHS) / 2
+
+
+def _number_widths(formatted, values):
+    # '%.2f' output of a finite number is digits, one '.' and maybe a leading
+    # '-', and Helvetica gives every digit the same advance width, so widths
+    # follow from string lengths instead of per-string font metrics.
+    negative = np.signbit(values)
+    lengths = np.fromiter(map(len, formatted), dtype=np.int64, count=len(formatted))
+    widths = ((lengths - 1 - negative) * stringWidth('0', 'Helvetica', DATA_FONT_SIZE)
+              + stringWidth('.', 'Helvetica', DATA_FONT_SIZE)
+              + negative * stringWidth('-', 'Helvetica', DATA_FONT_SIZE))
+    for index in np.flatnonzero(~np.isfinite(values)):
+        widths[index] = stringWidth(formatted[index], 'Helvetica', DATA_FONT_SIZE)
+    return widths
+
+
+class _DataPage(Flowable):
+    # One page worth of the data table drawn straight onto the canvas: a
+    # rectangle per row background, one path for the grid and one text object
+    # for every cell, instead of a Table that measures and draws cell by cell.
+
+    def __init__(self, columns, widths):
+        super().__init__()
+        self.columns = columns
+        self.text_x = (DATA_COLUMN_CENTRES[:, None] - np.asarray(widths) / 2).tolist()
+        self.row_count = len(columns[0])
+        self.width = sum(DATA_COL_WIDTHS)
+        self.height = (self.row_count + 1) * DATA_ROW_HEIGHT
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canvas = self.canv
+        canvas.saveState()
+        canvas.setFillColor(DATA_HEADER_COLOR)
+        canvas.rect(0, self.height - DATA_ROW_HEIGHT, self.width, DATA_ROW_HEIGHT, stroke=0, fill=1)
+        for parity, row_color in enumerate(DATA_ROW_COLORS):
+            canvas.setFillColor(row_color)
+            for row_index in range(parity, self.row_count, 2):
+                canvas.rect(0, self.height - (row_index + 2) * DATA_ROW_HEIGHT, self.width, DATA_ROW_HEIGHT, stroke=0, fill=1)
+
+        grid = canvas.beginPath()
+        for row_index in range(self.row_count + 2):
+            grid.moveTo(0, row_index * DATA_ROW_HEIGHT)
+            grid.lineTo(self.width, row_index * DATA_ROW_HEIGHT)
+        column_x = 0
+        for col_width in [0] + DATA_COL_WIDTHS:
+            column_x += col_width
+            grid.moveTo(column_x, 0)
+            grid.lineTo(column_x, self.height)
+        canvas.setStrokeColor(DATA_GRID_COLOR)
+        canvas.setLineWidth(0.5)
+        canvas.drawPath(grid, stroke=1, fill=0)
+
+        text = canvas.beginText()
+        text.setFont('Helvetica-Bold', DATA_FONT_SIZE)
+        text.setFillColor(colors.whitesmoke)
+        header_baseline = self.height - DATA_ROW_HEIGHT + DATA_TEXT_OFFSET
+        for centre, header in zip(DATA_COLUMN_CENTRES.tolist(), DATA_COLUMNS):
+            text.setTextOrigin(centre - stringWidth(header, 'Helvetica-Bold', DATA_FONT_SIZE) / 2, header_baseline)
+            text.textLine(header)
+        text.setFont('Helvetica', DATA_FONT_SIZE)
+        text.setFillColor(colors.black)
+        baselines = [self.height - (row_index + 2) * DATA_ROW_HEIGHT + DATA_TEXT_OFFSET for row_index in range(self.row_count)]
+        for values, text_x in zip(self.columns, self.text_x):
+            for value, x, baseline in zip(values, text_x, baselines):
+                text.setTextOrigin(x, baseline)
+                text.textLine(value)
+        canvas.drawText(text)
+        canvas.restoreState()
+
+
+class _DataColumns:
+    # Text columns are held as category labels plus integer codes and numeric
+    # columns as float arrays; cell strings are only produced for the rows of
+    # the page being laid out.
+
+    def __init__(self, equipment_df, row_count):
+        self.arrays = {}
+        for col in DATA_COLUMNS:
+            values = equipment_df[col].iloc[:row_count]
+            if col in NUMERIC_COLUMNS:
+                self.arrays[col] = values.to_numpy(dtype=np.float64)
+            else:
+                categorical = values.astype('category').cat
+                # Missing values have code -1, which picks the trailing 'nan' label.
+                labels = np.append(categorical.categories.astype(str).to_numpy(dtype=object), 'nan')
+                label_widths = np.array([stringWidth(label, 'Helvetica', DATA_FONT_SIZE) for label in labels])
+                self.arrays[col] = (labels, label_widths, categorical.codes.to_numpy())
+
+    def page(self, start, stop):
+        columns = []
+        widths = []
+        for col in DATA_COLUMNS:
+            if col in NUMERIC_COLUMNS:
+                values = self.arrays[col][start:stop]
+                formatted = [f'{value:.2f}' for value in values.tolist()]
+                columns.append(formatted)
+                widths.append(_number_widths(formatted, values))
+            else:
+                labels, label_widths, codes = self.arrays[col]
+                page_codes = codes[start:stop]
+                columns.append(labels[page_codes].tolist())
+                widths.append(label_widths[page_codes])
+        return _DataPage(columns, widths)
+
+
+class _PagedDataTable(Flowable):
+    # Never fits as a whole, so the frame always asks it to split: each split
+    # cuts one page holding exactly the rows that fit in the remaining space
+    # and defers the rest, so rows are formatted a page at a time.
+
+    def __init__(self, data_columns, start, stop):
+        super().__init__()
+        self.data_columns = data_columns
+        self.start = start
+        self.stop = stop
+
+    def wrap(self, availWidth, availHeight):
+        return sum(DATA_COL_WIDTHS), availHeight + DATA_ROW_HEIGHT
+
+    def split(self, availWidth, availHeight):
+        rows_that_fit = int(availHeight // DATA_ROW_HEIGHT) - 1
+        if rows_that_fit < 1:
+            return []
+        stop = min(self.start + rows_that_fit, self.stop)
+        data_page = self.data_columns.page(self.start, stop)
+        if stop == self.stop:
+            return [data_page]
+        return [data_page, _PagedDataTable(self.data_columns, stop, self.stop)]
+
+    def draw(self):
+        pass
+
+
+def _data_table_elements(equipment_record, row_count):
+    total_count = equipment_record.total_count
+    if row_count == 0:
+        return [
+            paragraph("Equipment Data", 'Heading2'),
+            Spacer(1, 12),
+            Paragraph(f"Row-level data omitted; all {total_count} records are summarised above.", PDF_STYLES['Normal']),
+        ]
+
+    heading = "Complete Equipment Data" if row_count == total_count else f"Equipment Data (first {row_count} of {total_count} rows)"
+    heading_elements = [paragraph(heading, 'Heading2'), Spacer(1, 12)]
+    data_columns = _DataColumns(equipment_record.equipment_frame(DATA_COLUMNS), row_count)
+    page_rows = int((letter[1] - 144) // DATA_ROW_HEIGHT) - 1
+    if row_count <= page_rows:
+        # Short tables move to the next page as a whole rather than split.
+        return [KeepTogether(heading_elements + [data_columns.page(0, row_count)])]
+    return [CondPageBreak(6 * DATA_ROW_HEIGHT)] + heading_elements + [_PagedDataTable(data_columns, 0, row_count)]
+
+
+class _ProgressDocTemplate(SimpleDocTemplate):
+
+    def __init__(self, output, progress=None, **kwargs):
+        super().__init__(output, **kwargs)
+        self.progress = progress
+        self.rows_laid_out = 0
+        self.generated_at = datetime.now()
+        self.footer_date = self.generated_at.strftime('%Y-%m-%d')
+
+    def afterFlowable(self, flowable):
+        if isinstance(flowable, _DataPage):
+            self.rows_laid_out += flowable.row_count
+
+    def afterPage(self):
+        if self.progress is not None:
+            self.progress(self.page, self.rows_laid_out)
+
+
+def _summary_elements(equipment_record):
+    stats_data = [STATS_HEADER]
+    for param in ['Flowrate', 'Pressure', 'Temperature']:
+        param_stats = equipment_record.statistics[param]
+        std_text = f"{param_stats['std']:.2f}" if param_stats['std'] is not None else '-'
+        stats_data.append([param, f"{param_stats['mean']:.2f}", std_text, f"{param_stats['min']:.2f}", f"{param_stats['median']:.2f}", f"{param_stats['max']:.2f}"])
+    summary_elements = [
+        paragraph("Summary Statistics", 'Heading2'),
+        Spacer(1, 8),
+        Table(stats_data, colWidths=STATS_COL_WIDTHS, style=STATS_TABLE_STYLE),
+        Spacer(1, 12),
+    ]
+
+    try:
+        averages = [
+            float(equipment_record.avg_flowrate),
+            float(equipment_record.avg_pressure),
+            float(equipment_record.avg_temperature)
+        ]
+        summary_elements.append(Table([[average_bar_chart(averages)]], colWidths=[400], style=CHART_TABLE_STYLE))
+    except Exception:
+        logger.exception('Bar chart failed for dataset %s', equipment_record.id)
+    return summary_elements
+
+
+def _type_elements(equipment_record):
+    type_data = [TYPE_HEADER] + [[k, str(v)] for k, v in equipment_record.type_distribution.items()]
+    type_elements = [
+        paragraph("Type Distribution and Visualization", 'Heading2'),
+        Spacer(1, 8),
+        Table(type_data, colWidths=TYPE_COL_WIDTHS, style=TYPE_TABLE_STYLE),
+        Spacer(1, 24),
+    ]
+
+    if not equipment_record.type_distribution:
+        type_elements.append(Paragraph("No distribution data available.", PDF_STYLES['Normal']))
+        return type_elements
+    try:
+        counts = []
+        labels = []
+        for k, v in equipment_record.type_distribution.items():
+            try:
+                counts.append(int(v))
+                labels.append(str(k))
+            except (TypeError, ValueError):
+                pass
+
+        if sum(counts) > 0:
+            type_elements.append(Table([[type_pie_chart(counts, labels)]], colWidths=[500], style=CHART_TABLE_STYLE))
+        else:
+            type_elements.append(paragraph("Type Distribution Visualization", 'Heading2'))
+            type_elements.append(Spacer(1, 12))
+            type_elements.append(Paragraph("No numeric data available for chart.", PDF_STYLES['Normal']))
+    except Exception as chart_error:
+        logger.exception('Type chart failed for dataset %s', equipment_record.id)
+        type_elements.append(Paragraph(f"Chart Error: {str(chart_error)}", PDF_STYLES['Italic']))
+    return type_elements
+
+
+def build_report(equipment_record, output, progress=None, row_count=None):
+    # progress, if given, is called after every page with the page number and
+    # the number of data rows laid out so far. row_count defaults to the
+    # configured table mode's limit.
+    if row_count is None:
+        row_count = report_row_count(equipment_record.total_count)
+    pdf_doc = _ProgressDocTemplate(output, progress=progress, pagesize=letter, topMargin=72, bottomMargin=72)
+
+    meta_data = [
+        ['Dataset ID', str(equipment_record.id)],
+        ['Filename', equipment_record.filename],
+        ['Upload Date', equipment_record.uploaded_at.astimezone().strftime('%Y-%m-%d %I:%M %p')],
+        ['Generated', pdf_doc.generated_at.strftime('%Y-%m-%d %I:%M %p')],
+        ['Total Records', str(equipment_record.total_count)]
+    ]
+    report_elements = [
+        paragraph("CHEMICAL EQUIPMENT ANALYSIS REPORT", 'Title'),
+        Spacer(1, 12),
+        Table(meta_data, colWidths=META_COL_WIDTHS, style=META_TABLE_STYLE),
+        Spacer(1, 24),
+        KeepTogether(_summary_elements(equipment_record)),
+        Spacer(1, 24),
+        KeepTogether(_type_elements(equipment_record)),
+        Spacer(1, 24),
+    ]
+    report_elements.extend(_data_table_elements(equipment_record, row_count))
+
+    pdf_doc.build(report_elements, onFirstPage=draw_page_footer, onLaterPages=draw_page_footer)
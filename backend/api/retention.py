@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import Count
+
+from .constants import HISTORY_LIMIT
+from .models import EquipmentDataset, HistoryQuota
+from .worker_pool import submit_task
+
+# Uploads only insert; datasets beyond a user's quota are removed later by
+# sweep_history. Until then every read goes through visible_datasets, so
+# users never see more than their quota.
+
+
+def history_limit_for(user_id):
+    quota = HistoryQuota.objects.filter(user_id=user_id).values_list('history_limit', flat=True).first()
+    return HISTORY_LIMIT if quota is None else quota
+
+
+def visible_datasets(user):
+    visible_ids = EquipmentDataset.objects.filter(user=user).order_by('-uploaded_at', '-id').values('id')[:history_limit_for(user.id)]
+    return EquipmentDataset.objects.filter(id__in=visible_ids)
+
+
+def sweep_user_history(user_id):
+    expired_ids = list(EquipmentDataset.objects.filter(user_id=user_id).order_by('-uploaded_at', '-id').values_list('id', flat=True)[history_limit_for(user_id):])
+    if expired_ids:
+        EquipmentDataset.objects.filter(id__in=expired_ids).delete()
+    return len(expired_ids)
+
+
+def sweep_history():
+    quotas = dict(HistoryQuota.objects.values_list('user_id', 'history_limit'))
+    dataset_counts = EquipmentDataset.objects.values('user_id').annotate(dataset_count=Count('id'))
+    removed = 0
+    for row in dataset_counts:
+        if row['dataset_count'] > quotas.get(row['user_id'], HISTORY_LIMIT):
+            removed += sweep_user_history(row['user_id'])
+    return removed
+
+
+def schedule_history_sweep(user):
+    transaction.on_commit(lambda: submit_task('api.retention.sweep_user_history', user.id))
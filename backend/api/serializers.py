@@ -1,7 +1,23 @@
 from rest_framework import serializers
-from .models import EquipmentDataset
+from .models import EquipmentDataset, Job, UploadSession
 
 class EquipmentDatasetSerializer(serializers.ModelSerializer):
     class Meta:
         model = EquipmentDataset
         fields = ['id', 'filename', 'uploaded_at', 'total_count', 'avg_flowrate', 'avg_pressure', 'avg_temperature', 'type_distribution']
+
+
+class JobSerializer(serializers.ModelSerializer):
+    dataset = EquipmentDatasetSerializer(read_only=True)
+
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'progress', 'filename', 'error', 'created_at', 'updated_at', 'dataset']
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    offset = serializers.IntegerField(source='received_size', read_only=True)
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'filename', 'total_size', 'sha256', 'offset', 'created_at', 'updated_at']
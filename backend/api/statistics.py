@@ -0,0 +1,22 @@
+import numpy as np
+
+
+def describe_values(values, mean=None):
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return {'count': 0}
+    q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+    return {
+        'count': int(len(values)),
+        'mean': float(values.mean() if mean is None else mean),
+        'std': float(values.std(ddof=1)) if len(values) > 1 else None,
+        'min': float(values.min()),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'max': float(values.max()),
+    }
+
+
+def describe_frame(equipment_df, columns):
+    return {col: describe_values(equipment_df[col].to_numpy()) for col in columns}
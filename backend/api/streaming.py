@@ -0,0 +1,18 @@
+class ChunkBuffer:
+    # Write-only sink for writers that stream into a file object (ZipFile,
+    # pyarrow's ParquetWriter); the written bytes are drained between writes.
+    closed = False
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        chunks, self.chunks = self.chunks, []
+        return chunks
@@ -0,0 +1,260 @@
+import gzip
+import io
+import zipfile
+import zlib
+from io import StringIO
+from unittest import mock, skipUnless
+
+from django.test import TestCase
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+import numpy as np
+import pandas as pd
+
+from api.columnar import columnar_to_frame
+from api.ingest import DecodedUploadStream, gunzip_chunks, ingest_uploaded_csv, ingest_uploaded_file, pyarrow
+
+
+class DecodedUploadStreamTests(TestCase):
+
+    def test_multibyte_characters_split_across_chunks(self):
+        content = 'Equipment Name,Type,Flowrate,Pressure,Temperature\nPompe-é,Pump,1,2,3\n'.encode('utf-8')
+        file = SimpleUploadedFile('test.csv', content)
+        stream = DecodedUploadStream(file, chunk_size=3)
+        self.assertEqual(stream.read(), content.decode('utf-8'))
+
+    def test_iterates_lines_without_reading_ahead(self):
+        content = 'Equipment Name,Type,Flowrate,Pressure,Temperature\r\nPompe-é,Pump,1,2,3\nValve,Valve,4,5,6'
+        stream = DecodedUploadStream(SimpleUploadedFile('test.csv', content.encode('utf-8')), chunk_size=5)
+        lines = iter(stream)
+        self.assertEqual(next(lines), 'Equipment Name,Type,Flowrate,Pressure,Temperature\r\n')
+        self.assertFalse(stream._exhausted)
+        self.assertEqual(list(lines), ['Pompe-é,Pump,1,2,3\n', 'Valve,Valve,4,5,6'])
+
+    def test_compressed_payload_covers_whole_file_after_partial_reads(self):
+        content = b'a,b\n1,2\n3,4\n'
+        file = SimpleUploadedFile('test.csv', content)
+        stream = DecodedUploadStream(file, chunk_size=4)
+        self.assertEqual(stream.read(5), 'a,b\n1')
+        self.assertEqual(zlib.decompress(stream.compressed_payload()), content)
+
+    def test_invalid_utf8_raises(self):
+        file = SimpleUploadedFile('test.csv', b'Equipment Name\n\xff\xfe\n')
+        with self.assertRaises(UnicodeDecodeError):
+            ingest_uploaded_csv(file)
+
+
+class GunzipChunksTests(TestCase):
+
+    def split(self, data, size):
+        return [data[i:i + size] for i in range(0, len(data), size)]
+
+    def test_output_is_bounded_per_chunk(self):
+        content = b'x' * 100_000
+        parts = list(gunzip_chunks(self.split(gzip.compress(content), 7), chunk_size=1000))
+        self.assertEqual(b''.join(parts), content)
+        self.assertLessEqual(max(len(part) for part in parts), 1000)
+
+    def test_concatenated_members(self):
+        raw = gzip.compress(b'first\n') + gzip.compress(b'second\n')
+        self.assertEqual(b''.join(gunzip_chunks(self.split(raw, 5))), b'first\nsecond\n')
+
+    def test_decompressed_size_limit(self):
+        bomb = gzip.compress(b'\0' * 50_000)
+        with self.assertRaises(ValidationError):
+            list(gunzip_chunks([bomb], chunk_size=1024, max_size=10_000))
+
+    def test_truncated_stream_raises(self):
+        with self.assertRaises(zlib.error):
+            list(gunzip_chunks([gzip.compress(b'a,b\n1,2\n' * 100)[:-12]]))
+
+
+class IngestUploadedCSVTests(TestCase):
+
+    def make_csv(self, row_count):
+        types = ['Pump', 'Valve', 'Heat Exchanger']
+        rows = ''.join(
+            f'Unit-{i},{types[i % 3 if i % 7 else 0]},{i * 0.37:.2f},{(i % 13) * 1.5},{20 + i % 50}\n'
+            for i in range(row_count)
+        )
+        return 'Equipment Name,Type,Flowrate,Pressure,Temperature\n' + rows
+
+    def test_chunked_aggregates_match_full_dataframe(self):
+        csv_text = self.make_csv(2500)
+        file = SimpleUploadedFile('test.csv', csv_text.encode('utf-8'))
+        aggregator, csv_payload, columnar_payload = ingest_uploaded_csv(file, chunk_rows=300)
+        full_df = pd.read_csv(StringIO(csv_text))
+
+        self.assertEqual(zlib.decompress(csv_payload).decode('utf-8'), csv_text)
+        self.assertLess(len(csv_payload), len(csv_text) // 3)
+        pd.testing.assert_frame_equal(
+            columnar_to_frame(columnar_payload, columns=['Flowrate', 'Pressure', 'Temperature']),
+            full_df[['Flowrate', 'Pressure', 'Temperature']].astype('float64')
+        )
+        self.assertEqual(columnar_to_frame(columnar_payload)['Type'].value_counts().to_dict(), full_df['Type'].value_counts().to_dict())
+        model_fields = aggregator.as_model_fields()
+        self.assertEqual(model_fields['total_count'], len(full_df))
+        self.assertEqual(model_fields['type_distribution'], full_df['Type'].value_counts().to_dict())
+        for col in ['Flowrate', 'Pressure', 'Temperature']:
+            self.assertAlmostEqual(aggregator.mean(col), full_df[col].mean(), places=9)
+        self.assertEqual(list(aggregator.type_distribution()), list(full_df['Type'].value_counts().index))
+        self.assertEqual(model_fields['statistics']['Temperature']['min'], full_df['Temperature'].min())
+        self.assertEqual(model_fields['statistics']['Flowrate']['max'], full_df['Flowrate'].max())
+
+    def test_columnar_payload_is_compressed_and_codes_span_chunks(self):
+        csv_text = 'Equipment Name,Type,Flowrate,Pressure,Temperature\n' + ''.join(
+            f'Unit-{i % 40},{["Pump", "Valve", ""][i % 3]},{i}.5,1.0,2.0\n' for i in range(1000)
+        )
+        full_df = pd.read_csv(StringIO(csv_text))
+        colliding_hashes = lambda values, categorize: np.zeros(len(values), dtype=np.uint64)
+        for hash_array in (pd.util.hash_array, colliding_hashes):
+            with mock.patch('api.columnar.pd.util.hash_array', hash_array):
+                _, _, columnar_payload = ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_text.encode('utf-8')), chunk_rows=70)
+            loaded_df = columnar_to_frame(columnar_payload)
+            self.assertEqual(list(loaded_df['Equipment Name']), list(full_df['Equipment Name']))
+            self.assertEqual(list(loaded_df['Equipment Name'].cat.categories), [f'Unit-{i}' for i in range(40)])
+            self.assertEqual(loaded_df['Type'].isna().sum(), full_df['Type'].isna().sum())
+            self.assertEqual(loaded_df['Type'].value_counts().to_dict(), full_df['Type'].value_counts().to_dict())
+        with zipfile.ZipFile(io.BytesIO(columnar_payload)) as archive:
+            self.assertEqual({entry.compress_type for entry in archive.infolist()}, {zipfile.ZIP_DEFLATED})
+
+    def test_statistics_match_pandas_describe(self):
+        csv_text = self.make_csv(1200)
+        aggregator, _, _ = ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_text.encode('utf-8')), chunk_rows=250)
+        full_df = pd.read_csv(StringIO(csv_text))
+        for col in ['Flowrate', 'Pressure', 'Temperature']:
+            described = full_df[col].describe()
+            column_stats = aggregator.as_model_fields()['statistics'][col]
+            self.assertEqual(column_stats['count'], described['count'])
+            for stat_name, describe_name in [('mean', 'mean'), ('std', 'std'), ('min', 'min'), ('q1', '25%'), ('median', '50%'), ('q3', '75%'), ('max', 'max')]:
+                self.assertAlmostEqual(column_stats[stat_name], described[describe_name], places=9)
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_engines_produce_identical_results(self):
+        csv_bytes = self.make_csv(3000).encode('utf-8')
+        with mock.patch('api.ingest.read_pandas_csv') as read_pandas_csv:
+            arrow_result = ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_bytes), engine='pyarrow')
+        read_pandas_csv.assert_not_called()
+        pandas_result = ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_bytes), chunk_rows=700, engine='c')
+        self.assertEqual(arrow_result[0].as_model_fields(), pandas_result[0].as_model_fields())
+        self.assertEqual(zlib.decompress(arrow_result[1]), csv_bytes)
+        pd.testing.assert_frame_equal(columnar_to_frame(arrow_result[2]), columnar_to_frame(pandas_result[2]))
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_engines_agree_on_empty_type(self):
+        csv_bytes = (self.make_csv(20) + 'Unit-x,,1.5,2,3\n').encode('utf-8')
+        arrow_result = ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_bytes), engine='pyarrow')
+        pandas_result = ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_bytes), engine='c')
+        self.assertEqual(arrow_result[0].as_model_fields(), pandas_result[0].as_model_fields())
+        self.assertNotIn('', arrow_result[0].type_distribution())
+        self.assertEqual(sum(arrow_result[0].type_distribution().values()), 20)
+        pd.testing.assert_frame_equal(columnar_to_frame(arrow_result[2]), columnar_to_frame(pandas_result[2]))
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_arrow_engine_falls_back_for_row_errors(self):
+        csv_text = self.make_csv(50) + 'Unit-x,Pump,,1,1\n'
+        with self.assertRaises(ValidationError) as ctx:
+            ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_text.encode('utf-8')), engine='pyarrow')
+        self.assertIn('Flowrate', str(ctx.exception))
+        self.assertIn('52', str(ctx.exception))
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_arrow_engine_does_not_reparse_rejected_uploads(self):
+        for csv_bytes, error in [
+            (b'Equipment Name,Type\nPump-1,Pump\n', ValidationError),
+            (b'Equipment Name,Type,Flowrate,Pressure,Temperature\n\xff\xfe,Pump,1,1,1\n', UnicodeDecodeError),
+        ]:
+            with self.subTest(error=error.__name__), mock.patch('api.ingest.read_pandas_csv') as read_pandas_mock:
+                with self.assertRaises(error):
+                    ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_bytes), engine='pyarrow')
+                read_pandas_mock.assert_not_called()
+
+    def test_unavailable_engine_uses_pandas(self):
+        with mock.patch('api.csv_parsers.pyarrow', None):
+            aggregator, _, _ = ingest_uploaded_csv(SimpleUploadedFile('test.csv', self.make_csv(10).encode('utf-8')), engine='pyarrow')
+        self.assertEqual(aggregator.total_count, 10)
+
+    def test_gzip_upload_matches_plain_upload(self):
+        csv_text = self.make_csv(800)
+        plain_aggregator, plain_payload, plain_columnar = ingest_uploaded_csv(SimpleUploadedFile('test.csv', csv_text.encode('utf-8')))
+        gzip_file = SimpleUploadedFile('test.csv.gz', gzip.compress(csv_text.encode('utf-8')))
+        gzip_aggregator, gzip_payload, gzip_columnar = ingest_uploaded_csv(gzip_file, chunk_rows=300)
+        self.assertEqual(gzip_aggregator.as_model_fields(), plain_aggregator.as_model_fields())
+        self.assertEqual(zlib.decompress(gzip_payload), zlib.decompress(plain_payload))
+        self.assertEqual(gzip_columnar, plain_columnar)
+
+    def test_invalid_value_in_later_chunk_rejected(self):
+        csv_text = self.make_csv(500) + 'Unit-x,Pump,abc,1,1\n'
+        file = SimpleUploadedFile('test.csv', csv_text.encode('utf-8'))
+        with self.assertRaises(ValidationError) as ctx:
+            ingest_uploaded_csv(file, chunk_rows=100)
+        self.assertIn('Flowrate', str(ctx.exception))
+        self.assertIn('502', str(ctx.exception))
+
+    def test_header_only_file_rejected_as_empty(self):
+        file = SimpleUploadedFile('test.csv', b'Equipment Name,Type,Flowrate,Pressure,Temperature\n')
+        with self.assertRaises(ValidationError) as ctx:
+            ingest_uploaded_csv(file)
+        self.assertIn('empty', str(ctx.exception).lower())
+
+
+class TableUploadTests(TestCase):
+
+    def make_frame(self, row_count):
+        return pd.DataFrame({
+            'Equipment Name': [f'Unit-{i}' for i in range(row_count)],
+            'Type': [['Pump', 'Valve', 'Heat Exchanger'][i % 3] for i in range(row_count)],
+            'Flowrate': [i * 0.37 for i in range(row_count)],
+            'Pressure': [(i % 13) * 1.5 for i in range(row_count)],
+            'Temperature': [20.0 + i % 50 for i in range(row_count)],
+        })
+
+    def to_parquet(self, frame, **kwargs):
+        buffer = io.BytesIO()
+        frame.to_parquet(buffer, index=False, **kwargs)
+        return SimpleUploadedFile('data.parquet', buffer.getvalue())
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet_matches_csv(self):
+        frame = self.make_frame(1500)
+        csv_file = SimpleUploadedFile('data.csv', frame.to_csv(index=False).encode('utf-8'))
+        csv_aggregator, _, csv_columnar = ingest_uploaded_file(csv_file)
+        table_aggregator, csv_payload, table_columnar = ingest_uploaded_file(self.to_parquet(frame, row_group_size=400), chunk_rows=300)
+        self.assertEqual(csv_payload, b'')
+        self.assertEqual(table_aggregator.as_model_fields(), csv_aggregator.as_model_fields())
+        pd.testing.assert_frame_equal(columnar_to_frame(table_columnar), columnar_to_frame(csv_columnar))
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_arrow_ipc_file(self):
+        frame = self.make_frame(200)
+        sink = io.BytesIO()
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        with pyarrow.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=64)
+        aggregator, _, _ = ingest_uploaded_file(SimpleUploadedFile('data.arrow', sink.getvalue()))
+        self.assertEqual(aggregator.total_count, 200)
+        self.assertAlmostEqual(aggregator.mean('Flowrate'), frame['Flowrate'].mean(), places=9)
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet_content_rules_apply(self):
+        frame = self.make_frame(10)
+        frame['Pressure'] = frame['Pressure'].astype(str)
+        frame.loc[4, 'Pressure'] = 'n/a'
+        frame.loc[6, 'Flowrate'] = None
+        with self.assertRaises(ValidationError) as ctx:
+            ingest_uploaded_file(self.to_parquet(frame))
+        self.assertIn('Pressure', str(ctx.exception))
+        self.assertIn('Flowrate', str(ctx.exception))
+
+    @skipUnless(pyarrow, 'pyarrow is not installed')
+    def test_parquet_without_rows_rejected(self):
+        with self.assertRaises(ValidationError) as ctx:
+            ingest_uploaded_file(self.to_parquet(self.make_frame(0)))
+        self.assertIn('empty', str(ctx.exception).lower())
+
+    def test_table_upload_without_pyarrow(self):
+        with mock.patch('api.ingest.pyarrow', None):
+            with self.assertRaises(ValidationError) as ctx:
+                ingest_uploaded_file(SimpleUploadedFile('data.parquet', b'PAR1' + b'\0' * 32))
+        self.assertIn('not supported', str(ctx.exception))
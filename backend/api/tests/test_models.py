@@ -0,0 +1,76 @@
+from io import StringIO
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth.models import User
+
+import pandas as pd
+
+from api.columnar import frame_to_columnar
+from api.models import EquipmentDataset, EquipmentDatasetBlob
+
+
+class DatasetStorageTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('testuser', password='testpass123')
+
+    def create_dataset(self, csv_text, columnar_payload=b''):
+        blob = EquipmentDatasetBlob(columnar_payload=columnar_payload)
+        blob.csv_data = csv_text
+        blob.save()
+        dataset = EquipmentDataset.objects.create(
+            user=self.user, filename='test.csv', total_count=1,
+            avg_flowrate=0.0, avg_pressure=0.0, avg_temperature=0.0,
+            type_distribution={}, blob=blob
+        )
+        return EquipmentDataset.objects.get(pk=dataset.pk)
+
+    def test_csv_data_round_trips_through_compressed_payload(self):
+        csv_text = 'Equipment Name,Type,Flowrate,Pressure,Temperature\n' + 'Pump-1,Pump,100.0,5.0,25.0\n' * 100
+        blob = self.create_dataset(csv_text).blob
+        self.assertEqual(blob.csv_data, csv_text)
+        self.assertLess(len(blob.csv_payload), len(csv_text) // 5)
+
+    def test_equipment_frame_prefers_columnar_payload(self):
+        csv_text = 'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100,5.5,25\nValve-1,Valve,80,4.0,30\n'
+        equipment_df = pd.read_csv(StringIO(csv_text))
+        dataset = self.create_dataset(csv_text, frame_to_columnar(equipment_df))
+
+        with mock.patch('api.models.read_csv_frame') as read_csv_mock:
+            loaded_df = dataset.equipment_frame()
+        read_csv_mock.assert_not_called()
+        self.assertEqual(loaded_df['Type'].dtype.name, 'category')
+        self.assertEqual(loaded_df['Flowrate'].dtype, 'float64')
+        self.assertEqual(list(loaded_df['Equipment Name']), ['Pump-1', 'Valve-1'])
+        self.assertEqual(loaded_df['Pressure'].tolist(), [5.5, 4.0])
+
+    def test_equipment_frame_falls_back_to_csv(self):
+        csv_text = 'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100,5.5,25\n'
+        dataset = self.create_dataset(csv_text)
+        self.assertEqual(dataset.equipment_frame(columns=['Temperature'])['Temperature'].tolist(), [25])
+
+    def test_listing_datasets_does_not_read_payloads(self):
+        self.create_dataset('Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100,5.5,25\n')
+        with CaptureQueriesContext(connection) as queries:
+            list(EquipmentDataset.objects.filter(user=self.user))
+        self.assertNotIn('payload', queries[0]['sql'])
+
+    def test_deleting_dataset_deletes_blob(self):
+        dataset = self.create_dataset('Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100,5.5,25\n')
+        dataset.delete()
+        self.assertFalse(EquipmentDatasetBlob.objects.exists())
+
+    def test_shared_blob_is_deleted_with_last_dataset(self):
+        dataset = self.create_dataset('Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100,5.5,25\n')
+        other_user = User.objects.create_user('otheruser', password='testpass123')
+        other_dataset = EquipmentDataset.objects.create(
+            user=other_user, filename='test.csv', total_count=1,
+            avg_flowrate=0.0, avg_pressure=0.0, avg_temperature=0.0,
+            type_distribution={}, blob=dataset.blob
+        )
+        dataset.delete()
+        self.assertEqual(EquipmentDatasetBlob.objects.get(), other_dataset.blob)
+        other_user.delete()
+        self.assertFalse(EquipmentDatasetBlob.objects.exists())
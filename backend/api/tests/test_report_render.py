@@ -0,0 +1,107 @@
+import io
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from api.columnar import columnar_to_frame, frame_to_columnar
+from api.csv_parsers import read_csv_frame
+from api.management.commands.benchmark_csv_parsers import synthetic_csv
+from api.management.commands.benchmark_reports import synthetic_report_source
+from api.report_render import RENDER_SLOTS_DIRNAME, ReportRenderError, render_report_file, report_payload
+from api.report_template import _STATIC_PARAGRAPHS, paragraph
+from api.reports import build_report
+
+
+def synthetic_dataset(row_count):
+    equipment_df = read_csv_frame(synthetic_csv(row_count))
+    column_stats = {'count': row_count, 'mean': 1.0, 'std': 1.0, 'min': 0.0, 'q1': 0.5, 'median': 1.0, 'q3': 1.5, 'max': 2.0}
+    return SimpleNamespace(
+        id=1, filename='synthetic.csv', uploaded_at=timezone.now(), total_count=row_count,
+        avg_flowrate=1.0, avg_pressure=1.0, avg_temperature=1.0,
+        statistics={col: column_stats for col in ['Flowrate', 'Pressure', 'Temperature']},
+        type_distribution=equipment_df['Type'].value_counts().to_dict(),
+        blob=SimpleNamespace(columnar_payload=frame_to_columnar(equipment_df)),
+        equipment_frame=lambda columns=None: equipment_df[columns] if columns else equipment_df,
+    )
+
+
+@override_settings(REPORT_RENDER_WORKERS=1, REPORT_RENDER_TIMEOUT=60, REPORT_RENDER_MEMORY_MB=1024)
+class ReportRenderTests(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.output_path = Path(temp_dir.name) / 'report.pdf'
+        cache_settings = override_settings(REPORT_CACHE_DIR=Path(temp_dir.name) / 'cache')
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+
+    def test_payload_is_columnar_and_trimmed_to_table_rows(self):
+        dataset = synthetic_dataset(50)
+        with override_settings(REPORT_TABLE_MODE='first', REPORT_TABLE_ROWS=20):
+            payload = report_payload(dataset)
+        self.assertEqual(payload['row_count'], 20)
+        self.assertIsInstance(payload['columnar_payload'], bytes)
+        self.assertEqual(list(columnar_to_frame(payload['columnar_payload'])['Equipment Name']), [f'Unit-{i}' for i in range(20)])
+        with override_settings(REPORT_TABLE_MODE='summary'):
+            self.assertEqual(report_payload(dataset)['columnar_payload'], b'')
+
+    def test_render_in_subprocess_reports_progress(self):
+        progress = []
+        render_report_file(synthetic_dataset(100), self.output_path, progress=lambda pages, rows: progress.append(rows))
+        self.assertTrue(self.output_path.read_bytes().startswith(b'%PDF'))
+        self.assertEqual(progress[-1], 100)
+
+    @override_settings(REPORT_RENDER_TIMEOUT=1)
+    def test_render_past_timeout_is_killed(self):
+        with self.assertRaisesMessage(ReportRenderError, 'exceeded the 1 s time limit'):
+            render_report_file(synthetic_dataset(100_000), self.output_path)
+
+    @override_settings(REPORT_RENDER_TIMEOUT=1)
+    def test_render_slots_are_shared_between_processes(self):
+        slots_dir = self.output_path.parent / 'cache' / RENDER_SLOTS_DIRNAME
+        slots_dir.mkdir(parents=True)
+        holder = subprocess.Popen(
+            [sys.executable, '-c', (
+                'import fcntl, sys, time\n'
+                'slot = open(sys.argv[1], "a")\n'
+                'fcntl.flock(slot, fcntl.LOCK_EX)\n'
+                'print("locked", flush=True)\n'
+                'time.sleep(60)\n'
+            ), str(slots_dir / 'slot-0.lock')],
+            stdout=subprocess.PIPE, text=True,
+        )
+        self.addCleanup(holder.stdout.close)
+        self.addCleanup(holder.wait)
+        self.addCleanup(holder.kill)
+        self.assertEqual(holder.stdout.readline().strip(), 'locked')
+        with self.assertRaisesMessage(ReportRenderError, 'busy'):
+            render_report_file(synthetic_dataset(10), self.output_path)
+        holder.kill()
+        holder.wait()
+        render_report_file(synthetic_dataset(10), self.output_path)
+        self.assertTrue(self.output_path.exists())
+
+    @override_settings(REPORT_RENDER_MEMORY_MB=64)
+    def test_render_past_memory_limit_is_killed(self):
+        with self.assertRaisesMessage(ReportRenderError, 'exceeded the 64 MB memory limit'):
+            render_report_file(synthetic_dataset(100_000), self.output_path)
+
+
+class ReportTemplateTests(TestCase):
+    def test_layout_never_touches_shared_template_objects(self):
+        report_source = synthetic_report_source(20)
+        for _ in range(2):
+            build_report(report_source, io.BytesIO(), row_count=20)
+        self.assertIsNot(paragraph('Summary Statistics', 'Heading2'), _STATIC_PARAGRAPHS[('Summary Statistics', 'Heading2')])
+        self.assertFalse(any(hasattr(template, 'blPara') for template in _STATIC_PARAGRAPHS.values()))
+
+    def test_benchmark_reports_command(self):
+        out = io.StringIO()
+        call_command('benchmark_reports', '--rows', '5', '--reports', '1', '--repeat', '1', stdout=out)
+        self.assertIn('ms/report', out.getvalue())
@@ -0,0 +1,89 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from api.constants import HISTORY_LIMIT
+from api.models import EquipmentDataset, EquipmentDatasetBlob, HistoryQuota
+from api.retention import history_limit_for, sweep_history, visible_datasets
+
+
+class HistoryRetentionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('testuser', password='testpass123')
+        self.other_user = User.objects.create_user('otheruser', password='testpass123')
+
+    def create_datasets(self, user, count):
+        now = timezone.now()
+        datasets = []
+        for i in range(count):
+            dataset = EquipmentDataset.objects.create(
+                user=user, filename=f'run{i}.csv', total_count=1,
+                avg_flowrate=float(i), avg_pressure=0.0, avg_temperature=0.0,
+                type_distribution={}, blob=EquipmentDatasetBlob.objects.create()
+            )
+            EquipmentDataset.objects.filter(pk=dataset.pk).update(uploaded_at=now + timedelta(minutes=i))
+            datasets.append(dataset)
+        return datasets
+
+    def test_quota_overrides_default_limit(self):
+        self.assertEqual(history_limit_for(self.user.id), HISTORY_LIMIT)
+        HistoryQuota.objects.create(user=self.user, history_limit=2)
+        self.assertEqual(history_limit_for(self.user.id), 2)
+
+    def test_reads_are_capped_before_sweep(self):
+        datasets = self.create_datasets(self.user, HISTORY_LIMIT + 3)
+        self.assertEqual(
+            set(visible_datasets(self.user).values_list('id', flat=True)),
+            {dataset.id for dataset in datasets[3:]}
+        )
+        self.assertEqual(EquipmentDataset.objects.filter(user=self.user).count(), HISTORY_LIMIT + 3)
+
+    def test_hidden_dataset_is_not_found(self):
+        datasets = self.create_datasets(self.user, HISTORY_LIMIT + 1)
+        client = Client()
+        token = Token.objects.create(user=self.user)
+        response = client.get(f'/api/dataset/{datasets[0].id}/', HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 404)
+        history = client.get('/api/history/', HTTP_AUTHORIZATION=f'Token {token.key}').json()
+        self.assertEqual(len(history), HISTORY_LIMIT)
+
+    def test_sweep_removes_only_datasets_beyond_quota(self):
+        self.create_datasets(self.user, HISTORY_LIMIT + 2)
+        self.create_datasets(self.other_user, 4)
+        HistoryQuota.objects.create(user=self.other_user, history_limit=1)
+        self.assertEqual(sweep_history(), 2 + 3)
+        self.assertEqual(
+            sorted(EquipmentDataset.objects.filter(user=self.user).values_list('filename', flat=True)),
+            [f'run{i}.csv' for i in range(2, HISTORY_LIMIT + 2)]
+        )
+        self.assertEqual(list(EquipmentDataset.objects.filter(user=self.other_user).values_list('filename', flat=True)), ['run3.csv'])
+        self.assertEqual(EquipmentDatasetBlob.objects.count(), EquipmentDataset.objects.count())
+
+    @override_settings(JOB_WORKERS=0)
+    def test_upload_sweeps_after_commit(self):
+        self.create_datasets(self.user, HISTORY_LIMIT)
+        client = Client()
+        token = Token.objects.create(user=self.user)
+        csv_file = SimpleUploadedFile('new.csv', b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.0,5.0,25.0\n', content_type='text/csv')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/upload/', {'file': csv_file}, HTTP_AUTHORIZATION=f'Token {token.key}')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(EquipmentDataset.objects.filter(user=self.user).count(), HISTORY_LIMIT)
+        self.assertFalse(EquipmentDataset.objects.filter(user=self.user, filename='run0.csv').exists())
+
+    def test_management_commands(self):
+        self.create_datasets(self.user, 3)
+        out = StringIO()
+        call_command('set_history_quota', 'testuser', '1', stdout=out)
+        call_command('sweep_history', '--user', 'testuser', stdout=out)
+        self.assertEqual(EquipmentDataset.objects.filter(user=self.user).count(), 1)
+        call_command('set_history_quota', 'testuser', 'default', stdout=out)
+        self.assertFalse(HistoryQuota.objects.filter(user=self.user).exists())
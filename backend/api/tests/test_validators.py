@@ -6,15 +6,19 @@ from django.test import TestCase
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 
+import numpy as np
 import pandas as pd
 
 from api.validators import (
     validate_file_size,
     validate_file_extension,
     validate_csv_structure,
-    validate_csv_content
+    validate_csv_content,
+    compact_row_ranges,
+    format_row_ranges,
+    ContentErrors
 )
-from api.constants import MAX_UPLOAD_SIZE, REQUIRED_COLUMNS
+from api.constants import ALLOWED_EXTENSIONS, MAX_UPLOAD_SIZE, MAX_REPORTED_RANGES, REQUIRED_COLUMNS
 
 
 class FileValidatorTests(TestCase):
@@ -47,6 +51,13 @@ class FileValidatorTests(TestCase):
             validate_file_extension(file)
         self.assertIn('.csv', str(ctx.exception))
 
+    def test_file_extension_error_lists_every_allowed_extension(self):
+        with self.assertRaises(ValidationError) as ctx:
+            validate_file_extension(SimpleUploadedFile('data.txt', b'content'))
+        self.assertEqual(ctx.exception.messages[0], 'Only .csv, .csv.gz, .parquet, .arrow and .feather files allowed.')
+        for extension in ALLOWED_EXTENSIONS:
+            validate_file_extension(SimpleUploadedFile(f'data{extension}', b'content'))
+
 
 class CSVStructureTests(TestCase):
 
@@ -105,3 +116,50 @@ Valve1,Valve,20,10,30
 Heat Exchanger,Exchanger,15,8,50'''
         df = pd.read_csv(StringIO(csv_data))
         validate_csv_content(df)
+
+    def test_reports_all_invalid_columns_as_row_ranges(self):
+        csv_data = '''Equipment Name,Type,Flowrate,Pressure,Temperature
+P1,Pump,x,5,25
+P2,Pump,y,5,25
+P3,Pump,z,,25
+P4,Pump,1,5,bad
+P5,Pump,w,,25
+'''
+        df = pd.read_csv(StringIO(csv_data))
+        with self.assertRaises(ValidationError) as ctx:
+            validate_csv_content(df)
+        messages = ctx.exception.messages
+        self.assertEqual(messages, [
+            'Invalid numeric value in column "Flowrate" at row(s): 2-4, 6',
+            'Missing values in column "Pressure" at row(s): 4, 6',
+            'Invalid numeric value in column "Temperature" at row(s): 5',
+        ])
+
+    def test_empty_and_invalid_reported_separately(self):
+        csv_data = 'Equipment Name,Type,Flowrate,Pressure,Temperature\nP1,Pump,,5,25\nP2,Pump,abc,5,25\n'
+        df = pd.read_csv(StringIO(csv_data))
+        with self.assertRaises(ValidationError) as ctx:
+            validate_csv_content(df)
+        self.assertEqual(ctx.exception.messages, [
+            'Invalid numeric value in column "Flowrate" at row(s): 3',
+            'Missing values in column "Flowrate" at row(s): 2',
+        ])
+
+
+class RowRangeTests(TestCase):
+
+    def test_compact_row_ranges(self):
+        rows = np.array([2, 3, 4, 7, 9, 10])
+        self.assertEqual(compact_row_ranges(rows), [[2, 4], [7, 7], [9, 10]])
+
+    def test_format_truncates_long_range_lists(self):
+        ranges = [[row, row] for row in range(0, 2 * (MAX_REPORTED_RANGES + 10), 2)]
+        text = format_row_ranges(ranges, len(ranges))
+        self.assertTrue(text.endswith(' and 10 more'))
+
+    def test_ranges_merge_across_chunks(self):
+        csv_data = 'Equipment Name,Type,Flowrate,Pressure,Temperature\n' + 'P,Pump,,5,25\n' * 6
+        content_errors = ContentErrors()
+        for chunk in pd.read_csv(StringIO(csv_data), chunksize=2):
+            content_errors.add(chunk)
+        self.assertEqual(content_errors.messages(), ['Missing values in column "Flowrate" at row(s): 2-7'])
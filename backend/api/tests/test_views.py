@@ -1,7 +1,35 @@
-from django.test import TestCase, Client
+import gzip
+import hashlib
+import io
+import os
+import tempfile
+import json
+import zipfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.test.client import BOUNDARY, encode_multipart
 from django.contrib.auth.models import User
+from django.utils import timezone
 from rest_framework.authtoken.models import Token
 from django.core.files.uploadedfile import SimpleUploadedFile
+import pandas as pd
+import pyarrow.parquet
+
+from api.comparison import compare_distributions
+from api.constants import HISTORY_LIMIT
+from api.ingest import parse_spooled_upload
+from api.models import EquipmentDataset, EquipmentDatasetBlob, Job, UploadSession
+from api.report_cache import cached_report_path, evict_report_cache, report_etag
+from api.report_render import ReportRenderError, render_report_file
+from api.reports import REPORT_TABLE_MODES, build_report
+from api.worker_pool import map_tasks
 
 
 class LoginViewTests(TestCase):
@@ -31,6 +59,7 @@ class LoginViewTests(TestCase):
 
 class UploadViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user('testuser', password='testpass123')
         self.token = Token.objects.create(user=self.user)
@@ -65,9 +94,403 @@ class UploadViewTests(TestCase):
         )
         self.assertEqual(response.status_code, 400)
 
+    def test_upload_invalid_encoding(self):
+        csv_file = SimpleUploadedFile('test.csv', b'Equipment Name,Type\n\xff\xfe,Pump\n', content_type='text/csv')
+        response = self.client.post(
+            '/api/upload/',
+            {'file': csv_file},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('UTF-8', response.json()['error'])
+
+    def test_upload_parquet_without_pyarrow(self):
+        parquet_file = SimpleUploadedFile('data.parquet', b'PAR1' + b'\0' * 32, content_type='application/octet-stream')
+        with mock.patch('api.ingest.pyarrow', None):
+            response = self.client.post(
+                '/api/upload/',
+                {'file': parquet_file},
+                HTTP_AUTHORIZATION=f'Token {self.token.key}'
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('not supported', response.json()['error'])
+
+    def test_upload_parquet_with_numeric_type(self):
+        buffer = io.BytesIO()
+        pd.DataFrame({
+            'Equipment Name': ['Pump-1', 'Pump-2', 'Valve-1'],
+            'Type': [1, 1, 2],
+            'Flowrate': [100.0, 110.0, 50.0],
+            'Pressure': [5.0, 5.5, 2.0],
+            'Temperature': [25.0, 26.0, 30.0],
+        }).to_parquet(buffer, index=False)
+        response = self.client.post(
+            '/api/upload/',
+            {'file': SimpleUploadedFile('data.parquet', buffer.getvalue())},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['type_distribution'], {'1': 2, '2': 1})
+
+    def test_upload_gzip_file(self):
+        gz_file = SimpleUploadedFile('test.csv.gz', gzip.compress(self.valid_csv), content_type='application/gzip')
+        response = self.client.post(
+            '/api/upload/',
+            {'file': gz_file},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['total_count'], 1)
+        self.assertEqual(EquipmentDataset.objects.get().blob.csv_data, self.valid_csv.decode('utf-8'))
+
+    def test_upload_gzip_file_over_decompressed_limit(self):
+        rows = b'Pump-1,Pump,100.0,5.0,25.0\n' * (11 * 1024 * 1024 // 27)
+        gz_file = SimpleUploadedFile('big.csv.gz', gzip.compress(self.valid_csv + rows), content_type='application/gzip')
+        response = self.client.post(
+            '/api/upload/',
+            {'file': gz_file},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exceeds', response.json()['error'])
+        self.assertFalse(EquipmentDataset.objects.exists())
+
+    def test_upload_gzip_encoded_body(self):
+        body = encode_multipart(BOUNDARY, {'file': SimpleUploadedFile('test.csv', self.valid_csv, content_type='text/csv')})
+        response = self.client.post(
+            '/api/upload/',
+            gzip.compress(body),
+            content_type=f'multipart/form-data; boundary={BOUNDARY}',
+            HTTP_CONTENT_ENCODING='gzip',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['filename'], 'test.csv')
+
+    def test_upload_gzip_encoded_body_over_limit(self):
+        body = encode_multipart(BOUNDARY, {'file': SimpleUploadedFile('test.csv', self.valid_csv * 100, content_type='text/csv')})
+        with mock.patch('api.middleware.MAX_UPLOAD_SIZE', 1024), mock.patch('api.middleware.GZIP_BODY_OVERHEAD', 0):
+            response = self.client.post(
+                '/api/upload/',
+                gzip.compress(body),
+                content_type=f'multipart/form-data; boundary={BOUNDARY}',
+                HTTP_CONTENT_ENCODING='gzip',
+                HTTP_AUTHORIZATION=f'Token {self.token.key}'
+            )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exceeds', response.json()['error'])
+
+    def test_upload_invalid_gzip_body(self):
+        response = self.client.post(
+            '/api/upload/',
+            b'not gzip at all',
+            content_type=f'multipart/form-data; boundary={BOUNDARY}',
+            HTTP_CONTENT_ENCODING='gzip',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        self.assertEqual(response.status_code, 400)
+
+
+class UploadDeduplicationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user('testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.csv_content = b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.0,5.0,25.0\n'
+
+    def upload(self, name, content, token=None):
+        csv_file = SimpleUploadedFile(name, content, content_type='text/csv')
+        return self.client.post(
+            '/api/upload/',
+            {'file': csv_file},
+            HTTP_AUTHORIZATION=f'Token {(token or self.token).key}'
+        )
+
+    def test_reupload_reuses_existing_dataset(self):
+        first = self.upload('first.csv', self.csv_content)
+        self.upload('other.csv', self.csv_content.replace(b'100.0', b'90.0'))
+        again = self.upload('renamed.csv', self.csv_content)
+
+        self.assertEqual(again.status_code, 201)
+        self.assertEqual(again.json()['id'], first.json()['id'])
+        self.assertEqual(again.json()['filename'], 'renamed.csv')
+        self.assertEqual(EquipmentDataset.objects.filter(user=self.user).count(), 2)
+
+        history = self.client.get('/api/history/', HTTP_AUTHORIZATION=f'Token {self.token.key}').json()
+        self.assertEqual(history[0]['id'], first.json()['id'])
+
+    def test_identical_upload_by_other_user_shares_blob(self):
+        first = self.upload('first.csv', self.csv_content)
+        other_user = User.objects.create_user('other', password='testpass123')
+        other_token = Token.objects.create(user=other_user)
+
+        with mock.patch('api.ingest.ingest_uploaded_csv') as ingest_mock:
+            response = self.upload('mine.csv', self.csv_content, token=other_token)
+
+        ingest_mock.assert_not_called()
+        self.assertEqual(response.status_code, 201)
+        self.assertNotEqual(response.json()['id'], first.json()['id'])
+        self.assertEqual(response.json()['avg_flowrate'], first.json()['avg_flowrate'])
+        self.assertEqual(EquipmentDatasetBlob.objects.count(), 1)
+        self.assertEqual(EquipmentDataset.objects.get(pk=response.json()['id']).blob_id, EquipmentDataset.objects.get(pk=first.json()['id']).blob_id)
+
+
+@override_settings(JOB_WORKERS=0)
+class BatchUploadViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user('testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+
+    def csv_file(self, name, flowrate):
+        content = f'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,{flowrate},5.0,25.0\n'.encode('utf-8')
+        return SimpleUploadedFile(name, content, content_type='text/csv')
+
+    def post_batch(self, files):
+        return self.client.post('/api/upload/batch/', {'files': files}, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_batch_reports_result_per_file(self):
+        response = self.post_batch([
+            self.csv_file('a.csv', 10.0),
+            SimpleUploadedFile('notes.txt', b'hello', content_type='text/plain'),
+            SimpleUploadedFile('bad.csv', b'Equipment Name,Type\nPump-1,Pump\n', content_type='text/csv'),
+            self.csv_file('b.csv', 20.0),
+        ])
+        self.assertEqual(response.status_code, 201)
+        results = response.json()['results']
+        self.assertEqual([result['filename'] for result in results], ['a.csv', 'notes.txt', 'bad.csv', 'b.csv'])
+        self.assertEqual(results[0]['dataset']['avg_flowrate'], 10.0)
+        self.assertIn('.csv', results[1]['error'])
+        self.assertIn('Flowrate', results[2]['error'])
+        self.assertTrue(results[3]['retained'])
+        self.assertEqual(EquipmentDataset.objects.filter(user=self.user).count(), 2)
+
+    def test_batch_schedules_one_history_sweep(self):
+        files = [self.csv_file(f'run{i}.csv', float(i)) for i in range(HISTORY_LIMIT + 2)]
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.post_batch(files)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(callbacks), 1)
+        results = response.json()['results']
+        self.assertEqual([result['retained'] for result in results], [False, False] + [True] * HISTORY_LIMIT)
+        self.assertEqual(
+            sorted(EquipmentDataset.objects.filter(user=self.user).values_list('filename', flat=True)),
+            [f'run{i}.csv' for i in range(2, HISTORY_LIMIT + 2)]
+        )
+
+    def test_repeated_content_parsed_once(self):
+        with mock.patch('api.ingest.parse_spooled_upload', wraps=parse_spooled_upload) as parse:
+            response = self.post_batch([self.csv_file('a.csv', 10.0), self.csv_file('copy.csv', 10.0)])
+        self.assertEqual(parse.call_count, 1)
+        results = response.json()['results']
+        self.assertEqual(results[0]['dataset']['id'], results[1]['dataset']['id'])
+        self.assertEqual(EquipmentDataset.objects.get().filename, 'copy.csv')
+
+    def test_batch_without_files(self):
+        response = self.client.post('/api/upload/batch/', {}, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 400)
+
+    def test_batch_too_many_files(self):
+        with mock.patch('api.views.MAX_BATCH_FILES', 1):
+            response = self.post_batch([self.csv_file('a.csv', 1.0), self.csv_file('b.csv', 2.0)])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(EquipmentDataset.objects.exists())
+
+    def test_batch_with_only_invalid_files(self):
+        response = self.post_batch([SimpleUploadedFile('bad.csv', b'Equipment Name\n', content_type='text/csv')])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('error', response.json()['results'][0])
+
+
+@override_settings(JOB_WORKERS=0)
+class UploadJobViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user('testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool_dir.cleanup)
+        spool_override = override_settings(UPLOAD_SPOOL_DIR=Path(self.spool_dir.name))
+        spool_override.enable()
+        self.addCleanup(spool_override.disable)
+
+    def post_async(self, content, name='test.csv'):
+        csv_file = SimpleUploadedFile(name, content, content_type='text/csv')
+        return self.client.post(
+            '/api/upload/?async=1',
+            {'file': csv_file},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+
+    def test_async_upload_returns_job(self):
+        response = self.post_async(b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.0,5.0,25.0\n')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()['id']
+
+        response = self.client.get(f'/api/jobs/{job_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'succeeded')
+        self.assertEqual(response.json()['dataset']['total_count'], 1)
+        self.assertEqual(list(Path(self.spool_dir.name).iterdir()), [])
+
+    def test_async_upload_reports_validation_error(self):
+        response = self.post_async(b'Equipment Name,Type,Flowrate\nPump-1,Pump,100.0\n')
+        job_id = response.json()['id']
+
+        response = self.client.get(f'/api/jobs/{job_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.json()['status'], 'failed')
+        self.assertIn('Pressure', response.json()['error'])
+        self.assertIsNone(response.json()['dataset'])
+
+    def test_job_of_other_user_not_found(self):
+        response = self.post_async(b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.0,5.0,25.0\n')
+        other_user = User.objects.create_user('other', password='testpass123')
+        other_token = Token.objects.create(user=other_user)
+        response = self.client.get(f"/api/jobs/{response.json()['id']}/", HTTP_AUTHORIZATION=f'Token {other_token.key}')
+        self.assertEqual(response.status_code, 404)
+
+
+    def test_stale_job_is_failed_when_polled(self):
+        spool_path = Path(self.spool_dir.name) / 'lost.upload'
+        spool_path.write_bytes(b'data')
+        lost_job = Job.objects.create(user=self.user, filename='lost.csv', spool_path=str(spool_path), status=Job.STATUS_RUNNING)
+        Job.objects.filter(pk=lost_job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        
+        with override_settings(JOB_STALE_TIMEOUT=1800):
+            response = self.client.get(f'/api/jobs/{lost_job.id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.json()['status'], 'failed')
+        self.assertIn('abandoned', response.json()['error'])
+        self.assertFalse(spool_path.exists())
+
+    def test_sweep_jobs_command(self):
+        old = timezone.now() - timedelta(days=30)
+        finished_job = Job.objects.create(user=self.user, filename='a.csv', status=Job.STATUS_SUCCEEDED)
+        queued_job = Job.objects.create(user=self.user, filename='b.csv')
+        recent_job = Job.objects.create(user=self.user, filename='c.csv', status=Job.STATUS_FAILED)
+        Job.objects.filter(pk__in=[finished_job.pk, queued_job.pk]).update(updated_at=old)
+        
+        output = io.StringIO()
+        call_command('sweep_jobs', stdout=output)
+        self.assertIn('Failed 1 stale job(s), removed 1 finished job(s)', output.getvalue())
+        self.assertFalse(Job.objects.filter(pk=finished_job.pk).exists())
+        self.assertEqual(Job.objects.get(pk=queued_job.pk).status, Job.STATUS_FAILED)
+        self.assertTrue(Job.objects.filter(pk=recent_job.pk).exists())
+
+    def test_new_job_prunes_old_finished_jobs(self):
+        finished_job = Job.objects.create(user=self.user, filename='a.csv', status=Job.STATUS_SUCCEEDED)
+        Job.objects.filter(pk=finished_job.pk).update(updated_at=timezone.now() - timedelta(days=30))
+        self.post_async(b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.0,5.0,25.0\n')
+        self.assertFalse(Job.objects.filter(pk=finished_job.pk).exists())
+
+class UploadSessionViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user('testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        self.content = b'Equipment Name,Type,Flowrate,Pressure,Temperature\n' + b''.join(
+            f'Pump-{i},Pump,{i}.0,5.0,25.0\n'.encode() for i in range(200)
+        )
+        self.spool_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.spool_dir.cleanup)
+        spool_override = override_settings(UPLOAD_SPOOL_DIR=Path(self.spool_dir.name))
+        spool_override.enable()
+        self.addCleanup(spool_override.disable)
+
+    def create_session(self, content, filename='test.csv'):
+        return self.client.post('/api/uploads/', {
+            'filename': filename,
+            'size': len(content),
+            'sha256': hashlib.sha256(content).hexdigest()
+        }, content_type='application/json', **self.auth)
+
+    def put_chunk(self, session_id, offset, chunk, checksum=None):
+        return self.client.put(
+            f'/api/uploads/{session_id}/chunk/?offset={offset}',
+            chunk,
+            content_type='application/octet-stream',
+            HTTP_X_CHUNK_SHA256=checksum or hashlib.sha256(chunk).hexdigest(),
+            **self.auth
+        )
+
+    def test_chunked_upload_and_resume(self):
+        session_id = self.create_session(self.content).json()['id']
+        first, second = self.content[:1000], self.content[1000:]
+
+        self.assertEqual(self.put_chunk(session_id, 0, first).json()['offset'], 1000)
+        response = self.client.get(f'/api/uploads/{session_id}/', **self.auth)
+        self.assertEqual(response.json()['offset'], 1000)
+
+        self.assertEqual(self.put_chunk(session_id, 1000, second).status_code, 200)
+        response = self.client.post(f'/api/uploads/{session_id}/complete/', **self.auth)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['total_count'], 200)
+        self.assertEqual(list(Path(self.spool_dir.name).iterdir()), [])
+
+    def test_chunk_at_wrong_offset_conflicts(self):
+        session_id = self.create_session(self.content).json()['id']
+        response = self.put_chunk(session_id, 500, self.content[500:700])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 0)
+
+    def test_chunk_checksum_mismatch_rejected(self):
+        session_id = self.create_session(self.content).json()['id']
+        response = self.put_chunk(session_id, 0, self.content[:100], checksum='0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(f'/api/uploads/{session_id}/', **self.auth).json()['offset'], 0)
+
+    def test_complete_before_all_chunks_conflicts(self):
+        session_id = self.create_session(self.content).json()['id']
+        self.put_chunk(session_id, 0, self.content[:100])
+        response = self.client.post(f'/api/uploads/{session_id}/complete/', **self.auth)
+        self.assertEqual(response.status_code, 409)
+
+    def test_session_rejects_invalid_extension(self):
+        response = self.create_session(self.content, filename='test.txt')
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(JOB_WORKERS=0)
+    def test_complete_async_returns_job(self):
+        session_id = self.create_session(self.content).json()['id']
+        self.put_chunk(session_id, 0, self.content)
+        response = self.client.post(f'/api/uploads/{session_id}/complete/?async=1', **self.auth)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json()['status'], 'succeeded')
+        self.assertEqual(list(Path(self.spool_dir.name).iterdir()), [])
+
+    def abandon_session(self, session_id):
+        UploadSession.objects.filter(pk=session_id).update(updated_at=timezone.now() - timedelta(hours=25))
+
+    def test_sweep_uploads_command_removes_idle_sessions(self):
+        active_id = self.create_session(self.content).json()['id']
+        self.put_chunk(active_id, 0, self.content[:100])
+        idle_id = self.create_session(self.content).json()['id']
+        self.put_chunk(idle_id, 0, self.content[:100])
+        self.abandon_session(idle_id)
+
+        output = io.StringIO()
+        call_command('sweep_uploads', stdout=output)
+        self.assertEqual(output.getvalue().strip(), 'Removed 1 upload session(s)')
+        self.assertEqual(self.client.get(f'/api/uploads/{idle_id}/', **self.auth).status_code, 404)
+        self.assertEqual(self.client.get(f'/api/uploads/{active_id}/', **self.auth).json()['offset'], 100)
+        self.assertEqual([path.name for path in Path(self.spool_dir.name).iterdir()], [f'{active_id}.part'])
+
+    def test_new_session_expires_idle_sessions(self):
+        idle_id = self.create_session(self.content).json()['id']
+        self.put_chunk(idle_id, 0, self.content[:100])
+        self.abandon_session(idle_id)
+        self.create_session(self.content)
+        self.assertFalse(UploadSession.objects.filter(pk=idle_id).exists())
+        self.assertFalse((Path(self.spool_dir.name) / f'{idle_id}.part').exists())
+
 
 class HistoryViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user('testuser', password='testpass123')
         self.token = Token.objects.create(user=self.user)
@@ -108,6 +531,20 @@ class ReportViewTests(TestCase):
         self.client = Client()
         self.user = User.objects.create_user('testuser', password='testpass123')
         self.token = Token.objects.create(user=self.user)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        cache_override = override_settings(REPORT_CACHE_DIR=Path(self.cache_dir.name), REPORT_RENDER_WORKERS=0)
+        cache_override.enable()
+        self.addCleanup(cache_override.disable)
+
+    def upload_dataset(self, flowrate=100.0):
+        cache.clear()
+        csv_file = SimpleUploadedFile(
+            'test.csv',
+            f'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,{flowrate},5.0,25.0\nValve-1,Valve,80.0,4.0,30.0\n'.encode('utf-8'),
+            content_type='text/csv'
+        )
+        return self.client.post('/api/upload/', {'file': csv_file}, HTTP_AUTHORIZATION=f'Token {self.token.key}').json()['id']
 
     def test_report_requires_auth(self):
         response = self.client.get('/api/report/1/')
@@ -120,9 +557,296 @@ class ReportViewTests(TestCase):
         )
         self.assertEqual(response.status_code, 404)
 
+    def test_report_success(self):
+        dataset_id = self.upload_dataset()
+        response = self.client.get(f'/api/report/{dataset_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response.getvalue().startswith(b'%PDF'))
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+    def test_report_is_built_once_and_revalidated(self):
+        dataset_id = self.upload_dataset()
+        with mock.patch('api.report_cache.render_report_file', wraps=render_report_file) as build:
+            first = self.client.get(f'/api/report/{dataset_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+            second = self.client.get(f'/api/report/{dataset_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+            not_modified = self.client.get(
+                f'/api/report/{dataset_id}/',
+                HTTP_AUTHORIZATION=f'Token {self.token.key}',
+                HTTP_IF_NONE_MATCH=first['ETag']
+            )
+        build.assert_called_once()
+        self.assertEqual(first.getvalue(), second.getvalue())
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified['ETag'], first['ETag'])
+
+    def test_reupload_changes_etag(self):
+        dataset_id = self.upload_dataset()
+        first = self.client.get(f'/api/report/{dataset_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(self.upload_dataset(), dataset_id)
+        second = self.client.get(
+            f'/api/report/{dataset_id}/',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+            HTTP_IF_NONE_MATCH=first['ETag']
+        )
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertEqual(len(list(Path(self.cache_dir.name).glob('*.pdf'))), 1)
+
+    @override_settings(JOB_WORKERS=0)
+    def test_async_report_reports_progress_and_downloads(self):
+        dataset_id = self.upload_dataset()
+        response = self.client.get(f'/api/report/{dataset_id}/?async=1', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 202)
+        job = self.client.get(f"/api/jobs/{response.json()['id']}/", HTTP_AUTHORIZATION=f'Token {self.token.key}').json()
+        self.assertEqual(job['kind'], 'report')
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['progress']['rows'], job['progress']['total_rows'])
+        self.assertGreaterEqual(job['progress']['pages'], 1)
+        download = self.client.get(f"/api/jobs/{job['id']}/download/", HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(download.status_code, 200)
+        self.assertTrue(download.getvalue().startswith(b'%PDF'))
+        not_modified = self.client.get(
+            f"/api/jobs/{job['id']}/download/",
+            HTTP_AUTHORIZATION=f'Token {self.token.key}',
+            HTTP_IF_NONE_MATCH=download['ETag']
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_async_report_of_cached_report_finishes_immediately(self):
+        dataset_id = self.upload_dataset()
+        self.client.get(f'/api/report/{dataset_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        with mock.patch('api.jobs.submit_task') as submit:
+            response = self.client.get(f'/api/report/{dataset_id}/?async=1', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        submit.assert_not_called()
+        self.assertEqual(response.json()['status'], 'succeeded')
+
+    def test_download_before_report_is_ready(self):
+        dataset_id = self.upload_dataset()
+        with mock.patch('api.jobs.submit_task'):
+            job_id = self.client.get(f'/api/report/{dataset_id}/?async=1', HTTP_AUTHORIZATION=f'Token {self.token.key}').json()['id']
+        response = self.client.get(f'/api/jobs/{job_id}/download/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['status'], 'queued')
+
+    def test_report_progress_counts_rows_across_pages(self):
+        dataset_id = self.upload_dataset()
+        dataset = EquipmentDataset.objects.get(pk=dataset_id)
+        rows = ''.join(f'Pump-{i},Pump,{i}.0,5.0,25.0\n' for i in range(200))
+        frame = pd.read_csv(io.StringIO('Equipment Name,Type,Flowrate,Pressure,Temperature\n' + rows))
+        dataset.total_count = len(frame)
+        progress = []
+        with mock.patch.object(EquipmentDataset, 'equipment_frame', return_value=frame):
+            build_report(dataset, io.BytesIO(), progress=lambda pages, laid_out: progress.append((pages, laid_out)))
+        self.assertGreater(len(progress), 2)
+        self.assertEqual([pages for pages, _ in progress], list(range(1, len(progress) + 1)))
+        self.assertEqual(progress[-1][1], 200)
+
+    def test_report_table_modes(self):
+        dataset_id = self.upload_dataset()
+        dataset = EquipmentDataset.objects.get(pk=dataset_id)
+        rows = ''.join(f'Pump-{i},Pump,{i}.0,5.0,25.0\n' for i in range(100))
+        frame = pd.read_csv(io.StringIO('Equipment Name,Type,Flowrate,Pressure,Temperature\n' + rows))
+        dataset.total_count = len(frame)
+        laid_out = {}
+        for table_mode in REPORT_TABLE_MODES:
+            progress = []
+            with override_settings(REPORT_TABLE_MODE=table_mode, REPORT_TABLE_ROWS=30), \
+                    mock.patch.object(EquipmentDataset, 'equipment_frame', return_value=frame):
+                build_report(dataset, io.BytesIO(), progress=lambda pages, rows: progress.append(rows))
+            laid_out[table_mode] = progress[-1]
+        self.assertEqual(laid_out, {'summary': 0, 'first': 30, 'full': 100})
+
+    def test_table_mode_is_part_of_cache_key(self):
+        dataset = EquipmentDataset.objects.get(pk=self.upload_dataset())
+        with override_settings(REPORT_TABLE_MODE='summary'):
+            summary_etag = report_etag(dataset)
+        self.assertNotEqual(summary_etag, report_etag(dataset))
+
+    @override_settings(JOB_WORKERS=0)
+    def test_bulk_reports_stream_zip_in_requested_order(self):
+        first_id = self.upload_dataset()
+        second_id = self.upload_dataset(flowrate=120.0)
+        self.client.get(f'/api/report/{first_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        with mock.patch('api.bulk_reports.map_tasks', wraps=map_tasks) as render:
+            response = self.client.get(f'/api/reports/bulk/?ids={second_id},{first_id}', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        render.assert_called_once_with('api.bulk_reports.render_report', [second_id])
+        with zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content))) as archive:
+            self.assertEqual(archive.namelist(), [f'report_{second_id}.pdf', f'report_{first_id}.pdf'])
+            self.assertTrue(all(archive.read(name).startswith(b'%PDF') for name in archive.namelist()))
+
+    def test_report_evicted_before_open_is_rendered_again(self):
+        dataset_id = self.upload_dataset()
+
+        def evicted_after_lookup(dataset):
+            report_path = cached_report_path(dataset)
+            if evicted_after_lookup.calls == 0:
+                os.remove(report_path)
+            evicted_after_lookup.calls += 1
+            return report_path
+        evicted_after_lookup.calls = 0
+
+        with mock.patch('api.report_cache.cached_report_path', side_effect=evicted_after_lookup):
+            response = self.client.get(f'/api/report/{dataset_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.getvalue().startswith(b'%PDF'))
+        self.assertEqual(evicted_after_lookup.calls, 2)
+
+    def test_report_render_failure_is_reported_cleanly(self):
+        dataset_id = self.upload_dataset()
+        render_error = ReportRenderError('Report rendering exceeded the 120 s time limit.')
+        with mock.patch('api.report_cache.render_report_file', side_effect=render_error):
+            response = self.client.get(f'/api/report/{dataset_id}/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+            with override_settings(JOB_WORKERS=0):
+                job = self.client.get(f'/api/report/{dataset_id}/?async=1', HTTP_AUTHORIZATION=f'Token {self.token.key}').json()
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['error'], str(render_error))
+        self.assertEqual(job['status'], 'failed')
+        self.assertEqual(job['error'], str(render_error))
+        self.assertEqual(list(Path(self.cache_dir.name).iterdir()), [])
+
+    def test_bulk_reports_validate_ids(self):
+        dataset_id = self.upload_dataset()
+        invalid = self.client.get('/api/reports/bulk/?ids=1,abc', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(invalid.status_code, 400)
+        missing = self.client.get(f'/api/reports/bulk/?ids={dataset_id},999', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(missing.json()['ids'], [999])
+
+    def test_cache_evicts_least_recently_served(self):
+        cache_dir = Path(self.cache_dir.name)
+        for i, name in enumerate(['old.pdf', 'recent.pdf']):
+            (cache_dir / name).write_bytes(b'x' * 100)
+            os.utime(cache_dir / name, (1000 + i, 1000 + i))
+        evict_report_cache(max_size=150)
+        self.assertEqual([path.name for path in cache_dir.glob('*.pdf')], ['recent.pdf'])
+
+
+class VisualizationViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user('testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+
+    def test_visualization_min_max(self):
+        csv_file = SimpleUploadedFile(
+            'test.csv',
+            b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.0,5.0,25.0\nValve-1,Valve,80.0,4.0,30.0\n',
+            content_type='text/csv'
+        )
+        dataset_id = self.client.post('/api/upload/', {'file': csv_file}, HTTP_AUTHORIZATION=f'Token {self.token.key}').json()['id']
+        response = self.client.get(f'/api/dataset/{dataset_id}/visualization/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['averages']['min'], [80.0, 4.0, 25.0])
+        self.assertEqual(response.json()['averages']['max'], [100.0, 5.0, 30.0])
+        self.assertEqual(response.json()['statistics']['Flowrate']['median'], 90.0)
+
+    def test_visualization_does_not_load_payloads(self):
+        csv_file = SimpleUploadedFile(
+            'test.csv',
+            b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.0,5.0,25.0\n',
+            content_type='text/csv'
+        )
+        dataset_id = self.client.post('/api/upload/', {'file': csv_file}, HTTP_AUTHORIZATION=f'Token {self.token.key}').json()['id']
+        with mock.patch('api.models.EquipmentDataset.equipment_frame') as equipment_frame:
+            response = self.client.get(f'/api/dataset/{dataset_id}/visualization/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 200)
+        equipment_frame.assert_not_called()
+        self.assertIsNone(response.json()['statistics']['Pressure']['std'])
+
+
+class ExportViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user = User.objects.create_user('testuser', password='testpass123')
+        self.token = Token.objects.create(user=self.user)
+        csv_file = SimpleUploadedFile(
+            'test.csv',
+            b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100.123456789,5.0,25.0\nValve-1,Valve,80.0,4.0,30.0\nPump-2,Pump,90.0,6.0,35.0\n',
+            content_type='text/csv'
+        )
+        self.dataset_id = self.client.post('/api/upload/', {'file': csv_file}, HTTP_AUTHORIZATION=f'Token {self.token.key}').json()['id']
+
+    def export(self, query=''):
+        return self.client.get(f'/api/dataset/{self.dataset_id}/export/{query}', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_export_requires_auth(self):
+        response = self.client.get(f'/api/dataset/{self.dataset_id}/export/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_export_not_found(self):
+        response = self.client.get('/api/dataset/999/export/', HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_csv_by_default(self):
+        response = self.export()
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn(f'dataset_{self.dataset_id}.csv', response['Content-Disposition'])
+        exported = pd.read_csv(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(list(exported.columns), ['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature'])
+        self.assertEqual(list(exported['Equipment Name']), ['Pump-1', 'Valve-1', 'Pump-2'])
+        self.assertEqual(exported['Flowrate'][0], 100.123456789)
+
+    def test_export_does_not_read_csv_payload(self):
+        with CaptureQueriesContext(connection) as queries:
+            b''.join(self.export().streaming_content)
+        self.assertFalse(any('csv_payload' in query['sql'] for query in queries))
+
+    def test_export_jsonl_with_filters(self):
+        response = self.export('?format=jsonl&columns=Equipment Name,Flowrate&type=Pump')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        self.assertEqual([json.loads(line) for line in lines], [
+            {'Equipment Name': 'Pump-1', 'Flowrate': 100.123456789},
+            {'Equipment Name': 'Pump-2', 'Flowrate': 90.0},
+        ])
+
+    def test_export_parquet_in_batches(self):
+        with mock.patch('api.exports.EXPORT_BATCH_ROWS', 2):
+            response = self.export('?format=parquet&type=Pump&type=Valve')
+            body = b''.join(response.streaming_content)
+        self.assertEqual(response.status_code, 200)
+        parquet_file = pyarrow.parquet.ParquetFile(io.BytesIO(body))
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+        exported = parquet_file.read().to_pandas()
+        self.assertEqual(list(exported['Equipment Name']), ['Pump-1', 'Valve-1', 'Pump-2'])
+        self.assertEqual(list(exported['Pressure']), [5.0, 4.0, 6.0])
+
+    def test_export_writes_numeric_columns_as_floats(self):
+        csv_file = SimpleUploadedFile('ints.csv', b'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,100,5,25\n', content_type='text/csv')
+        self.dataset_id = self.client.post('/api/upload/', {'file': csv_file}, HTTP_AUTHORIZATION=f'Token {self.token.key}').json()['id']
+        csv_body = b''.join(self.export().streaming_content)
+        self.assertEqual(csv_body.splitlines()[1], b'Pump-1,Pump,100.0,5.0,25.0')
+        jsonl_body = b''.join(self.export('?format=jsonl&columns=Flowrate').streaming_content)
+        self.assertEqual(jsonl_body, b'{"Flowrate":100.0}\n')
+        parquet_body = b''.join(self.export('?format=parquet').streaming_content)
+        schema = pyarrow.parquet.ParquetFile(io.BytesIO(parquet_body)).schema_arrow
+        self.assertEqual({str(schema.field(col).type) for col in ['Flowrate', 'Pressure', 'Temperature']}, {'double'})
+
+    def test_export_unmatched_type_has_header_only(self):
+        response = self.export('?type=Reactor')
+        self.assertEqual(b''.join(response.streaming_content), b'Equipment Name,Type,Flowrate,Pressure,Temperature\n')
+
+    def test_export_rejects_bad_params(self):
+        response = self.export('?format=xml')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('csv, jsonl, parquet', response.json()['error'])
+        response = self.export('?columns=Flowrate,Speed')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error'], 'Unknown columns: Speed')
+
 
 class CompareViewTests(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = Client()
         self.user = User.objects.create_user('testuser', password='testpass123')
         self.token = Token.objects.create(user=self.user)
@@ -166,3 +890,205 @@ class CompareViewTests(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertIn('comparison', response.json())
 
+
+
+    def upload_dataset(self, name, flowrate, pressure, temperature):
+        csv_content = f'Equipment Name,Type,Flowrate,Pressure,Temperature\nPump-1,Pump,{flowrate},{pressure},{temperature}\n'.encode()
+        response = self.client.post(
+            '/api/upload/',
+            {'file': SimpleUploadedFile(name, csv_content, content_type='text/csv')},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        return response.json()['id']
+
+    def compare_matrix(self, dataset_ids):
+        return self.client.post(
+            '/api/compare/matrix/',
+            {'datasets': dataset_ids},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+
+    def test_compare_matrix_success(self):
+        first = self.upload_dataset('a.csv', 100.0, 5.0, 25.0)
+        second = self.upload_dataset('b.csv', 120.0, 4.0, 25.0)
+        third = self.upload_dataset('c.csv', 90.0, 6.5, 30.0)
+        
+        with self.assertNumQueries(3):
+            response = self.compare_matrix([third, first, second])
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual([ds['id'] for ds in data['datasets']], [third, first, second])
+        self.assertEqual(data['parameters'], ['Flowrate', 'Pressure', 'Temperature'])
+        self.assertEqual(data['differences']['Flowrate'], [
+            [0.0, -10.0, -30.0],
+            [10.0, 0.0, -20.0],
+            [30.0, 20.0, 0.0],
+        ])
+        self.assertEqual(data['differences']['Pressure'][0], [0.0, 1.5, 2.5])
+        self.assertEqual(data['ranking']['Flowrate'], [second, first, third])
+        self.assertEqual(data['ranking']['Pressure'], [third, first, second])
+        self.assertEqual(data['ranking']['Temperature'], [third, first, second])
+
+    def test_compare_matrix_five_datasets(self):
+        dataset_ids = [self.upload_dataset(f'{i}.csv', 100.0 + i, 5.0, 25.0) for i in range(5)]
+        response = self.compare_matrix(dataset_ids)
+        self.assertEqual(response.status_code, 200)
+        flowrate_diffs = response.json()['differences']['Flowrate']
+        self.assertEqual(len(flowrate_diffs), 5)
+        self.assertEqual(flowrate_diffs[4][0], 4.0)
+        self.assertEqual(response.json()['ranking']['Flowrate'], dataset_ids[::-1])
+
+    def test_compare_matrix_invalid_ids(self):
+        dataset_id = self.upload_dataset('a.csv', 100.0, 5.0, 25.0)
+        for dataset_ids in (None, [dataset_id], [dataset_id, dataset_id], [dataset_id, 'abc'], str(dataset_id), list(range(1, 12))):
+            response = self.compare_matrix(dataset_ids)
+            self.assertEqual(response.status_code, 400, dataset_ids)
+            self.assertIn('2 to 10', response.json()['error'])
+
+    def test_compare_matrix_missing_dataset(self):
+        dataset_id = self.upload_dataset('a.csv', 100.0, 5.0, 25.0)
+        other_user = User.objects.create_user('other', password='testpass123')
+        other_dataset = EquipmentDataset.objects.create(
+            user=other_user, filename='x.csv', total_count=1,
+            avg_flowrate=0.0, avg_pressure=0.0, avg_temperature=0.0,
+            type_distribution={}
+        )
+        response = self.compare_matrix([dataset_id, other_dataset.id, 999])
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json()['ids'], [other_dataset.id, 999])
+
+    def upload_rows(self, name, rows):
+        csv_content = 'Equipment Name,Type,Flowrate,Pressure,Temperature\n' + ''.join(f'{row}\n' for row in rows)
+        response = self.client.post(
+            '/api/upload/',
+            {'file': SimpleUploadedFile(name, csv_content.encode(), content_type='text/csv')},
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+        return response.json()['id']
+
+    def compare_distribution(self, first, second):
+        return self.client.post(
+            '/api/compare/distribution/',
+            {'dataset1': first, 'dataset2': second},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+
+    def test_compare_distribution(self):
+        first = self.upload_rows('a.csv', [
+            'Pump-1,Pump,100,5,20', 'Pump-2,Pump,110,5,30', 'Valve-1,Valve,50,2,40', 'Valve-2,Valve,60,3,50',
+        ])
+        second = self.upload_rows('b.csv', [
+            'Pump-1,Pump,120,5,20', 'Pump-2,Pump,130,6,30', 'Valve-1,Valve,50,2,40', 'Mixer-1,Mixer,80,1,60',
+        ])
+        
+        response = self.compare_distribution(first, second)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['dataset1']['id'], first)
+        self.assertEqual(data['parameters'], ['Flowrate', 'Pressure', 'Temperature'])
+        
+        types = {entry['type']: entry for entry in data['types']}
+        self.assertEqual(types['Pump']['counts'], [2, 2])
+        self.assertEqual(types['Pump']['means']['Flowrate'], [105.0, 125.0])
+        self.assertEqual(types['Pump']['deltas']['Flowrate'], -20.0)
+        self.assertEqual(types['Pump']['deltas']['Pressure'], -0.5)
+        self.assertEqual(types['Valve']['deltas']['Flowrate'], 5.0)
+        self.assertEqual(types['Mixer']['counts'], [0, 1])
+        self.assertEqual(types['Mixer']['means']['Flowrate'], [None, 80.0])
+        self.assertIsNone(types['Mixer']['deltas']['Flowrate'])
+        
+        flowrate = data['histograms']['Flowrate']
+        self.assertEqual(len(flowrate['edges']), 21)
+        self.assertEqual(flowrate['edges'][0], 50.0)
+        self.assertEqual(flowrate['edges'][-1], 130.0)
+        self.assertEqual([sum(counts) for counts in flowrate['counts']], [4, 4])
+        
+        self.assertEqual(data['ks_statistic']['Flowrate'], 0.5)
+        self.assertEqual(data['ks_statistic']['Temperature'], 0.25)
+
+    def test_compare_distribution_is_cached_per_pair(self):
+        first = self.upload_rows('a.csv', ['Pump-1,Pump,100,5,20', 'Pump-2,Pump,110,5,30'])
+        second = self.upload_rows('b.csv', ['Pump-1,Pump,120,5,20'])
+        
+        with mock.patch('api.comparison.compare_distributions', wraps=compare_distributions) as compute:
+            first_response = self.compare_distribution(first, second)
+            second_response = self.compare_distribution(first, second)
+            self.compare_distribution(second, first)
+        self.assertEqual(compute.call_count, 2)
+        self.assertEqual(first_response.json(), second_response.json())
+
+    def test_compare_distribution_errors(self):
+        dataset_id = self.upload_rows('a.csv', ['Pump-1,Pump,100,5,20'])
+        self.assertEqual(self.compare_distribution(dataset_id, None).status_code, 400)
+        self.assertEqual(self.compare_distribution(dataset_id, 999).status_code, 404)
+
+    def compare_equipment(self, first, second, **params):
+        return self.client.post(
+            '/api/compare/equipment/',
+            {'dataset1': first, 'dataset2': second, **params},
+            content_type='application/json',
+            HTTP_AUTHORIZATION=f'Token {self.token.key}'
+        )
+
+    def equipment_datasets(self):
+        first = self.upload_rows('a.csv', [
+            'Pump-1,Pump,100,5,20', 'Pump-2,Pump,110,5,30', 'Valve-1,Valve,50,2,40',
+            'Pump-1,Pump,90,4,20', 'Tank-1,Tank,10,1,10',
+        ])
+        second = self.upload_rows('b.csv', [
+            'Pump-1,Pump,103,5,20', 'Pump-2,Pump,110,5,30', 'Valve-1,Reactor,50,2,40',
+            'Pump-1,Pump,80,4,20', 'Mixer-1,Mixer,70,3,25',
+        ])
+        return first, second
+
+    def test_compare_equipment(self):
+        first, second = self.equipment_datasets()
+        response = self.compare_equipment(first, second)
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['summary'], {'added': 1, 'removed': 1, 'changed': 3, 'unchanged': 1})
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(data['pages'], 1)
+        self.assertEqual(
+            [(row['name'], row['status'], row['magnitude']) for row in data['results']],
+            [('Pump-1', 'changed', 10.0), ('Pump-1', 'changed', 3.0), ('Valve-1', 'changed', 0.0),
+             ('Tank-1', 'removed', None), ('Mixer-1', 'added', None)],
+        )
+        repeated = data['results'][0]
+        self.assertEqual(repeated['values']['Flowrate'], [90.0, 80.0])
+        self.assertEqual(repeated['deltas'], {'Flowrate': -10.0, 'Pressure': 0.0, 'Temperature': 0.0})
+        self.assertEqual(data['results'][2]['type'], ['Valve', 'Reactor'])
+        self.assertEqual(data['results'][3]['values']['Flowrate'], [10.0, None])
+        self.assertEqual(data['results'][4]['type'], [None, 'Mixer'])
+
+    def test_compare_equipment_filters_and_pages(self):
+        first, second = self.equipment_datasets()
+        data = self.compare_equipment(first, second, threshold=5, status=['changed']).json()
+        self.assertEqual([row['magnitude'] for row in data['results']], [10.0, 0.0])
+        
+        data = self.compare_equipment(first, second, parameter='Flowrate', threshold=5, status='changed').json()
+        self.assertEqual(data['summary']['changed'], 2)
+        
+        data = self.compare_equipment(first, second, sort='name', page=2, page_size=2).json()
+        self.assertEqual((data['count'], data['pages'], data['page']), (5, 3, 2))
+        self.assertEqual([row['name'] for row in data['results']], ['Pump-1', 'Tank-1'])
+
+    def test_compare_equipment_keeps_blank_names_and_types_apart(self):
+        first = self.upload_rows('a.csv', ['P1,Pump,10,1,1', 'P2,Pump,20,2,2', ',Valve,30,3,3', 'P3,,40,4,4'])
+        second = self.upload_rows('b.csv', ['P1,Pump,10,1,1', 'P2,Pump,25,2,2', 'P3,,40,4,4'])
+        data = self.compare_equipment(first, second, sort='name').json()
+        self.assertEqual(data['summary'], {'added': 0, 'removed': 1, 'changed': 1, 'unchanged': 2})
+        self.assertEqual(
+            [(row['name'], row['status'], row['type']) for row in data['results']],
+            [(None, 'removed', ['Valve', None]), ('P2', 'changed', ['Pump', 'Pump'])],
+        )
+
+    def test_compare_equipment_invalid_params(self):
+        first, second = self.equipment_datasets()
+        for params in ({'page': 0}, {'page_size': 501}, {'threshold': -1}, {'threshold': 'x'},
+                       {'sort': 'size'}, {'status': ['moved']}, {'parameter': 'Speed'}):
+            response = self.compare_equipment(first, second, **params)
+            self.assertEqual(response.status_code, 400, params)
+        self.assertEqual(self.compare_equipment(first, 999).status_code, 404)
@@ -0,0 +1,54 @@
+import hashlib
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from .models import UploadSession
+
+HASH_READ_SIZE = 1024 * 1024
+
+# A client that never completes or deletes its session would leave the row and
+# its .part file behind forever, so sessions that receive no chunk for
+# UPLOAD_SESSION_TTL_HOURS are discarded.
+
+
+def session_part_path(upload_session):
+    return settings.UPLOAD_SPOOL_DIR / f'{upload_session.id}.part'
+
+
+def write_chunk(upload_session, offset, chunk):
+    part_path = session_part_path(upload_session)
+    part_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(part_path, 'r+b' if part_path.exists() else 'wb') as part_file:
+        part_file.seek(offset)
+        part_file.write(chunk)
+        part_file.truncate()
+    upload_session.received_size = offset + len(chunk)
+    upload_session.save(update_fields=['received_size', 'updated_at'])
+
+
+def assembled_sha256(upload_session):
+    digest = hashlib.sha256()
+    with open(session_part_path(upload_session), 'rb') as part_file:
+        for block in iter(lambda: part_file.read(HASH_READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def discard_session(upload_session):
+    part_path = session_part_path(upload_session)
+    if part_path.exists():
+        os.remove(part_path)
+    upload_session.delete()
+
+
+def expire_upload_sessions(sessions=None):
+    sessions = UploadSession.objects.all() if sessions is None else sessions
+    expired_sessions = sessions.filter(updated_at__lt=timezone.now() - timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS))
+    expired = 0
+    for upload_session in expired_sessions.only('id'):
+        discard_session(upload_session)
+        expired += 1
+    return expired
@@ -1,21 +1,30 @@
+import numpy as np
 import pandas as pd
 from django.core.exceptions import ValidationError
 from .constants import (
     MAX_UPLOAD_SIZE,
+    ALLOWED_EXTENSIONS,
     REQUIRED_COLUMNS,
     NUMERIC_COLUMNS,
-    ERROR_MESSAGES
+    ERROR_MESSAGES,
+    MAX_REPORTED_RANGES
 )
 
-def validate_file_size(file):
-    if file.size > MAX_UPLOAD_SIZE:
-        max_mb = MAX_UPLOAD_SIZE / (1024 * 1024)
+def validate_upload_size(size, max_size=MAX_UPLOAD_SIZE):
+    if size > max_size:
+        max_mb = max_size / (1024 * 1024)
         raise ValidationError(ERROR_MESSAGES['file_too_large'].format(max_mb=max_mb))
 
-def validate_file_extension(file):
-    if not file.name.endswith('.csv'):
+def validate_filename(name):
+    if not name.endswith(ALLOWED_EXTENSIONS):
         raise ValidationError(ERROR_MESSAGES['invalid_extension'])
 
+def validate_file_size(file):
+    validate_upload_size(file.size)
+
+def validate_file_extension(file):
+    validate_filename(file.name)
+
 def validate_csv_structure(df):
     if df.empty:
         raise ValidationError(ERROR_MESSAGES['empty_file'])
@@ -34,24 +43,80 @@ def validate_csv_structure(df):
             allowed=', '.join(REQUIRED_COLUMNS)
         ))
 
+def compact_row_ranges(rows, limit=None):
+    if len(rows) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))[:limit]
+    ends = np.concatenate((rows[breaks], [rows[-1]]))[:limit]
+    return [[int(start), int(end)] for start, end in zip(starts, ends)]
+
+
+def format_row_ranges(ranges, row_count):
+    shown = ranges[:MAX_REPORTED_RANGES]
+    text = ', '.join(str(start) if start == end else f'{start}-{end}' for start, end in shown)
+    hidden_rows = row_count - sum(end - start + 1 for start, end in shown)
+    if hidden_rows:
+        text += f' and {hidden_rows} more'
+    return text
+
+
+class ContentErrors:
+
+    def __init__(self):
+        self.row_ranges = {}
+        self.row_counts = {}
+        self.non_numeric_columns = set()
+
+    def __bool__(self):
+        return bool(self.row_ranges or self.non_numeric_columns)
+
+    def _add_rows(self, error_key, col, rows):
+        if len(rows) == 0:
+            return
+        ranges = self.row_ranges.setdefault((error_key, col), [])
+        new_ranges = compact_row_ranges(rows, limit=MAX_REPORTED_RANGES + 1)
+        if ranges and ranges[-1][1] + 1 == new_ranges[0][0]:
+            ranges[-1][1] = new_ranges.pop(0)[1]
+        ranges.extend(new_ranges[:MAX_REPORTED_RANGES - len(ranges)])
+        self.row_counts[(error_key, col)] = self.row_counts.get((error_key, col), 0) + len(rows)
+
+    def add(self, df):
+        numeric_df = df[NUMERIC_COLUMNS]
+        empty_mask = numeric_df.isna().to_numpy()
+        text_cols = [col for col in NUMERIC_COLUMNS if not pd.api.types.is_numeric_dtype(numeric_df[col])]
+        invalid_mask = np.zeros_like(empty_mask)
+        if text_cols:
+            text_positions = [NUMERIC_COLUMNS.index(col) for col in text_cols]
+            coerced = numeric_df[text_cols].apply(pd.to_numeric, errors='coerce')
+            invalid_mask[:, text_positions] = coerced.isna().to_numpy() & ~empty_mask[:, text_positions]
+
+        line_numbers = df.index.to_numpy() + 2
+        for position, col in enumerate(NUMERIC_COLUMNS):
+            self._add_rows('invalid_numeric', col, line_numbers[invalid_mask[:, position]])
+            self._add_rows('empty_values', col, line_numbers[empty_mask[:, position]])
+            if col in text_cols and not invalid_mask[:, position].any() and not empty_mask[:, position].any():
+                self.non_numeric_columns.add(col)
+
+    def messages(self):
+        messages = []
+        for col in NUMERIC_COLUMNS:
+            for error_key in ('invalid_numeric', 'empty_values'):
+                if (error_key, col) in self.row_ranges:
+                    messages.append(ERROR_MESSAGES[error_key].format(
+                        col=col,
+                        rows=format_row_ranges(self.row_ranges[(error_key, col)], self.row_counts[(error_key, col)])
+                    ))
+            if col in self.non_numeric_columns and not any((key, col) in self.row_ranges for key in ('invalid_numeric', 'empty_values')):
+                messages.append(ERROR_MESSAGES['not_numeric_type'].format(col=col))
+        return messages
+
+    def raise_if_any(self):
+        if self:
+            raise ValidationError(self.messages())
+
+
 def validate_csv_content(df):
-    for col in NUMERIC_COLUMNS:
-        if df[col].dtype == 'object':
-             temp_col = pd.to_numeric(df[col], errors='coerce')
-             nan_mask = temp_col.isna()
-             if nan_mask.any():
-                 invalid_rows = [r + 2 for r in df.index[nan_mask].tolist()[:5]]
-                 raise ValidationError(ERROR_MESSAGES['invalid_numeric'].format(
-                     col=col,
-                     rows=invalid_rows
-                 ))
-        
-        if df[col].isna().any():
-             invalid_rows = [r + 2 for r in df.index[df[col].isna()].tolist()[:5]]
-             raise ValidationError(ERROR_MESSAGES['empty_values'].format(
-                 col=col,
-                 rows=invalid_rows
-             ))
-             
-        if not pd.api.types.is_numeric_dtype(df[col]):
-             raise ValidationError(ERROR_MESSAGES['not_numeric_type'].format(col=col))
+    content_errors = ContentErrors()
+    content_errors.add(df)
+    content_errors.raise_if_any()
@@ -1,4 +1,4 @@
-from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, content_negotiation_class, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
@@ -6,28 +6,35 @@ from django.contrib.auth import authenticate
 from rest_framework.authtoken.models import Token
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
-from django.db import transaction
-from django.http import HttpResponse
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from datetime import datetime
-import pandas as pd
-import io
-
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.piecharts import Pie
-from reportlab.graphics.charts.legends import Legend
-from reportlab.lib.validators import Auto
-
-from .models import EquipmentDataset
-from .serializers import EquipmentDatasetSerializer
-from .validators import validate_file_size, validate_file_extension, validate_csv_structure, validate_csv_content
-from .constants import HISTORY_LIMIT
+from django.http import FileResponse, StreamingHttpResponse
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+import hashlib
+import logging
+
+from .models import EquipmentDataset, Job, UploadSession
+from .serializers import EquipmentDatasetSerializer, JobSerializer, UploadSessionSerializer
+from .validators import validate_file_size, validate_file_extension, validate_filename, validate_upload_size
+from .constants import UPLOAD_CHUNK_SIZE, MAX_BATCH_FILES, MAX_BULK_REPORTS, MAX_COMPARE_DATASETS, ERROR_MESSAGES
+from .ingest import IngestError, ingest_and_store
+from .batch_upload import ingest_batch
+from .retention import visible_datasets
+from .comparison import cached_distribution_comparison, compare_matrix
+from .equipment_diff import equipment_diff, parse_equipment_diff_params
+from .report_cache import open_cached_report, report_etag
+from .report_render import ReportRenderError
+from .bulk_reports import open_reports, stream_zip
+from .exports import EXPORT_FORMATS, ExportContentNegotiation, export_frame, parse_export_params, stream_export
+from .jobs import enqueue_report_job, enqueue_upload_job, fail_stale_jobs, spool_upload
+from .upload_sessions import session_part_path, write_chunk, assembled_sha256, discard_session, expire_upload_sessions
 from django_ratelimit.decorators import ratelimit
 from django.utils.decorators import method_decorator
 
+logger = logging.getLogger(__name__)
+
+
 @api_view(['GET', 'HEAD'])
 @permission_classes([AllowAny])
 def health_check(request):
@@ -90,64 +97,215 @@ def upload(request):
     except Exception as validation_error:
         return Response({'error': str(validation_error)}, status=status.HTTP_400_BAD_REQUEST)
     
-    try:
-        equipment_file.seek(0)
-        file_content = equipment_file.read().decode('utf-8')
-        equipment_df = pd.read_csv(io.StringIO(file_content))
-    except UnicodeDecodeError:
-        return Response({'error': 'File encoding must be UTF-8'}, status=status.HTTP_400_BAD_REQUEST)
-    except Exception:
-        return Response({'error': 'Failed to parse CSV file'}, status=status.HTTP_400_BAD_REQUEST)
+    if _wants_async(request):
+        upload_job = enqueue_upload_job(request.user, equipment_file.name, spool_upload(equipment_file))
+        return Response(JobSerializer(upload_job).data, status=status.HTTP_202_ACCEPTED)
+    
+    return _ingest_response(request.user, equipment_file, equipment_file.name)
+
+
+@api_view(['POST'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+@ratelimit(key='user', rate='10/m', block=True)
+def upload_batch(request):
+    uploaded_files = request.FILES.getlist('files')
+    if not uploaded_files:
+        return Response({'error': 'No files provided'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(uploaded_files) > MAX_BATCH_FILES:
+        return Response({'error': ERROR_MESSAGES['too_many_files'].format(max_files=MAX_BATCH_FILES)}, status=status.HTTP_400_BAD_REQUEST)
     
+    results = ingest_batch(request.user, uploaded_files)
+    retained_ids = set(visible_datasets(request.user).values_list('id', flat=True))
+    for result in results:
+        if 'dataset' in result:
+            result['retained'] = result['dataset'].id in retained_ids
+            result['dataset'] = EquipmentDatasetSerializer(result['dataset']).data
+    
+    any_stored = any('dataset' in result for result in results)
+    return Response({'results': results}, status=status.HTTP_201_CREATED if any_stored else status.HTTP_400_BAD_REQUEST)
+
+
+def _wants_async(request):
+    return request.query_params.get('async', '').lower() in ('1', 'true', 'yes')
+
+
+def _ingest_response(user, equipment_file, filename, content_digest=None):
     try:
-        validate_csv_structure(equipment_df)
-        validate_csv_content(equipment_df)
-    except Exception as structure_error:
-        return Response({'error': str(structure_error)}, status=status.HTTP_400_BAD_REQUEST)
-    
-    with transaction.atomic():
-        new_dataset = EquipmentDataset.objects.create(
-            user=request.user,
-            filename=equipment_file.name,
-            total_count=len(equipment_df),
-            avg_flowrate=round(equipment_df['Flowrate'].mean(), 2),
-            avg_pressure=round(equipment_df['Pressure'].mean(), 2),
-            avg_temperature=round(equipment_df['Temperature'].mean(), 2),
-            type_distribution=equipment_df['Type'].value_counts().to_dict(),
-            csv_data=file_content
-        )
-        
-        current_dataset_count = EquipmentDataset.objects.filter(user=request.user).count()
-        if current_dataset_count > HISTORY_LIMIT:
-            redundant_dataset_ids = list(EquipmentDataset.objects.filter(user=request.user).order_by('uploaded_at', 'id').values_list('id', flat=True)[:current_dataset_count - HISTORY_LIMIT])
-            EquipmentDataset.objects.filter(id__in=redundant_dataset_ids).delete()
+        new_dataset = ingest_and_store(user, equipment_file, filename, content_digest)
+    except IngestError as ingest_error:
+        return Response({'error': str(ingest_error)}, status=status.HTTP_400_BAD_REQUEST)
     
     return Response(EquipmentDatasetSerializer(new_dataset).data, status=status.HTTP_201_CREATED)
 
 
-@api_view(['GET'])
+@api_view(['POST'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
-def history(request):
-    user_datasets = EquipmentDataset.objects.filter(user=request.user).order_by('-uploaded_at', '-id')[:HISTORY_LIMIT]
-    return Response(EquipmentDatasetSerializer(user_datasets, many=True).data)
+def create_upload_session(request):
+    filename = str(request.data.get('filename', '')).strip()
+    sha256 = str(request.data.get('sha256', '')).strip().lower()
+    try:
+        total_size = int(request.data.get('size'))
+    except (TypeError, ValueError):
+        total_size = None
+    
+    if not filename or total_size is None or total_size <= 0 or len(sha256) != 64:
+        return Response({'error': 'filename, size and sha256 required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        validate_filename(filename)
+        validate_upload_size(total_size)
+    except ValidationError as validation_error:
+        return Response({'error': str(validation_error)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    expire_upload_sessions(UploadSession.objects.filter(user=request.user))
+    upload_session = UploadSession.objects.create(user=request.user, filename=filename, total_size=total_size, sha256=sha256)
+    response_data = UploadSessionSerializer(upload_session).data
+    response_data['chunk_size'] = UPLOAD_CHUNK_SIZE
+    return Response(response_data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET', 'DELETE'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def upload_session_detail(request, session_id):
+    try:
+        upload_session = UploadSession.objects.get(pk=session_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if request.method == 'DELETE':
+        discard_session(upload_session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    
+    response_data = UploadSessionSerializer(upload_session).data
+    response_data['chunk_size'] = UPLOAD_CHUNK_SIZE
+    return Response(response_data)
+
+
+@api_view(['PUT'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def upload_session_chunk(request, session_id):
+    try:
+        upload_session = UploadSession.objects.get(pk=session_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        offset = int(request.query_params.get('offset', ''))
+    except ValueError:
+        return Response({'error': 'offset required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if offset != upload_session.received_size:
+        return Response({
+            'error': ERROR_MESSAGES['chunk_offset'].format(expected=upload_session.received_size),
+            'offset': upload_session.received_size
+        }, status=status.HTTP_409_CONFLICT)
+    
+    chunk = request.body
+    if not chunk or len(chunk) > UPLOAD_CHUNK_SIZE or offset + len(chunk) > upload_session.total_size:
+        return Response({'error': ERROR_MESSAGES['chunk_too_large'].format(max_bytes=UPLOAD_CHUNK_SIZE)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if hashlib.sha256(chunk).hexdigest() != request.headers.get('X-Chunk-SHA256', '').lower():
+        return Response({'error': ERROR_MESSAGES['chunk_checksum']}, status=status.HTTP_400_BAD_REQUEST)
+    
+    write_chunk(upload_session, offset, chunk)
+    return Response(UploadSessionSerializer(upload_session).data)
 
 
 @api_view(['POST'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
-def compare_datasets(request):
+@ratelimit(key='user', rate='10/m', block=True)
+def complete_upload_session(request, session_id):
+    try:
+        upload_session = UploadSession.objects.get(pk=session_id, user=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({'error': 'Upload session not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    if upload_session.received_size != upload_session.total_size:
+        return Response({
+            'error': ERROR_MESSAGES['upload_incomplete'].format(received=upload_session.received_size, total=upload_session.total_size),
+            'offset': upload_session.received_size
+        }, status=status.HTTP_409_CONFLICT)
+    
+    if assembled_sha256(upload_session) != upload_session.sha256:
+        discard_session(upload_session)
+        return Response({'error': ERROR_MESSAGES['upload_checksum']}, status=status.HTTP_400_BAD_REQUEST)
+    
+    if _wants_async(request):
+        spool_path = session_part_path(upload_session)
+        upload_session.delete()
+        upload_job = enqueue_upload_job(request.user, upload_session.filename, spool_path)
+        return Response(JobSerializer(upload_job).data, status=status.HTTP_202_ACCEPTED)
+    
+    with open(session_part_path(upload_session), 'rb') as part_file:
+        response = _ingest_response(request.user, File(part_file, name=upload_session.filename), upload_session.filename, upload_session.sha256)
+    discard_session(upload_session)
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def job_status(request, job_id):
+    fail_stale_jobs(Job.objects.filter(pk=job_id, user=request.user))
+    try:
+        job = Job.objects.select_related('dataset').get(pk=job_id, user=request.user)
+    except Job.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(JobSerializer(job).data)
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def job_download(request, job_id):
+    fail_stale_jobs(Job.objects.filter(pk=job_id, user=request.user))
+    try:
+        report_job = Job.objects.get(pk=job_id, user=request.user, kind=Job.KIND_REPORT)
+    except Job.DoesNotExist:
+        return Response({'error': 'Job not found'}, status=status.HTTP_404_NOT_FOUND)
+    if report_job.status != Job.STATUS_SUCCEEDED:
+        return Response({'error': 'Report is not ready', 'status': report_job.status}, status=status.HTTP_409_CONFLICT)
+    equipment_record = visible_datasets(request.user).filter(pk=report_job.dataset_id).first()
+    if equipment_record is None:
+        return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
+    return _report_response(request, equipment_record)
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def history(request):
+    user_datasets = visible_datasets(request.user).order_by('-uploaded_at', '-id')
+    return Response(EquipmentDatasetSerializer(user_datasets, many=True).data)
+
+
+def _dataset_pair(request):
     primary_id = request.data.get('dataset1')
     secondary_id = request.data.get('dataset2')
     
-    if not primary_id or not secondary_id:
-        return Response({'error': 'Both dataset1 and dataset2 IDs required'}, status=status.HTTP_400_BAD_REQUEST)
-    
     try:
-        primary_dataset = EquipmentDataset.objects.get(pk=primary_id, user=request.user)
-        secondary_dataset = EquipmentDataset.objects.get(pk=secondary_id, user=request.user)
-    except EquipmentDataset.DoesNotExist:
-        return Response({'error': 'Dataset not found or access denied'}, status=status.HTTP_404_NOT_FOUND)
+        primary_id, secondary_id = int(primary_id), int(secondary_id)
+    except (TypeError, ValueError):
+        return None, None, Response({'error': 'Both dataset1 and dataset2 IDs required'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    datasets_by_id = visible_datasets(request.user).in_bulk([primary_id, secondary_id])
+    if primary_id not in datasets_by_id or secondary_id not in datasets_by_id:
+        return None, None, Response({'error': 'Dataset not found or access denied'}, status=status.HTTP_404_NOT_FOUND)
+    return datasets_by_id[primary_id], datasets_by_id[secondary_id], None
+
+
+@api_view(['POST'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def compare_datasets(request):
+    primary_dataset, secondary_dataset, error_response = _dataset_pair(request)
+    if error_response:
+        return error_response
     
     return Response({
         'dataset1': EquipmentDatasetSerializer(primary_dataset).data,
@@ -160,12 +318,71 @@ def compare_datasets(request):
     })
 
 
+@api_view(['POST'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def compare_dataset_distributions(request):
+    primary_dataset, secondary_dataset, error_response = _dataset_pair(request)
+    if error_response:
+        return error_response
+    
+    return Response({
+        'dataset1': EquipmentDatasetSerializer(primary_dataset).data,
+        'dataset2': EquipmentDatasetSerializer(secondary_dataset).data,
+        **cached_distribution_comparison(primary_dataset, secondary_dataset),
+    })
+
+
+@api_view(['POST'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def compare_equipment(request):
+    primary_dataset, secondary_dataset, error_response = _dataset_pair(request)
+    if error_response:
+        return error_response
+    
+    try:
+        diff_params = parse_equipment_diff_params(request.data)
+    except ValidationError as validation_error:
+        return Response({'error': validation_error.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+    
+    return Response({
+        'dataset1': EquipmentDatasetSerializer(primary_dataset).data,
+        'dataset2': EquipmentDatasetSerializer(secondary_dataset).data,
+        **equipment_diff(primary_dataset, secondary_dataset, **diff_params),
+    })
+
+
+@api_view(['POST'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def compare_dataset_matrix(request):
+    requested_ids = request.data.get('datasets')
+    try:
+        dataset_ids = list(dict.fromkeys(int(dataset_id) for dataset_id in requested_ids))
+    except (TypeError, ValueError):
+        dataset_ids = []
+    if isinstance(requested_ids, str) or not 2 <= len(dataset_ids) <= MAX_COMPARE_DATASETS:
+        return Response({'error': ERROR_MESSAGES['invalid_compare_ids'].format(max_datasets=MAX_COMPARE_DATASETS)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    datasets_by_id = visible_datasets(request.user).in_bulk(dataset_ids)
+    missing_ids = [dataset_id for dataset_id in dataset_ids if dataset_id not in datasets_by_id]
+    if missing_ids:
+        return Response({'error': 'Dataset not found', 'ids': missing_ids}, status=status.HTTP_404_NOT_FOUND)
+    
+    datasets = [datasets_by_id[dataset_id] for dataset_id in dataset_ids]
+    return Response({
+        'datasets': EquipmentDatasetSerializer(datasets, many=True).data,
+        **compare_matrix(datasets),
+    })
+
+
 @api_view(['GET'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
 def get_dataset_detail(request, pk):
     try:
-        dataset = EquipmentDataset.objects.get(pk=pk, user=request.user)
+        dataset = visible_datasets(request.user).get(pk=pk)
         
         return Response({
             'total_count': dataset.total_count,
@@ -174,7 +391,8 @@ def get_dataset_detail(request, pk):
                 'pressure': dataset.avg_pressure,
                 'temperature': dataset.avg_temperature
             },
-            'type_distribution': dataset.type_distribution
+            'type_distribution': dataset.type_distribution,
+            'statistics': dataset.statistics
         })
     except EquipmentDataset.DoesNotExist:
         return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -185,9 +403,8 @@ def get_dataset_detail(request, pk):
 @permission_classes([IsAuthenticated])
 def get_dataset_visualization(request, pk):
     try:
-        equipment_record = EquipmentDataset.objects.get(pk=pk, user=request.user)
-        
-        equipment_df = pd.read_csv(io.StringIO(equipment_record.csv_data))
+        equipment_record = visible_datasets(request.user).get(pk=pk)
+        column_stats = equipment_record.statistics
         
         return Response({
             'type_distribution': {
@@ -197,279 +414,99 @@ def get_dataset_visualization(request, pk):
             'averages': {
                 'labels': ['Flowrate', 'Pressure', 'Temperature'],
                 'data': [equipment_record.avg_flowrate, equipment_record.avg_pressure, equipment_record.avg_temperature],
-                'min': [float(equipment_df['Flowrate'].min()), float(equipment_df['Pressure'].min()), float(equipment_df['Temperature'].min())],
-                'max': [float(equipment_df['Flowrate'].max()), float(equipment_df['Pressure'].max()), float(equipment_df['Temperature'].max())]
-            }
+                'min': [column_stats['Flowrate']['min'], column_stats['Pressure']['min'], column_stats['Temperature']['min']],
+                'max': [column_stats['Flowrate']['max'], column_stats['Pressure']['max'], column_stats['Temperature']['max']]
+            },
+            'statistics': column_stats
         })
     except EquipmentDataset.DoesNotExist:
         return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
 
 
+def _report_response(request, equipment_record):
+    etag = report_etag(equipment_record)
+    last_modified = int(equipment_record.uploaded_at.timestamp())
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+    
+    try:
+        report_file = open_cached_report(equipment_record)
+    except ReportRenderError as render_error:
+        return Response({'error': str(render_error)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+    except Exception as report_error:
+        logger.exception('PDF generation failed for dataset %s', equipment_record.id)
+        return Response({'error': f'Report generation failed: {str(report_error)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    response = FileResponse(report_file, as_attachment=True, filename=f'report_{equipment_record.id}.pdf', content_type='application/pdf')
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
 @api_view(['GET'])
 @authentication_classes([TokenAuthentication])
 @permission_classes([IsAuthenticated])
 def generate_report(request, pk):
     try:
-        equipment_record = EquipmentDataset.objects.get(pk=pk, user=request.user)
+        equipment_record = visible_datasets(request.user).get(pk=pk)
     except EquipmentDataset.DoesNotExist:
         return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
     
+    if _wants_async(request):
+        report_job = enqueue_report_job(request.user, equipment_record)
+        return Response(JobSerializer(report_job).data, status=status.HTTP_202_ACCEPTED)
+    
+    return _report_response(request, equipment_record)
+
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_reports(request):
     try:
-        equipment_df = pd.read_csv(io.StringIO(equipment_record.csv_data))
-        
-        report_buffer = io.BytesIO()
-        pdf_doc = SimpleDocTemplate(report_buffer, pagesize=letter, topMargin=72, bottomMargin=72)
-        pdf_styles = getSampleStyleSheet()
-        report_elements = []
-        
-        report_elements.append(Paragraph("CHEMICAL EQUIPMENT ANALYSIS REPORT", pdf_styles['Title']))
-        report_elements.append(Spacer(1, 12))
-        
-        meta_data = [
-            ['Dataset ID', str(equipment_record.id)],
-            ['Filename', equipment_record.filename],
-            ['Upload Date', equipment_record.uploaded_at.astimezone().strftime('%Y-%m-%d %I:%M %p')],
-            ['Generated', datetime.now().strftime('%Y-%m-%d %I:%M %p')],
-            ['Total Records', str(equipment_record.total_count)]
-        ]
-        meta_table = Table(meta_data, colWidths=[120, 300])
-        meta_table.setStyle(TableStyle([
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        report_elements.append(meta_table)
-        report_elements.append(Spacer(1, 24))
-        
-        from reportlab.platypus import KeepTogether
-        from reportlab.graphics.charts.barcharts import VerticalBarChart
-        from reportlab.graphics.shapes import Drawing
-        from reportlab.graphics.charts.textlabels import Label
-        
-        summary_elements = []
-        summary_elements.append(Paragraph("Summary Statistics", pdf_styles['Heading2']))
-        summary_elements.append(Spacer(1, 8))
-        
-        stats_data = [
-            ['Parameter', 'Mean', 'Min', 'Max'],
-            ['Flowrate', f"{equipment_record.avg_flowrate:.2f}", f"{equipment_df['Flowrate'].min():.2f}", f"{equipment_df['Flowrate'].max():.2f}"],
-            ['Pressure', f"{equipment_record.avg_pressure:.2f}", f"{equipment_df['Pressure'].min():.2f}", f"{equipment_df['Pressure'].max():.2f}"],
-            ['Temperature', f"{equipment_record.avg_temperature:.2f}", f"{equipment_df['Temperature'].min():.2f}", f"{equipment_df['Temperature'].max():.2f}"]
-        ]
-        stats_table = Table(stats_data, colWidths=[120, 100, 100, 100])
-        stats_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#03045e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#023e8a')),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#caf0f8')),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 10),
-            ('TOPPADDING', (0, 0), (-1, -1), 10),
-        ]))
-        summary_elements.append(stats_table)
-        summary_elements.append(Spacer(1, 12))
-
-        try:
-            d_bar = Drawing(400, 200)
-            data_averages = [
-                float(equipment_record.avg_flowrate),
-                float(equipment_record.avg_pressure),
-                float(equipment_record.avg_temperature)
-            ]
-            
-            bc = VerticalBarChart()
-            bc.x = 50
-            bc.y = 50
-            bc.height = 125
-            bc.width = 300
-            bc.data = [data_averages]
-            bc.strokeColor = colors.white
-            bc.valueAxis.valueMin = 0
-            bc.valueAxis.valueMax = max(data_averages) * 1.2
-            bc.valueAxis.valueStep = max(data_averages) / 5
-            bc.categoryAxis.labels.boxAnchor = 'ne'
-            bc.categoryAxis.labels.dx = 8
-            bc.categoryAxis.labels.dy = -2
-            bc.categoryAxis.labels.angle = 30
-            bc.categoryAxis.categoryNames = ['Flowrate', 'Pressure', 'Temp']
-            
-            bc.bars[0].fillColor = colors.HexColor('#0077b6')
-            
-            d_bar.add(bc)
-            
-            lab = Label()
-            lab.setOrigin(200, 190)
-            lab.boxAnchor = 'ne'
-            lab.dx = 0
-            lab.dy = 0
-            lab.setText('Average Values')
-            d_bar.add(lab)
-
-            chart_table_bar = Table([[d_bar]], colWidths=[400])
-            chart_table_bar.setStyle(TableStyle([
-                ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ]))
-            summary_elements.append(chart_table_bar)
-        except Exception as e:
-            print(f"Bar Chart Error: {e}")
-        
-        report_elements.append(KeepTogether(summary_elements))
-        report_elements.append(Spacer(1, 24))
-        
-        type_elements = []
-        type_elements.append(Paragraph("Type Distribution and Visualization", pdf_styles['Heading2']))
-        type_elements.append(Spacer(1, 8))
-        
-        type_data = [['Equipment Type', 'Count']] + [[k, str(v)] for k, v in equipment_record.type_distribution.items()]
-        type_table = Table(type_data, colWidths=[200, 100])
-        type_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#03045e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 1, colors.HexColor('#023e8a')),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#caf0f8')),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ]))
-        type_elements.append(type_table)
-        type_elements.append(Spacer(1, 24))
-
-        if equipment_record.type_distribution:
-            try:
-                # Increased width to accommodate Legend without overlap
-                d = Drawing(500, 250)
-                
-                pc = Pie()
-                pc.x = 50       # Move Pie Left
-                pc.y = 50
-                pc.width = 150
-                pc.height = 150
-                
-                raw_data = equipment_record.type_distribution
-                data = []
-                labels = []
-                for k, v in raw_data.items():
-                    try:
-                         val = int(v)
-                         data.append(val)
-                         labels.append(str(k))
-                    except:
-                        pass
-
-                if sum(data) > 0:
-                    pc.data = data
-                    pc.labels = labels
-                    pc.simpleLabels = 0 
-                    
-                    from reportlab.lib import colors as rl_colors
-                    chart_colors = [rl_colors.HexColor('#03045e'), rl_colors.HexColor('#0077b6'), 
-                                    rl_colors.HexColor('#00b4d8'), rl_colors.HexColor('#90e0ef'),
-                                    rl_colors.HexColor('#caf0f8'), rl_colors.HexColor('#fca311'),
-                                    rl_colors.HexColor('#e63946')]
-                    
-                    # Remove stroke to "remove box and colour thing" (cleaner look)
-                    pc.slices.strokeWidth = 0
-                    for i in range(len(data)):
-                        pc.slices[i].fillColor = chart_colors[i % len(chart_colors)]
-                    
-                    d.add(pc)
-
-                    legend = Legend()
-                    legend.alignment = 'right'
-                    legend.x = 350          # Move Legend Right
-                    legend.y = 100          # Move Legend Down slightly
-                    legend.columnMaximum = 10
-                    # Ensure Legend text doesn't overlap
-                    legend.fontSize = 10
-                    legend.dx = 8 
-                    legend.dy = 8
-                    legend.yGap = 2
-                    legend.deltay = 12
-                    legend.strokeColor = None  # No border around legend
-                    legend.colorNamePairs = [(chart_colors[i % len(chart_colors)], labels[i]) for i in range(len(data))]
-                    d.add(legend)
-                    
-                    # Chart table with increased column width
-                    chart_table = Table([[d]], colWidths=[500])
-                    chart_table.setStyle(TableStyle([
-                        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                        ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                    ]))
-                    
-                    type_elements.append(chart_table)
-
-                else:
-                    type_elements.append(Paragraph("Type Distribution Visualization", pdf_styles['Heading2']))
-                    type_elements.append(Spacer(1, 12))
-                    type_elements.append(Paragraph("No numeric data available for chart.", pdf_styles['Normal']))
-            except Exception as chart_error:
-                print(f"Chart Generation Error: {str(chart_error)}")
-                type_elements.append(Paragraph(f"Chart Error: {str(chart_error)}", pdf_styles['Italic']))
-        else:
-             type_elements.append(Paragraph("No distribution data available.", pdf_styles['Normal']))
-        
-        report_elements.append(KeepTogether(type_elements))
-        report_elements.append(Spacer(1, 24))
-        
-        # Group Complete Data to keep separate or together (User requested one page)
-        complete_data_elements = []
-        complete_data_elements.append(Paragraph("Complete Equipment Data", pdf_styles['Heading2']))
-        complete_data_elements.append(Spacer(1, 12))
-        
-        data_rows = [['Equipment Name', 'Type', 'Flowrate', 'Pressure', 'Temperature']]
-        for _, row in equipment_df.iterrows():
-            data_rows.append([
-                str(row['Equipment Name']),
-                str(row['Type']),
-                f"{row['Flowrate']:.2f}",
-                f"{row['Pressure']:.2f}",
-                f"{row['Temperature']:.2f}"
-            ])
-        
-        # Add repeatRows=1 so headers show if it splits across pages
-        data_table = Table(data_rows, colWidths=[90, 90, 80, 80, 90], repeatRows=1)
-        table_style = [
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#03045e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#023e8a')),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]
-        for i in range(1, len(data_rows)):
-            bg_color = colors.HexColor('#caf0f8') if i % 2 == 1 else colors.HexColor('#e0f7fa')
-            table_style.append(('BACKGROUND', (0, i), (-1, i), bg_color))
-        data_table.setStyle(TableStyle(table_style))
-        
-        complete_data_elements.append(data_table)
-        
-        # Use KeepTogether to try to force single page, but wrap in try/except or just append
-        # For large datasets, KeepTogether might fail or be weird.
-        # Given "one page only" request for sample data:
-        report_elements.append(KeepTogether(complete_data_elements))
-        
-        def add_page_number(canvas, doc):
-            canvas.saveState()
-            canvas.setFont('Helvetica', 9)
-            canvas.setFillColor(colors.HexColor('#03045e'))
-            canvas.drawCentredString(letter[0]/2, 30, f"Page {doc.page}")
-            canvas.drawString(40, 30, "Chemical Equipment Analysis Report")
-            canvas.drawRightString(letter[0]-40, 30, datetime.now().strftime('%Y-%m-%d'))
-            canvas.restoreState()
-        
-        pdf_doc.build(report_elements, onFirstPage=add_page_number, onLaterPages=add_page_number)
-        report_buffer.seek(0)
-        
-        response = HttpResponse(report_buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="report_{equipment_record.id}.pdf"'
-        return response
+        dataset_ids = list(dict.fromkeys(int(dataset_id) for dataset_id in request.query_params.get('ids', '').split(',')))
+    except ValueError:
+        return Response({'error': ERROR_MESSAGES['invalid_ids']}, status=status.HTTP_400_BAD_REQUEST)
+    if len(dataset_ids) > MAX_BULK_REPORTS:
+        return Response({'error': ERROR_MESSAGES['too_many_reports'].format(max_reports=MAX_BULK_REPORTS)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    datasets_by_id = visible_datasets(request.user).in_bulk(dataset_ids)
+    missing_ids = [dataset_id for dataset_id in dataset_ids if dataset_id not in datasets_by_id]
+    if missing_ids:
+        return Response({'error': 'Dataset not found', 'ids': missing_ids}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        report_files = open_reports([datasets_by_id[dataset_id] for dataset_id in dataset_ids])
+    except ReportRenderError as render_error:
+        return Response({'error': str(render_error)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
     except Exception as report_error:
-        import traceback
-        print(f"PDF Generation Error: {str(report_error)}")
-        traceback.print_exc()
+        logger.exception('PDF generation failed for datasets %s', dataset_ids)
         return Response({'error': f'Report generation failed: {str(report_error)}'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    response = StreamingHttpResponse(stream_zip(report_files), content_type='application/zip')
+    response['Content-Disposition'] = 'attachment; filename="reports.zip"'
+    return response
 
+
+@api_view(['GET'])
+@authentication_classes([TokenAuthentication])
+@permission_classes([IsAuthenticated])
+@content_negotiation_class(ExportContentNegotiation)
+def export_dataset(request, pk):
+    try:
+        equipment_record = visible_datasets(request.user).select_related('blob').defer('blob__csv_payload').get(pk=pk)
+    except EquipmentDataset.DoesNotExist:
+        return Response({'error': 'Dataset not found'}, status=status.HTTP_404_NOT_FOUND)
+    
+    try:
+        export_format, columns, types = parse_export_params(request.query_params)
+    except ValidationError as validation_error:
+        return Response({'error': validation_error.messages[0]}, status=status.HTTP_400_BAD_REQUEST)
+    
+    equipment_df = export_frame(equipment_record, columns, types)
+    response = StreamingHttpResponse(stream_export(equipment_df, export_format), content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="dataset_{equipment_record.id}.{export_format}"'
+    return response
@@ -0,0 +1,68 @@
+import itertools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+from django.db import close_old_connections
+from django.utils.module_loading import import_string
+
+# Tasks are passed as dotted paths: workers are spawned fresh, so nothing that
+# touches the app registry may be unpickled before django.setup() has run.
+
+_executor = None
+_in_worker = False
+
+
+def _init_worker():
+    global _in_worker
+    _in_worker = True
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+
+def _run_in_worker(task_path, *args):
+    close_old_connections()
+    try:
+        return import_string(task_path)(*args)
+    finally:
+        close_old_connections()
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.JOB_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def submit_task(task_path, *args):
+    global _executor
+    # JOB_WORKERS=0 runs tasks inline, which keeps tests and single-process setups simple.
+    # Tasks queued from inside a worker also run inline instead of spawning a nested pool.
+    if settings.JOB_WORKERS <= 0 or _in_worker:
+        import_string(task_path)(*args)
+        return
+    try:
+        get_executor().submit(_run_in_worker, task_path, *args)
+    except BrokenProcessPool:
+        _executor = None
+        get_executor().submit(_run_in_worker, task_path, *args)
+
+
+def map_tasks(task_path, *arg_lists):
+    global _executor
+    if settings.JOB_WORKERS <= 0:
+        task = import_string(task_path)
+        return [task(*args) for args in zip(*arg_lists)]
+    try:
+        return list(get_executor().map(_run_in_worker, itertools.repeat(task_path), *arg_lists))
+    except BrokenProcessPool:
+        _executor = None
+        return list(get_executor().map(_run_in_worker, itertools.repeat(task_path), *arg_lists))
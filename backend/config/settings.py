@@ -30,6 +30,23 @@ CORS_ALLOW_CREDENTIALS = True
 
 DATA_UPLOAD_MAX_MEMORY_SIZE = 10 * 1024 * 1024
 
+MAX_UPLOAD_SIZE = int(os.environ.get('MAX_UPLOAD_SIZE_MB', '10')) * 1024 * 1024
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))
+JOB_STALE_TIMEOUT = int(os.environ.get('JOB_STALE_TIMEOUT', '1800'))
+JOB_RETENTION_DAYS = int(os.environ.get('JOB_RETENTION_DAYS', '7'))
+UPLOAD_SESSION_TTL_HOURS = int(os.environ.get('UPLOAD_SESSION_TTL_HOURS', '24'))
+UPLOAD_SPOOL_DIR = Path(os.environ.get('UPLOAD_SPOOL_DIR', BASE_DIR / 'spool'))
+REPORT_CACHE_DIR = Path(os.environ.get('REPORT_CACHE_DIR', BASE_DIR / 'report_cache'))
+REPORT_CACHE_MAX_SIZE = int(os.environ.get('REPORT_CACHE_MAX_SIZE_MB', '200')) * 1024 * 1024
+REPORT_TABLE_MODE = os.environ.get('REPORT_TABLE_MODE', 'full')
+REPORT_TABLE_ROWS = int(os.environ.get('REPORT_TABLE_ROWS', '1000'))
+REPORT_RENDER_WORKERS = int(os.environ.get('REPORT_RENDER_WORKERS', '2'))
+REPORT_RENDER_TIMEOUT = int(os.environ.get('REPORT_RENDER_TIMEOUT', '120'))
+REPORT_RENDER_MEMORY_MB = int(os.environ.get('REPORT_RENDER_MEMORY_MB', '1024'))
+HISTORY_LIMIT = int(os.environ.get('HISTORY_LIMIT', '5'))
+CSV_PARSER_ENGINE = os.environ.get('CSV_PARSER_ENGINE', 'pyarrow')
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -47,6 +64,7 @@ MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
     'corsheaders.middleware.CorsMiddleware',
+    'api.middleware.GzipRequestMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -16,18 +16,30 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from api.views import login, register, upload, history, get_dataset_detail, get_dataset_visualization, generate_report, compare_datasets, health_check
+from api.views import login, register, upload, upload_batch, history, get_dataset_detail, get_dataset_visualization, generate_report, bulk_reports, export_dataset, compare_datasets, compare_dataset_matrix, compare_dataset_distributions, compare_equipment, health_check, job_status, job_download, create_upload_session, upload_session_detail, upload_session_chunk, complete_upload_session
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/login/', login),
     path('api/register/', register),
     path('api/upload/', upload),
+    path('api/upload/batch/', upload_batch),
+    path('api/uploads/', create_upload_session),
+    path('api/uploads/<uuid:session_id>/', upload_session_detail),
+    path('api/uploads/<uuid:session_id>/chunk/', upload_session_chunk),
+    path('api/uploads/<uuid:session_id>/complete/', complete_upload_session),
+    path('api/jobs/<uuid:job_id>/', job_status),
+    path('api/jobs/<uuid:job_id>/download/', job_download),
     path('api/history/', history),
     path('api/compare/', compare_datasets),
+    path('api/compare/matrix/', compare_dataset_matrix),
+    path('api/compare/distribution/', compare_dataset_distributions),
+    path('api/compare/equipment/', compare_equipment),
     path('api/dataset/<int:pk>/', get_dataset_detail),
     path('api/dataset/<int:pk>/visualization/', get_dataset_visualization),
+    path('api/dataset/<int:pk>/export/', export_dataset),
     path('api/report/<int:pk>/', generate_report),
+    path('api/reports/bulk/', bulk_reports),
     path('api/health/', health_check),
     path('health/', health_check),
 ]
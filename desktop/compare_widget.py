@@ -1,11 +1,17 @@
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QComboBox, 
-    QPushButton, QFrame, QGridLayout, QSpacerItem, QSizePolicy
+    QPushButton, QFrame, QListWidget, QListWidgetItem,
+    QTableWidget, QTableWidgetItem, QHeaderView
 )
 from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QColor
 from theme import COLORS
 from worker import HistoryWorker, CompareWorker
 
+MAX_COMPARE = 5
+PARAMETER_UNITS = {"Flowrate": "L/min", "Pressure": "bar", "Temperature": "°C"}
+PARAMETER_FIELDS = {"Flowrate": "avg_flowrate", "Pressure": "avg_pressure", "Temperature": "avg_temperature"}
+
 
 COMPARE_STYLE = f"""
 QWidget {{
@@ -48,12 +54,30 @@ QComboBox QAbstractItemView {{
     selection-color: {COLORS['background']};
     padding: 4px;
 }}
-QLabel#vs {{
-    color: {COLORS['warning']};
-    font-size: 22px;
+QListWidget {{
+    background-color: {COLORS['card']};
+    border: 2px solid {COLORS['border']};
+    border-radius: 6px;
+    padding: 8px;
+    font-size: 15px;
+}}
+QListWidget::item {{
+    padding: 6px;
+}}
+QTableWidget {{
+    background-color: {COLORS['background']};
+    border: 1px solid {COLORS['border']};
+    gridline-color: {COLORS['border']};
+    font-size: 15px;
+}}
+QHeaderView::section {{
+    background-color: {COLORS['card']};
+    color: {COLORS['muted']};
+    padding: 10px;
+    border: none;
+    border-bottom: 2px solid {COLORS['primary']};
     font-weight: bold;
-    padding: 0 24px;
-    letter-spacing: 2px;
+    font-size: 13px;
 }}
 QPushButton#compare {{
     background-color: {COLORS['primary']};
@@ -79,13 +103,6 @@ QFrame#results-container {{
     padding: 24px;
     margin-top: 20px;
 }}
-QFrame#diff-card {{
-    background-color: {COLORS['background']};
-    border: 2px solid {COLORS['border']};
-    border-radius: 10px;
-    padding: 28px;
-    min-width: 200px;
-}}
 QLabel#card-title {{
     color: {COLORS['muted']};
     font-size: 14px;
@@ -93,20 +110,6 @@ QLabel#card-title {{
     letter-spacing: 1.5px;
     padding-bottom: 10px;
 }}
-QLabel#card-value {{
-    font-size: 42px;
-    font-weight: bold;
-    padding: 8px 0;
-}}
-QLabel#positive {{
-    color: {COLORS['success']};
-}}
-QLabel#negative {{
-    color: {COLORS['error']};
-}}
-QLabel#neutral {{
-    color: {COLORS['warning']};
-}}
 QLabel#loading {{
     color: {COLORS['primary']};
     font-size: 18px;
@@ -124,49 +127,23 @@ QLabel#results-title {{
     letter-spacing: 1px;
     padding-bottom: 20px;
 }}
-QLabel#dataset-info {{
-    color: {COLORS['muted']};
-    font-size: 14px;
-    padding-top: 12px;
-}}
 """
 
 
-class DiffCard(QFrame):
-    def __init__(self, title):
-        super().__init__()
-        self.setObjectName("diff-card")
-        
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(16, 16, 16, 16)
-        layout.setSpacing(4)
-        
-        self.title_label = QLabel(title.upper())
-        self.title_label.setObjectName("card-title")
-        self.title_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.title_label)
-        
-        self.value_label = QLabel("--")
-        self.value_label.setObjectName("card-value")
-        self.value_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.value_label)
-        
-        self.unit_label = QLabel("")
-        self.unit_label.setObjectName("card-title")
-        self.unit_label.setAlignment(Qt.AlignCenter)
-        layout.addWidget(self.unit_label)
-        
-    def set_value(self, value, unit=""):
-        prefix = "+" if value > 0 else ""
-        self.value_label.setText(f"{prefix}{value}")
-        self.unit_label.setText(unit)
-        
-        if value > 0:
-            self.value_label.setStyleSheet(f"color: {COLORS['success']}; font-size: 42px; font-weight: bold;")
-        elif value < 0:
-            self.value_label.setStyleSheet(f"color: {COLORS['error']}; font-size: 42px; font-weight: bold;")
-        else:
-            self.value_label.setStyleSheet(f"color: {COLORS['warning']}; font-size: 42px; font-weight: bold;")
+def diff_color(value):
+    if value > 0:
+        return QColor(COLORS['success'])
+    if value < 0:
+        return QColor(COLORS['error'])
+    return QColor(COLORS['warning'])
+
+
+def table_item(text, color=None):
+    item = QTableWidgetItem(text)
+    item.setTextAlignment(Qt.AlignCenter)
+    if color is not None:
+        item.setForeground(color)
+    return item
 
 
 class CompareWidget(QWidget):
@@ -174,6 +151,7 @@ class CompareWidget(QWidget):
         super().__init__()
         self.token = token
         self.datasets = []
+        self.comparison = None
         self.history_worker = None
         self.compare_worker = None
         self.setStyleSheet(COMPARE_STYLE)
@@ -187,51 +165,34 @@ class CompareWidget(QWidget):
         title.setObjectName("title")
         header.addWidget(title)
         
-        subtitle = QLabel("Compare parameter averages between two datasets")
+        subtitle = QLabel(f"Compare parameter averages across up to {MAX_COMPARE} datasets")
         subtitle.setObjectName("subtitle")
         header.addWidget(subtitle)
         layout.addLayout(header)
         
         layout.addSpacing(8)
         
-        selector_layout = QGridLayout()
-        selector_layout.setHorizontalSpacing(16)
-        selector_layout.setVerticalSpacing(8)
-        
-        # Dataset A
-        ds1_label = QLabel("DATASET A")
-        ds1_label.setObjectName("card-title")
-        selector_layout.addWidget(ds1_label, 0, 0)
-        
-        self.combo1 = QComboBox()
-        selector_layout.addWidget(self.combo1, 1, 0)
-        
-        # VS Label
-        vs_label = QLabel("VS")
-        vs_label.setObjectName("vs")
-        vs_label.setAlignment(Qt.AlignCenter)
-        selector_layout.addWidget(vs_label, 1, 1)
+        selector_layout = QHBoxLayout()
+        selector_layout.setSpacing(16)
         
-        # Dataset B
-        ds2_label = QLabel("DATASET B")
-        ds2_label.setObjectName("card-title")
-        selector_layout.addWidget(ds2_label, 0, 2)
+        self.dataset_list = QListWidget()
+        self.dataset_list.setMaximumHeight(180)
+        self.dataset_list.itemChanged.connect(self.on_selection_changed)
+        selector_layout.addWidget(self.dataset_list, 1)
         
-        self.combo2 = QComboBox()
-        selector_layout.addWidget(self.combo2, 1, 2)
-        
-      
         self.compare_btn = QPushButton("COMPARE")
         self.compare_btn.setObjectName("compare")
         self.compare_btn.setCursor(Qt.PointingHandCursor)
+        self.compare_btn.setEnabled(False)
         self.compare_btn.clicked.connect(self.run_comparison)
-        selector_layout.addWidget(self.compare_btn, 1, 3)
-        
-       
-        selector_layout.setColumnStretch(4, 1)
+        selector_layout.addWidget(self.compare_btn, 0, Qt.AlignTop)
         
         layout.addLayout(selector_layout)
         
+        self.selection_label = QLabel(f"0/{MAX_COMPARE} SELECTED")
+        self.selection_label.setObjectName("card-title")
+        layout.addWidget(self.selection_label)
+        
         self.loading_label = QLabel("Loading datasets...")
         self.loading_label.setObjectName("loading")
         self.loading_label.setAlignment(Qt.AlignCenter)
@@ -248,30 +209,39 @@ class CompareWidget(QWidget):
         self.results_frame.hide()
         results_layout = QVBoxLayout(self.results_frame)
         results_layout.setContentsMargins(24, 24, 24, 24)
-        results_layout.setSpacing(20)
-        
-        results_title = QLabel("PARAMETER DIFFERENCES (A − B)")
-        results_title.setObjectName("results-title")
-        results_layout.addWidget(results_title)
-        
-        cards_layout = QHBoxLayout()
-        cards_layout.setSpacing(20)
-        
-        self.flowrate_card = DiffCard("Flowrate")
-        cards_layout.addWidget(self.flowrate_card)
-        
-        self.pressure_card = DiffCard("Pressure")
-        cards_layout.addWidget(self.pressure_card)
-        
-        self.temperature_card = DiffCard("Temperature")
-        cards_layout.addWidget(self.temperature_card)
-        
-        cards_layout.addStretch()
-        results_layout.addLayout(cards_layout)
-        
-        self.info_label = QLabel("")
-        self.info_label.setObjectName("dataset-info")
-        results_layout.addWidget(self.info_label)
+        results_layout.setSpacing(16)
+        
+        means_title = QLabel("PARAMETER AVERAGES (RANK)")
+        means_title.setObjectName("results-title")
+        results_layout.addWidget(means_title)
+        
+        self.means_table = QTableWidget()
+        self.means_table.setColumnCount(len(PARAMETER_UNITS))
+        self.means_table.setHorizontalHeaderLabels(
+            [f"{param.upper()} ({unit})" for param, unit in PARAMETER_UNITS.items()]
+        )
+        self.means_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.means_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.means_table.setSelectionMode(QTableWidget.NoSelection)
+        results_layout.addWidget(self.means_table)
+        
+        diff_header = QHBoxLayout()
+        diff_title = QLabel("PAIRWISE DIFFERENCES (ROW − COLUMN)")
+        diff_title.setObjectName("results-title")
+        diff_header.addWidget(diff_title)
+        diff_header.addStretch()
+        
+        self.parameter_combo = QComboBox()
+        self.parameter_combo.addItems(list(PARAMETER_UNITS))
+        self.parameter_combo.currentTextChanged.connect(self.show_differences)
+        diff_header.addWidget(self.parameter_combo)
+        results_layout.addLayout(diff_header)
+        
+        self.diff_table = QTableWidget()
+        self.diff_table.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.diff_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.diff_table.setSelectionMode(QTableWidget.NoSelection)
+        results_layout.addWidget(self.diff_table)
         
         layout.addWidget(self.results_frame)
         
@@ -280,8 +250,8 @@ class CompareWidget(QWidget):
         self.load_datasets()
         
     def load_datasets(self):
-        self.combo1.clear()
-        self.combo2.clear()
+        self.dataset_list.clear()
+        self.compare_btn.setEnabled(False)
         self.loading_label.show()
         self.error_label.hide()
         
@@ -294,37 +264,50 @@ class CompareWidget(QWidget):
         self.loading_label.hide()
         self.datasets = data or []
         
-        for ds in self.datasets:
-            label = ds.get('filename', 'Dataset')
-            self.combo1.addItem(label, ds.get('id'))
-            self.combo2.addItem(label, ds.get('id'))
-            
-        if len(self.datasets) >= 2:
-            self.combo2.setCurrentIndex(1)
+        self.dataset_list.blockSignals(True)
+        for row, ds in enumerate(self.datasets):
+            item = QListWidgetItem(ds.get('filename', 'Dataset'))
+            item.setData(Qt.UserRole, ds.get('id'))
+            item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsUserCheckable)
+            item.setCheckState(Qt.Checked if row < 2 else Qt.Unchecked)
+            self.dataset_list.addItem(item)
+        self.dataset_list.blockSignals(False)
+        self.on_selection_changed()
             
         if len(self.datasets) < 2:
             self.error_label.setText("Upload at least 2 datasets to compare.")
             self.error_label.show()
-            self.compare_btn.setEnabled(False)
-        else:
-            self.compare_btn.setEnabled(True)
             
     def on_load_error(self, message):
         self.loading_label.hide()
         self.error_label.setText(f"Error: {message}")
         self.error_label.show()
         
+    def selected_ids(self):
+        return [
+            self.dataset_list.item(row).data(Qt.UserRole)
+            for row in range(self.dataset_list.count())
+            if self.dataset_list.item(row).checkState() == Qt.Checked
+        ]
+        
+    def on_selection_changed(self, _item=None):
+        count = len(self.selected_ids())
+        # Once MAX_COMPARE runs are ticked the rest are greyed out until one is cleared.
+        flags = Qt.ItemIsUserCheckable | (Qt.ItemIsEnabled if count < MAX_COMPARE else Qt.NoItemFlags)
+        self.dataset_list.blockSignals(True)
+        for row in range(self.dataset_list.count()):
+            item = self.dataset_list.item(row)
+            if item.checkState() != Qt.Checked:
+                item.setFlags(flags)
+        self.dataset_list.blockSignals(False)
+        self.selection_label.setText(f"{count}/{MAX_COMPARE} SELECTED")
+        self.compare_btn.setEnabled(count >= 2 and self.compare_worker is None)
+        
     def run_comparison(self):
-        id1 = self.combo1.currentData()
-        id2 = self.combo2.currentData()
+        dataset_ids = self.selected_ids()
         
-        if not id1 or not id2:
-            self.error_label.setText("Select both datasets.")
-            self.error_label.show()
-            return
-            
-        if id1 == id2:
-            self.error_label.setText("Select two different datasets.")
+        if len(dataset_ids) < 2:
+            self.error_label.setText("Select at least two datasets.")
             self.error_label.show()
             return
             
@@ -333,31 +316,57 @@ class CompareWidget(QWidget):
         self.compare_btn.setEnabled(False)
         self.compare_btn.setText("COMPARING...")
         
-        self.compare_worker = CompareWorker(id1, id2, self.token)
+        self.compare_worker = CompareWorker(dataset_ids, self.token)
         self.compare_worker.success.connect(self.on_compare_success)
         self.compare_worker.error.connect(self.on_compare_error)
         self.compare_worker.start()
         
     def on_compare_success(self, data):
-        self.compare_btn.setEnabled(True)
+        self.compare_worker = None
         self.compare_btn.setText("COMPARE")
-        
-        comparison = data.get("comparison", {})
-        ds1 = data.get("dataset1", {})
-        ds2 = data.get("dataset2", {})
-        
-        self.flowrate_card.set_value(comparison.get("flowrate_diff", 0), "L/min")
-        self.pressure_card.set_value(comparison.get("pressure_diff", 0), "bar")
-        self.temperature_card.set_value(comparison.get("temperature_diff", 0), "°C")
-        
-        info = f"Comparing: {ds1.get('filename', 'A')} vs {ds2.get('filename', 'B')}"
-        self.info_label.setText(info)
+        self.on_selection_changed()
+        self.comparison = data
+        
+        datasets = data.get("datasets", [])
+        labels = [ds.get("filename", "Dataset") for ds in datasets]
+        ranks = {
+            param: {dataset_id: rank for rank, dataset_id in enumerate(ranking, 1)}
+            for param, ranking in data.get("ranking", {}).items()
+        }
+        
+        self.means_table.setRowCount(len(datasets))
+        self.means_table.setVerticalHeaderLabels(labels)
+        for row, ds in enumerate(datasets):
+            for col, (param, field) in enumerate(PARAMETER_FIELDS.items()):
+                rank = ranks.get(param, {}).get(ds.get("id"))
+                text = f"{ds.get(field, 0):.2f}" + (f"  #{rank}" if rank else "")
+                color = QColor(COLORS['success']) if rank == 1 else None
+                self.means_table.setItem(row, col, table_item(text, color))
+        
+        self.diff_table.setRowCount(len(datasets))
+        self.diff_table.setColumnCount(len(datasets))
+        self.diff_table.setVerticalHeaderLabels(labels)
+        self.diff_table.setHorizontalHeaderLabels(labels)
+        self.show_differences(self.parameter_combo.currentText())
         
         self.results_frame.show()
         
+    def show_differences(self, param):
+        if not self.comparison:
+            return
+        matrix = self.comparison.get("differences", {}).get(param, [])
+        for row, values in enumerate(matrix):
+            for col, value in enumerate(values):
+                if row == col:
+                    self.diff_table.setItem(row, col, table_item("—", QColor(COLORS['muted'])))
+                    continue
+                prefix = "+" if value > 0 else ""
+                self.diff_table.setItem(row, col, table_item(f"{prefix}{value}", diff_color(value)))
+        
     def on_compare_error(self, message):
-        self.compare_btn.setEnabled(True)
+        self.compare_worker = None
         self.compare_btn.setText("COMPARE")
+        self.on_selection_changed()
         self.error_label.setText(f"Comparison failed: {message}")
         self.error_label.show()
         
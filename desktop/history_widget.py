@@ -5,7 +5,7 @@ from PyQt5.QtWidgets import (
 from PyQt5.QtCore import Qt
 from datetime import datetime
 from theme import HISTORY_THEME
-from worker import HistoryWorker, DownloadWorker
+from worker import HistoryWorker, DownloadWorker, BulkDownloadWorker
 
 
 class HistoryWidget(QWidget):
@@ -15,6 +15,7 @@ class HistoryWidget(QWidget):
         self.worker = None
         self.download_worker = None
         self.downloading_id = None
+        self.bulk_worker = None
         self.setStyleSheet(HISTORY_THEME)
         
         layout = QVBoxLayout()
@@ -31,6 +32,12 @@ class HistoryWidget(QWidget):
         header.addWidget(self.storage_label)
         header.addStretch()
         
+        self.export_all_btn = QPushButton("EXPORT ALL")
+        self.export_all_btn.setObjectName("refresh")
+        self.export_all_btn.setEnabled(False)
+        self.export_all_btn.clicked.connect(self.export_all)
+        header.addWidget(self.export_all_btn)
+        
         self.refresh_btn = QPushButton("REFRESH")
         self.refresh_btn.setObjectName("refresh")
         self.refresh_btn.clicked.connect(self.refresh)
@@ -88,6 +95,7 @@ class HistoryWidget(QWidget):
         filled = '⬢' * count
         empty = '⬡' * (5 - count)
         self.storage_label.setText(f"{filled}{empty} {count}/5")
+        self.export_all_btn.setEnabled(bool(data) and self.bulk_worker is None)
         
         if not data:
             self.empty_label.show()
@@ -138,10 +146,18 @@ class HistoryWidget(QWidget):
         
         self.download_worker = DownloadWorker(dataset_id, self.token)
         self.download_worker.filepath = filepath
+        self.download_worker.progress.connect(self.on_download_progress)
         self.download_worker.success.connect(self.on_download_success)
         self.download_worker.error.connect(self.on_download_error)
         self.download_worker.start()
         
+    def on_download_progress(self, percent):
+        for row in range(self.table.rowCount()):
+            btn = self.table.cellWidget(row, 2)
+            item = self.table.item(row, 0)
+            if btn and item and item.data(Qt.UserRole) == self.downloading_id:
+                btn.setText(f"EXPORTING {percent}%")
+        
     def on_download_success(self, filepath):
         self.downloading_id = None
         self.update_buttons()
@@ -160,6 +176,46 @@ class HistoryWidget(QWidget):
         self.error_label.setText(f"Download failed: {message}")
         self.error_label.show()
         
+    def export_all(self):
+        dataset_ids = [self.table.item(row, 0).data(Qt.UserRole) for row in range(self.table.rowCount())]
+        if not dataset_ids or self.bulk_worker:
+            return
+        
+        filepath, _ = QFileDialog.getSaveFileName(
+            self, "Save Reports", "reports.zip", "ZIP Archives (*.zip)"
+        )
+        
+        if not filepath:
+            return
+        
+        self.export_all_btn.setText("EXPORTING...")
+        self.export_all_btn.setEnabled(False)
+        
+        self.bulk_worker = BulkDownloadWorker(dataset_ids, self.token, filepath)
+        self.bulk_worker.success.connect(self.on_export_all_success)
+        self.bulk_worker.error.connect(self.on_export_all_error)
+        self.bulk_worker.start()
+        
+    def on_export_all_success(self, filepath):
+        self.bulk_worker = None
+        self.export_all_btn.setText("EXPORT ALL")
+        self.export_all_btn.setEnabled(True)
+        
+        msg = QMessageBox(self)
+        msg.setWindowTitle("Export Complete")
+        msg.setText("All reports exported successfully!")
+        msg.setInformativeText(f"Saved to: {filepath}")
+        msg.setIcon(QMessageBox.Information)
+        msg.setStandardButtons(QMessageBox.Ok)
+        msg.exec_()
+        
+    def on_export_all_error(self, message):
+        self.bulk_worker = None
+        self.export_all_btn.setText("EXPORT ALL")
+        self.export_all_btn.setEnabled(True)
+        self.error_label.setText(f"Export failed: {message}")
+        self.error_label.show()
+        
     def update_buttons(self):
         for row in range(self.table.rowCount()):
             btn = self.table.cellWidget(row, 2)
@@ -125,7 +125,7 @@ class UploadWidget(QWidget):
         
     def browse_file(self):
         filepath, _ = QFileDialog.getOpenFileName(
-            self, "Select CSV File", "", "CSV Files (*.csv)"
+            self, "Select Data File", "", "Data Files (*.csv *.csv.gz *.parquet *.arrow *.feather)"
         )
         if filepath:
             self.filepath = filepath
@@ -144,8 +144,12 @@ class UploadWidget(QWidget):
         self.worker = UploadWorker(self.filepath, self.token)
         self.worker.success.connect(self.on_success)
         self.worker.error.connect(self.on_error)
+        self.worker.progress.connect(self.on_progress)
         self.worker.start()
         
+    def on_progress(self, percent):
+        self.upload_btn.setText(f"UPLOADING {percent}%" if percent < 100 else "PROCESSING...")
+        
     def on_success(self, data):
         self.stat_labels["total_count"].setText(str(data.get("total_count", 0)))
         self.stat_labels["avg_flowrate"].setText(f"{data.get('avg_flowrate', 0):.2f}")
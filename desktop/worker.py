@@ -1,9 +1,60 @@
 from PyQt5.QtCore import QThread, pyqtSignal
 import requests
+import gzip
+import hashlib
+import json
 import os
 import pathlib
+import shutil
+import tempfile
+import time
 
 API_BASE = os.environ.get("API_URL", "https://chemical-equipment-parameter-visualizer-unts.onrender.com")
+APP_DATA_DIR = pathlib.Path.home() / ".chemical_equipment_visualizer"
+UPLOAD_STATE_FILE = APP_DATA_DIR / "upload_sessions.json"
+REPORT_CACHE_DIR = APP_DATA_DIR / "reports"
+UPLOAD_RETRIES = 5
+REPORT_POLL_INTERVAL = 1.0
+# Give up on a report job that makes no progress for this many seconds.
+REPORT_STALL_TIMEOUT = 300
+
+
+def file_sha256(filepath):
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def gzip_for_upload(filepath):
+    # mtime=0 keeps the output byte-identical across runs, so an interrupted
+    # upload can be resumed after the file is compressed again.
+    fd, gzip_path = tempfile.mkstemp(suffix=".csv.gz")
+    with os.fdopen(fd, "wb") as out, open(filepath, "rb") as f:
+        with gzip.GzipFile(filename="", mode="wb", fileobj=out, mtime=0) as gz:
+            shutil.copyfileobj(f, gz, 1024 * 1024)
+    return gzip_path
+
+
+def load_upload_sessions():
+    try:
+        return json.loads(UPLOAD_STATE_FILE.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def remember_upload_session(state_key, session_id):
+    sessions = load_upload_sessions()
+    sessions[state_key] = session_id
+    APP_DATA_DIR.mkdir(parents=True, exist_ok=True)
+    UPLOAD_STATE_FILE.write_text(json.dumps(sessions))
+
+
+def forget_upload_session(state_key):
+    sessions = load_upload_sessions()
+    if sessions.pop(state_key, None) is not None:
+        UPLOAD_STATE_FILE.write_text(json.dumps(sessions))
 
 
 class ApiWorker(QThread):
@@ -93,21 +144,43 @@ class RegisterWorker(QThread):
 class UploadWorker(QThread):
     success = pyqtSignal(dict)
     error = pyqtSignal(str)
+    progress = pyqtSignal(int)
 
     def __init__(self, filepath, token):
         super().__init__()
         self.filepath = filepath
         self.token = token
+        self.headers = {"Authorization": f"Token {token}"}
 
     def run(self):
+        gzip_path = None
         try:
-            with open(self.filepath, "rb") as f:
-                response = requests.post(
-                    f"{API_BASE}/api/upload/",
-                    files={"file": (os.path.basename(self.filepath), f, "text/csv")},
-                    headers={"Authorization": f"Token {self.token}"},
-                    timeout=60
-                )
+            if self.filepath.endswith(".csv"):
+                upload_path = gzip_path = gzip_for_upload(self.filepath)
+            else:
+                upload_path = self.filepath
+            size = os.path.getsize(upload_path)
+            digest = file_sha256(upload_path)
+            state_key = f"{digest}:{size}"
+
+            session = self.resume_session(state_key) or self.create_session(state_key, size, digest)
+            if session is None:
+                return
+
+            offset = session["offset"]
+            with open(upload_path, "rb") as f:
+                while offset < size:
+                    f.seek(offset)
+                    offset = self.send_chunk(session["id"], offset, f.read(session["chunk_size"]))
+                    self.progress.emit(int(offset * 100 / size))
+
+            response = requests.post(
+                f"{API_BASE}/api/uploads/{session['id']}/complete/",
+                headers=self.headers,
+                timeout=60
+            )
+            if response.status_code != 409:
+                forget_upload_session(state_key)
             if response.status_code in (200, 201):
                 self.success.emit(response.json())
             else:
@@ -116,6 +189,57 @@ class UploadWorker(QThread):
             self.error.emit(f"Connection error: {str(e)}")
         except Exception as e:
             self.error.emit(str(e))
+        finally:
+            if gzip_path:
+                os.remove(gzip_path)
+
+    def resume_session(self, state_key):
+        session_id = load_upload_sessions().get(state_key)
+        if not session_id:
+            return None
+        response = requests.get(f"{API_BASE}/api/uploads/{session_id}/", headers=self.headers, timeout=30)
+        if response.status_code != 200:
+            forget_upload_session(state_key)
+            return None
+        return response.json()
+
+    def create_session(self, state_key, size, digest):
+        response = requests.post(
+            f"{API_BASE}/api/uploads/",
+            json={"filename": os.path.basename(self.filepath), "size": size, "sha256": digest},
+            headers=self.headers,
+            timeout=30
+        )
+        if response.status_code != 201:
+            self.error.emit(response.json().get("error", "Upload failed"))
+            return None
+        session = response.json()
+        remember_upload_session(state_key, session["id"])
+        return session
+
+    def send_chunk(self, session_id, offset, chunk):
+        checksum = hashlib.sha256(chunk).hexdigest()
+        for attempt in range(UPLOAD_RETRIES):
+            try:
+                response = requests.put(
+                    f"{API_BASE}/api/uploads/{session_id}/chunk/",
+                    params={"offset": offset},
+                    data=chunk,
+                    headers={**self.headers, "Content-Type": "application/octet-stream", "X-Chunk-SHA256": checksum},
+                    timeout=60
+                )
+            except requests.exceptions.RequestException:
+                if attempt == UPLOAD_RETRIES - 1:
+                    raise
+                time.sleep(2 ** attempt)
+                continue
+            if response.status_code in (200, 409):
+                return response.json()["offset"]
+            if response.status_code >= 500 and attempt < UPLOAD_RETRIES - 1:
+                time.sleep(2 ** attempt)
+                continue
+            raise RuntimeError(response.json().get("error", "Upload failed"))
+        raise RuntimeError("Upload failed")
 
 
 class VisualizationWorker(QThread):
@@ -168,6 +292,7 @@ class HistoryWorker(QThread):
 class DownloadWorker(QThread):
     success = pyqtSignal(str)
     error = pyqtSignal(str)
+    progress = pyqtSignal(int)
 
     def __init__(self, dataset_id, token):
         super().__init__()
@@ -175,20 +300,109 @@ class DownloadWorker(QThread):
         self.token = token
         self.filepath = None
 
+    def wait_for_report(self, headers):
+        # Rendering runs as a server-side job, so no single request has to
+        # outlast the render; the job is polled until the PDF is ready.
+        response = requests.get(
+            f"{API_BASE}/api/report/{self.dataset_id}/",
+            params={"async": "1"},
+            headers=headers,
+            timeout=30
+        )
+        if response.status_code != 202:
+            raise RuntimeError(response.json().get("error", "Failed to start report"))
+        job = response.json()
+        last_state = None
+        while job["status"] in ("queued", "running"):
+            progress = job.get("progress") or {}
+            if progress.get("total_rows"):
+                self.progress.emit(min(99, progress.get("rows", 0) * 100 // progress["total_rows"]))
+            state = (job["status"], progress.get("pages"), progress.get("rows"))
+            if state != last_state:
+                last_state = state
+                deadline = time.monotonic() + REPORT_STALL_TIMEOUT
+            elif time.monotonic() > deadline:
+                raise RuntimeError("Report job stopped responding")
+            time.sleep(REPORT_POLL_INTERVAL)
+            response = requests.get(f"{API_BASE}/api/jobs/{job['id']}/", headers=headers, timeout=30)
+            if response.status_code != 200:
+                raise RuntimeError("Lost track of report job")
+            job = response.json()
+        if job["status"] != "succeeded":
+            raise RuntimeError(job.get("error") or "Report generation failed")
+        self.progress.emit(100)
+        return job["id"]
+
     def run(self):
+        # The last copy of each report is kept with its ETag, so a repeat
+        # download is a conditional GET answered with 304 and no body.
+        cached_pdf = REPORT_CACHE_DIR / f"report_{self.dataset_id}.pdf"
+        cached_etag = REPORT_CACHE_DIR / f"report_{self.dataset_id}.etag"
+        headers = {"Authorization": f"Token {self.token}"}
         try:
-            response = requests.get(
-                f"{API_BASE}/api/report/{self.dataset_id}/",
-                headers={"Authorization": f"Token {self.token}"},
+            job_id = self.wait_for_report(headers)
+            download_headers = dict(headers)
+            if cached_pdf.exists() and cached_etag.exists():
+                download_headers["If-None-Match"] = cached_etag.read_text().strip()
+            with requests.get(
+                f"{API_BASE}/api/jobs/{job_id}/download/",
+                headers=download_headers,
+                stream=True,
                 timeout=60
-            )
-            if response.status_code == 200:
-                path = self.filepath or str(pathlib.Path.home() / "Downloads" / f"report_{self.dataset_id}.pdf")
-                with open(path, "wb") as f:
-                    f.write(response.content)
-                self.success.emit(path)
-            else:
-                self.error.emit("Failed to download report")
+            ) as response:
+                if response.status_code == 200:
+                    REPORT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                    partial_pdf = cached_pdf.with_suffix(".part")
+                    with open(partial_pdf, "wb") as f:
+                        for block in response.iter_content(1024 * 1024):
+                            f.write(block)
+                    os.replace(partial_pdf, cached_pdf)
+                    if response.headers.get("ETag"):
+                        cached_etag.write_text(response.headers["ETag"])
+                    else:
+                        cached_etag.unlink(missing_ok=True)
+                elif response.status_code != 304:
+                    self.error.emit("Failed to download report")
+                    return
+            path = self.filepath or str(pathlib.Path.home() / "Downloads" / f"report_{self.dataset_id}.pdf")
+            shutil.copyfile(cached_pdf, path)
+            self.success.emit(path)
+        except requests.exceptions.RequestException as e:
+            self.error.emit(f"Connection error: {str(e)}")
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class BulkDownloadWorker(QThread):
+    success = pyqtSignal(str)
+    error = pyqtSignal(str)
+
+    def __init__(self, dataset_ids, token, filepath):
+        super().__init__()
+        self.dataset_ids = dataset_ids
+        self.token = token
+        self.filepath = filepath
+
+    def run(self):
+        # The server renders every missing report before the archive starts,
+        # so the read timeout has to cover a whole batch of renders.
+        try:
+            with requests.get(
+                f"{API_BASE}/api/reports/bulk/",
+                params={"ids": ",".join(str(dataset_id) for dataset_id in self.dataset_ids)},
+                headers={"Authorization": f"Token {self.token}"},
+                stream=True,
+                timeout=(10, 600)
+            ) as response:
+                if response.status_code != 200:
+                    self.error.emit(response.json().get("error", "Failed to export reports"))
+                    return
+                partial_path = self.filepath + ".part"
+                with open(partial_path, "wb") as f:
+                    for block in response.iter_content(1024 * 1024):
+                        f.write(block)
+                os.replace(partial_path, self.filepath)
+            self.success.emit(self.filepath)
         except requests.exceptions.RequestException as e:
             self.error.emit(f"Connection error: {str(e)}")
         except Exception as e:
@@ -199,17 +413,16 @@ class CompareWorker(QThread):
     success = pyqtSignal(dict)
     error = pyqtSignal(str)
 
-    def __init__(self, dataset1_id, dataset2_id, token):
+    def __init__(self, dataset_ids, token):
         super().__init__()
-        self.dataset1_id = dataset1_id
-        self.dataset2_id = dataset2_id
+        self.dataset_ids = dataset_ids
         self.token = token
 
     def run(self):
         try:
             response = requests.post(
-                f"{API_BASE}/api/compare/",
-                json={"dataset1": self.dataset1_id, "dataset2": self.dataset2_id},
+                f"{API_BASE}/api/compare/matrix/",
+                json={"datasets": self.dataset_ids},
                 headers={"Authorization": f"Token {self.token}"},
                 timeout=30
             )
@@ -47,7 +47,7 @@ export const getHistory = (token) =>
   api('/history/', { headers: { 'Authorization': `Token ${token}` } });
 
 export const downloadReport = (id, token) =>
-  api(`/report/${id}/`, { headers: { 'Authorization': `Token ${token}` }, responseType: 'blob' });
+  api(`/report/${id}/`, { headers: { 'Authorization': `Token ${token}` }, responseType: 'blob', cache: 'no-cache' });
 
 export const compareDatasets = (id1, id2, token) =>
   api('/compare/', {